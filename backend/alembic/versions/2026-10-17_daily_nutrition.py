@@ -0,0 +1,62 @@
+"""daily nutrition
+
+Revision ID: a41f6c2e9b83
+Revises: 5e0a8d43c1f7
+Create Date: 2026-10-17 14:22:51.604377
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "a41f6c2e9b83"
+down_revision: Union[str, None] = "5e0a8d43c1f7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NUTRIENTS = ("calories", "fat", "protein", "carbohydrates")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "daily_nutrition",
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column(
+            "meal",
+            sa.Enum("BREAKFAST", "LUNCH", "DINNER", "SNACK", name="mealtype"),
+            nullable=False,
+        ),
+        sa.Column("entries", sa.Integer(), nullable=False),
+        *(
+            sa.Column(f"{kind}_{nutrient}", sa.Float(), nullable=False)
+            for kind in ("planned", "eaten")
+            for nutrient in NUTRIENTS
+        ),
+        sa.PrimaryKeyConstraint("date", "meal"),
+    )
+
+    # Backfill from the existing meal plan. Foods made from recipes count with their
+    # rolled-up nutrition, which SQL can't compute: run `python -m
+    # src.nutrition.rebuild` after upgrading to correct the days they're planned on.
+    planned = ", ".join(f"SUM(p.servings * f.{n})" for n in NUTRIENTS)
+    eaten = ", ".join(
+        f"SUM(CASE WHEN p.eaten THEN p.servings * f.{n} ELSE 0 END)" for n in NUTRIENTS
+    )
+    columns = ", ".join(
+        f"{kind}_{n}" for kind in ("planned", "eaten") for n in NUTRIENTS
+    )
+    op.execute(
+        f"INSERT INTO daily_nutrition (date, meal, entries, {columns}) "
+        f"SELECT p.date, p.meal, COUNT(p.id), {planned}, {eaten} "
+        "FROM planned_food p JOIN food f ON f.id = p.food_id "
+        "GROUP BY p.date, p.meal"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("daily_nutrition")
@@ -0,0 +1,61 @@
+"""delta sync
+
+Revision ID: 2f8d6b4a9e17
+Revises: 7c25e1a9d04b
+Create Date: 2026-10-17 18:02:44.615390
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "2f8d6b4a9e17"
+down_revision: Union[str, None] = "7c25e1a9d04b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SYNCED_TABLES = ("food", "recipe", "planned_food")
+# (table, column) pairs delta sync looks rows up by
+FOREIGN_KEY_INDEXES = (
+    ("food", "source_recipe_id"),
+    ("recipe_ingredient", "food_id"),
+    ("recipe_ingredient", "recipe_id"),
+    ("recipe_instruction", "recipe_id"),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in SYNCED_TABLES:
+        # Existing rows are at revision 0, which only a full sync returns
+        op.add_column(
+            table,
+            sa.Column("revision", sa.Integer(), nullable=False, server_default="0"),
+        )
+        op.create_index(op.f(f"ix_{table}_revision"), table, ["revision"])
+    for table, column in FOREIGN_KEY_INDEXES:
+        op.create_index(op.f(f"ix_{table}_{column}"), table, [column])
+    op.create_table(
+        "tombstone",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("table_name", sa.String(), nullable=False),
+        sa.Column("row_id", sa.Integer(), nullable=False),
+        sa.Column("revision", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_tombstone_revision"), "tombstone", ["revision"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_tombstone_revision"), table_name="tombstone")
+    op.drop_table("tombstone")
+    for table, column in FOREIGN_KEY_INDEXES:
+        op.drop_index(op.f(f"ix_{table}_{column}"), table_name=table)
+    for table in SYNCED_TABLES:
+        op.drop_index(op.f(f"ix_{table}_revision"), table_name=table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column("revision")
@@ -0,0 +1,30 @@
+"""food density
+
+Revision ID: 5e0a8d43c1f7
+Revises: 3c9e51d7a2b4
+Create Date: 2026-10-17 11:40:03.918254
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5e0a8d43c1f7"
+down_revision: Union[str, None] = "3c9e51d7a2b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("food", sa.Column("density", sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("food") as batch_op:
+        batch_op.drop_column("density")
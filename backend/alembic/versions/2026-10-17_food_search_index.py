@@ -0,0 +1,34 @@
+"""food search index
+
+Revision ID: 3c9e51d7a2b4
+Revises: fb163eab6b9c
+Create Date: 2026-10-17 10:12:41.305118
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3c9e51d7a2b4"
+down_revision: Union[str, None] = "fb163eab6b9c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # FTS5 index over food names, rowid is the food ID
+    op.execute(
+        "CREATE VIRTUAL TABLE food_search USING fts5("
+        "name, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    op.execute("INSERT INTO food_search (rowid, name) SELECT id, name FROM food")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TABLE food_search")
@@ -0,0 +1,62 @@
+"""inventory food state
+
+Revision ID: 5e3a9c71b0d2
+Revises: 2f8d6b4a9e17
+Create Date: 2026-10-17 19:41:07.208316
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5e3a9c71b0d2"
+down_revision: Union[str, None] = "2f8d6b4a9e17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FOOD_STATE = sa.Enum("PLANNED", "UNCOOKED", "READY", name="foodstate")
+
+
+def _create_inventory(name: str, *constraints: sa.Constraint) -> None:
+    op.create_table(
+        name,
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("state", FOOD_STATE, nullable=False),
+        sa.Column("food_id", sa.Integer(), nullable=False),
+        sa.Column("quantity", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["food_id"], ["food.id"]),
+        *constraints,
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite can't change a primary key in place. The (id, state) key didn't
+    # autoincrement, and one row per (food, state) is what stock updates key on, so
+    # duplicates are merged.
+    _create_inventory(
+        "inventory_new",
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("food_id", "state", name="uq_inventory_food_state"),
+    )
+    op.execute(
+        "INSERT INTO inventory_new (id, state, food_id, quantity) "
+        "SELECT min(id), state, food_id, sum(quantity) FROM inventory "
+        "GROUP BY food_id, state"
+    )
+    op.drop_table("inventory")
+    op.rename_table("inventory_new", "inventory")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _create_inventory("inventory_old", sa.PrimaryKeyConstraint("id", "state"))
+    op.execute(
+        "INSERT INTO inventory_old (id, state, food_id, quantity) "
+        "SELECT id, state, food_id, quantity FROM inventory"
+    )
+    op.drop_table("inventory")
+    op.rename_table("inventory_old", "inventory")
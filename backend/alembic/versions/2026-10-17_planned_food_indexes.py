@@ -0,0 +1,33 @@
+"""planned food indexes
+
+Revision ID: 7c25e1a9d04b
+Revises: 0d7b93f5e2a6
+Create Date: 2026-10-17 16:21:37.540912
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7c25e1a9d04b"
+down_revision: Union[str, None] = "0d7b93f5e2a6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_planned_food_date_meal", "planned_food", ["date", "meal"], unique=False
+    )
+    op.create_index(
+        op.f("ix_planned_food_food_id"), "planned_food", ["food_id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_planned_food_food_id"), table_name="planned_food")
+    op.drop_index("ix_planned_food_date_meal", table_name="planned_food")
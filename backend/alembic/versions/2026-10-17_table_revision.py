@@ -0,0 +1,34 @@
+"""table revision
+
+Revision ID: 0d7b93f5e2a6
+Revises: a41f6c2e9b83
+Create Date: 2026-10-17 15:48:10.237761
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0d7b93f5e2a6"
+down_revision: Union[str, None] = "a41f6c2e9b83"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "table_revision",
+        sa.Column("table_name", sa.String(), nullable=False),
+        sa.Column("revision", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("table_name"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("table_revision")
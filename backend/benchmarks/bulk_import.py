@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Food import throughput benchmark.
+
+Compares creating foods one at a time through service.create_food (one commit per
+food) with service.insert_foods (chunked INSERT ... RETURNING, one commit overall),
+each against a fresh SQLite database with the durable storage profile.
+
+Run from the backend directory:
+    python -m benchmarks.bulk_import --rows 20000
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from sqlalchemy.orm import Session
+
+from src.food import service
+from src.food.constants import BULK_INSERT_CHUNK_SIZE
+from src.food.database import Base
+from src.food.storage import create_sqlite_engine
+from src.food.models import CreateFoodRequest
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark food import paths")
+    parser.add_argument(
+        "--rows", type=int, default=20000, help="Foods to import (default: 20000)"
+    )
+    parser.add_argument(
+        "--per-row-rows",
+        type=int,
+        default=2000,
+        help="Foods to import through the per-row path, which is much slower "
+        "(default: 2000)",
+    )
+    return parser.parse_args()
+
+
+def make_requests(count: int) -> List[CreateFoodRequest]:
+    return [
+        CreateFoodRequest(
+            name=f"Food {i}",
+            serving_size=100.0,
+            serving_size_unit="g",
+            calories=i % 900,
+            fat=i % 50,
+            protein=i % 60,
+            carbohydrates=i % 80,
+        )
+        for i in range(count)
+    ]
+
+
+def per_row(db_session: Session, requests: List[CreateFoodRequest]) -> None:
+    for request in requests:
+        service.create_food(db_session=db_session, request=request)
+
+
+def bulk(db_session: Session, requests: List[CreateFoodRequest]) -> None:
+    indexed = list(enumerate(requests))
+    for start in range(0, len(indexed), BULK_INSERT_CHUNK_SIZE):
+        service.insert_foods(
+            db_session, indexed[start : start + BULK_INSERT_CHUNK_SIZE]
+        )
+    db_session.commit()
+
+
+def run(
+    name: str,
+    import_foods: Callable[[Session, List[CreateFoodRequest]], None],
+    requests: List[CreateFoodRequest],
+) -> float:
+    """Import `requests` into a fresh database and return rows per second."""
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_sqlite_engine(
+            f"sqlite:///{Path(directory) / 'bench.db'}", "durable"
+        )
+        Base.metadata.create_all(engine)
+        with Session(engine) as db_session:
+            start = time.perf_counter()
+            import_foods(db_session, requests)
+            elapsed = time.perf_counter() - start
+        engine.dispose()
+
+    rate = len(requests) / elapsed
+    print(
+        f"{name:>8}: {len(requests):>7} rows in {elapsed:8.3f}s ({rate:10.0f} rows/s)"
+    )
+    return rate
+
+
+def main() -> None:
+    args = parse_arguments()
+    per_row_rate = run("per-row", per_row, make_requests(args.per_row_rows))
+    bulk_rate = run("bulk", bulk, make_requests(args.rows))
+    print(f"speedup: {bulk_rate / per_row_rate:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Recipe listing serialization benchmark.
+
+Seeds a fresh SQLite database with recipes (with ingredients and instructions) and
+serves the full listing from three routes of a throwaway FastAPI app:
+
+- before: service.get_recipes, then per-object RecipeResponse.model_validate,
+  returned as a list so FastAPI re-validates it against response_model and encodes
+  it with jsonable_encoder and the stdlib json module
+- adapter: service.get_recipes, then one TypeAdapter pass from the ORM objects to
+  JSON bytes (serialization.dump_list)
+- documents: service.get_recipe_documents, column rows shaped into dicts and
+  encoded without validation (serialization.dump_documents), as GET /api/recipes does
+
+Reports the CPU time per request for each, including the queries.
+
+Run from the backend directory:
+    python -m benchmarks.serialization --recipes 1000
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from src.food import service
+from src.food.database import Base
+from src.food.models import (
+    CreateFoodRequest,
+    CreateRecipeRequest,
+    IngredientRequest,
+    InstructionRequest,
+    RecipeResponse,
+)
+from src.food.serialization import dump_documents, dump_list, json_response
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark list serialization")
+    parser.add_argument(
+        "--recipes", type=int, default=1000, help="Recipes to serve (default: 1000)"
+    )
+    parser.add_argument(
+        "--requests", type=int, default=20, help="Requests per path (default: 20)"
+    )
+    return parser.parse_args()
+
+
+def seed(db_session: Session, recipes: int) -> None:
+    foods = [
+        service.create_food(
+            db_session=db_session,
+            request=CreateFoodRequest(
+                name=f"Ingredient {i}",
+                serving_size=100.0,
+                serving_size_unit="g",
+                calories=100 + i,
+                fat=i % 20,
+                protein=i % 30,
+                carbohydrates=i % 40,
+            ),
+        )
+        for i in range(50)
+    ]
+    for i in range(recipes):
+        service.create_recipe(
+            db_session=db_session,
+            request=CreateRecipeRequest(
+                name=f"Recipe {i}",
+                ingredients=[
+                    IngredientRequest(
+                        food_id=foods[(i + j) % len(foods)].id,
+                        note="chopped",
+                        quantity=50.0 + j,
+                        unit="g",
+                    )
+                    for j in range(5)
+                ],
+                instructions=[
+                    InstructionRequest(step=step, text=f"Step {step} of recipe {i}")
+                    for step in range(1, 4)
+                ],
+                override_nutrition=False,
+                calories=0,
+                fat=0,
+                protein=0,
+                carbohydrates=0,
+            ),
+        )
+
+
+def time_requests(client: TestClient, path: str, requests: int) -> float:
+    """CPU seconds per request, after one warm-up request."""
+    expected = client.get(path).content
+    start = time.process_time()
+    for _ in range(requests):
+        assert client.get(path).content == expected
+    return (time.process_time() - start) / requests
+
+
+def main() -> None:
+    args = parse_arguments()
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{Path(directory) / 'bench.db'}")
+        Base.metadata.create_all(engine)
+        with Session(engine) as db_session:
+            seed(db_session, args.recipes)
+
+        app = FastAPI()
+
+        @app.get("/before", response_model=List[RecipeResponse])
+        def before() -> List[RecipeResponse]:
+            with Session(engine) as db_session:
+                recipes = service.get_recipes(db_session=db_session)
+                return [RecipeResponse.model_validate(recipe) for recipe in recipes]
+
+        @app.get("/adapter", response_model=List[RecipeResponse])
+        def adapter() -> Response:
+            with Session(engine) as db_session:
+                recipes = service.get_recipes(db_session=db_session)
+                return json_response(dump_list(RecipeResponse, recipes))
+
+        @app.get("/documents", response_model=List[RecipeResponse])
+        def documents() -> Response:
+            with Session(engine) as db_session:
+                return json_response(
+                    dump_documents(service.get_recipe_documents(db_session))
+                )
+
+        print(f"{args.recipes} recipes, {args.requests} requests per path")
+        with TestClient(app) as client:
+            expected = client.get("/before").json()
+            times: Dict[str, float] = {}
+            for path in ("before", "adapter", "documents"):
+                assert client.get(f"/{path}").json() == expected
+                times[path] = time_requests(client, f"/{path}", args.requests)
+                print(
+                    f"{path:>10}: {times[path] * 1000:8.2f} ms CPU per request "
+                    f"({times['before'] / times[path]:.1f}x)"
+                )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Service-level benchmark suite.
+
+Seeds an isolated SQLite database with src.seed at a configurable scale (by default
+50k foods, 5k recipes with 20 ingredients each and 3 years of planned meals), then
+times the hot service functions, each call in a fresh session like a request.
+Results are printed and can be written as JSON, and compared with an earlier run's
+JSON to catch regressions.
+
+Run from the backend directory:
+    python -m benchmarks.services --output results.json
+    python -m benchmarks.services --baseline results.json --tolerance 1.25
+"""
+
+import argparse
+import datetime as dt
+import json
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import sqlalchemy
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session
+
+from src.food import service
+from src.food.database import Base
+from src.food.models import (
+    CreateRecipeRequest,
+    IngredientRequest,
+    InstructionRequest,
+    UpdateRecipeRequest,
+)
+from src.food.nutrition import nutrition_engine
+from src.food.storage import STORAGE_PROFILES, create_sqlite_engine
+from src.nutrition import compute, service as nutrition_service
+from src.nutrition.models import (
+    ComputeIngredient,
+    ComputeNutritionRequest,
+    IngredientList,
+)
+from src.planner import service as planner_service
+from src.planner.models import DailyTargets, OptimizePlanRequest
+from src.seed import Scale, seed
+from src.shopping import service as shopping_service
+
+UNITS = ("g", "kg", "oz", "lb", "cup", "tbsp", "tsp", "ml")
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark the food services")
+    parser.add_argument("--foods", type=int, default=50_000, help="default: 50000")
+    parser.add_argument("--recipes", type=int, default=5_000, help="default: 5000")
+    parser.add_argument(
+        "--ingredients", type=int, default=20, help="Per recipe (default: 20)"
+    )
+    parser.add_argument(
+        "--instructions", type=int, default=8, help="Per recipe (default: 8)"
+    )
+    parser.add_argument(
+        "--days", type=int, default=3 * 365, help="Days of planned meals"
+    )
+    parser.add_argument(
+        "--foods-per-meal", type=int, default=3, help="Planned foods per meal"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Timed calls per case (default: 5)"
+    )
+    parser.add_argument(
+        "--profile",
+        default="balanced",
+        choices=list(STORAGE_PROFILES),
+        help="Storage profile (default: balanced)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    parser.add_argument(
+        "--baseline", type=Path, help="Compare with the JSON of an earlier run"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.25,
+        help="Fail if a case's median is this many times the baseline's "
+        "(default: 1.25)",
+    )
+    return parser.parse_args()
+
+
+def recipe_request(rng: random.Random, scale: Scale, name: str) -> CreateRecipeRequest:
+    return CreateRecipeRequest(
+        name=name,
+        ingredients=[
+            IngredientRequest(
+                food_id=rng.randint(1, scale.foods),
+                note="",
+                quantity=rng.uniform(1, 500),
+                unit=rng.choice(UNITS),
+            )
+            for _ in range(scale.ingredients)
+        ],
+        instructions=[
+            InstructionRequest(step=step, text=f"Step {step}")
+            for step in range(1, scale.instructions + 1)
+        ],
+        override_nutrition=False,
+        calories=0,
+        fat=0,
+        protein=0,
+        carbohydrates=0,
+    )
+
+
+def cases(scale: Scale, rng: random.Random) -> Dict[str, Callable[[Session], Any]]:
+    """Benchmark name -> one call of the service function under test.
+
+    Writes pick random recipes and foods; reads use fixed ones so every call does
+    the same work.
+    """
+    week_start = scale.start + dt.timedelta(days=scale.days // 2)
+    recipe_id = scale.recipes // 2
+
+    def create_recipe(db_session: Session) -> Any:
+        return service.create_recipe(
+            db_session, recipe_request(rng, scale, "Benchmark recipe")
+        )
+
+    def update_recipe(db_session: Session) -> Any:
+        request = recipe_request(rng, scale, "Benchmark update")
+        return service.update_recipe(
+            db_session,
+            UpdateRecipeRequest(
+                id=rng.randint(1, scale.recipes),
+                ingredients=request.ingredients,
+                instructions=request.instructions,
+            ),
+        )
+
+    plan_request = OptimizePlanRequest(
+        start=week_start,
+        targets=DailyTargets(calories=2200, fat=70, protein=140, carbohydrates=250),
+    )
+
+    # What-if comparison of 100 unsaved ingredient lists
+    compute_request = ComputeNutritionRequest(
+        lists=[
+            IngredientList(
+                ingredients=[
+                    ComputeIngredient(
+                        food_id=i.food_id, quantity=i.quantity, unit=i.unit
+                    )
+                    for i in recipe_request(rng, scale, "").ingredients
+                ]
+            )
+            for _ in range(100)
+        ]
+    )
+
+    def recipe_nutrition(db_session: Session) -> Any:
+        nutrition_engine.clear()
+        return service.get_nutrition(db_session, recipe_id)
+
+    return {
+        "create_recipe": create_recipe,
+        "update_recipe": update_recipe,
+        "get_recipe": lambda s: service.get_recipe(s, recipe_id),
+        "get_recipes": service.get_recipes,
+        "get_recipe_documents": service.get_recipe_documents,
+        "get_nutrition (cold)": recipe_nutrition,
+        "get_planned_foods (week)": lambda s: service.get_planned_foods(
+            s, week_start, week_start + dt.timedelta(days=6)
+        ),
+        "get_planned_foods (month)": lambda s: service.get_planned_foods(
+            s, week_start, week_start + dt.timedelta(days=30)
+        ),
+        "get_daily_nutrition (year)": lambda s: nutrition_service.get_daily_nutrition(
+            s, scale.start, scale.start + dt.timedelta(days=364)
+        ),
+        "get_shopping_list (month)": lambda s: shopping_service.get_shopping_list(
+            s, week_start, week_start + dt.timedelta(days=30)
+        ),
+        "compute_nutrition (x100)": lambda s: compute.compute_nutrition(
+            s, compute_request
+        ),
+        "optimize_plan (week)": lambda s: planner_service.optimize_plan(
+            s, plan_request
+        ),
+        "get_foods (page of 500)": lambda s: list(
+            service.get_foods(s, after_id=scale.foods // 2, limit=500)
+        ),
+        "get_foods (all)": lambda s: sum(1 for _ in service.get_foods(s)),
+        "search_foods": lambda s: service.search_foods(s, "cooked chicken 12", 20),
+    }
+
+
+def time_case(
+    engine: Engine, call: Callable[[Session], Any], repeat: int
+) -> Dict[str, float]:
+    """Call once to warm up, then `repeat` timed calls, each in a fresh session."""
+    samples: List[float] = []
+    for i in range(repeat + 1):
+        with Session(engine) as db_session:
+            start = time.perf_counter()
+            call(db_session)
+            elapsed = time.perf_counter() - start
+        if i:
+            samples.append(elapsed)
+    samples.sort()
+    return {
+        "min": samples[0],
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "max": samples[-1],
+    }
+
+
+def compare(
+    results: Dict[str, Dict[str, float]], baseline_path: Path, tolerance: float
+) -> bool:
+    """Print each case's median against the baseline's; False on a regression."""
+    baseline = json.loads(baseline_path.read_text())["results"]
+    ok = True
+    print(f"\nmedian vs {baseline_path} (tolerance {tolerance:g}x)")
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:>28}: new")
+            continue
+        ratio = result["median"] / baseline[name]["median"]
+        regressed = ratio > tolerance
+        ok &= not regressed
+        print(f"{name:>28}: {ratio:6.2f}x {'REGRESSION' if regressed else ''}")
+    return ok
+
+
+def main() -> None:
+    args = parse_arguments()
+    scale = Scale(
+        foods=args.foods,
+        recipes=args.recipes,
+        ingredients=args.ingredients,
+        instructions=args.instructions,
+        days=args.days,
+        foods_per_meal=args.foods_per_meal,
+    )
+    rng = random.Random(args.seed)
+
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_sqlite_engine(
+            f"sqlite:///{Path(directory) / 'bench.db'}", args.profile
+        )
+        Base.metadata.create_all(engine)
+        start = time.perf_counter()
+        with Session(engine) as db_session:
+            seed(db_session, scale, args.seed)
+        seed_seconds = time.perf_counter() - start
+        print(f"seeded {scale} in {seed_seconds:.1f}s")
+
+        for name, call in cases(scale, rng).items():
+            results[name] = time_case(engine, call, args.repeat)
+            print(
+                f"{name:>28}: median {results[name]['median'] * 1000:10.2f} ms, "
+                f"min {results[name]['min'] * 1000:10.2f} ms"
+            )
+        engine.dispose()
+
+    if args.output:
+        args.output.write_text(
+            json.dumps(
+                {
+                    "created": dt.datetime.now(dt.timezone.utc).isoformat(),
+                    "scale": asdict(scale),
+                    "profile": args.profile,
+                    "repeat": args.repeat,
+                    "seed_seconds": seed_seconds,
+                    "environment": {
+                        "python": platform.python_version(),
+                        "sqlalchemy": sqlalchemy.__version__,
+                        "sqlite": sqlite3.sqlite_version,
+                        "platform": platform.platform(),
+                    },
+                    "results": results,
+                },
+                indent=2,
+                default=str,
+            )
+        )
+        print(f"wrote {args.output}")
+
+    baseline: Optional[Path] = args.baseline
+    if baseline is not None and not compare(results, baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+N+1 query check for the read paths.
+
+Runs every read the GET routes perform, including serializing the result (where
+lazy loads fire), against a small and a large database, counting SQL statements
+with src.food.statement_budget. A read whose statement count grows with the data
+has an N+1 and fails the check. Exits non-zero on failure.
+
+Run from the backend directory:
+    python -m benchmarks.statement_counts
+"""
+
+import argparse
+import datetime as dt
+import sys
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from src.food import service, statement_budget
+from src.food.constants import MealType
+from src.food.database import Base
+from src.food.food_matrix import food_matrix
+from src.food.models import (
+    CreateFoodRequest,
+    CreatePlannedFoodRequest,
+    CreateRecipeRequest,
+    FoodResponse,
+    IngredientRequest,
+    InstructionRequest,
+    PlannedFoodResponse,
+    RecipeResponse,
+)
+from src.food.nutrition import nutrition_engine
+from src.food.serialization import dump_documents, dump_list
+from src.nutrition import service as nutrition_service
+from src.nutrition.models import DailyNutritionResponse
+from src.shopping import service as shopping_service
+from src.shopping.models import ShoppingListItem
+
+START = dt.date(2026, 1, 1)
+END = dt.date(2026, 12, 31)
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Check reads for N+1 queries")
+    parser.add_argument(
+        "--small", type=int, default=3, help="Recipes in the small database"
+    )
+    parser.add_argument(
+        "--large", type=int, default=30, help="Recipes in the large database"
+    )
+    return parser.parse_args()
+
+
+def seed(db_session: Session, recipes: int) -> None:
+    foods = [
+        service.create_food(
+            db_session=db_session,
+            request=CreateFoodRequest(
+                name=f"Food {i}",
+                serving_size=100.0,
+                serving_size_unit="g",
+                calories=i,
+                fat=1,
+                protein=1,
+                carbohydrates=1,
+            ),
+        )
+        for i in range(recipes * 2)
+    ]
+    for i in range(recipes):
+        recipe = service.create_recipe(
+            db_session=db_session,
+            request=CreateRecipeRequest(
+                name=f"Recipe {i}",
+                ingredients=[
+                    IngredientRequest(
+                        food_id=foods[(i + j) % len(foods)].id,
+                        note="",
+                        quantity=100.0,
+                        unit="g",
+                    )
+                    for j in range(3)
+                ],
+                instructions=[InstructionRequest(step=1, text="Cook")],
+                override_nutrition=False,
+                calories=0,
+                fat=0,
+                protein=0,
+                carbohydrates=0,
+            ),
+        )
+        assert recipe is not None
+        service.create_planned_food(
+            db_session=db_session,
+            request=CreatePlannedFoodRequest(
+                date=START + dt.timedelta(days=i),
+                meal=MealType.DINNER,
+                servings=1.0,
+                food_id=recipe.food.id,
+            ),
+        )
+
+
+READS: Dict[str, Callable[[Session], object]] = {
+    "recipes": lambda s: dump_documents(service.get_recipe_documents(s)),
+    "recipes (ORM)": lambda s: dump_list(RecipeResponse, service.get_recipes(s)),
+    "recipe": lambda s: RecipeResponse.model_validate(service.get_recipe(s, 1)),
+    "recipe nutrition": lambda s: service.get_nutrition(s, 1),
+    "foods": lambda s: list(service.get_foods(s)),
+    "food search": lambda s: dump_list(
+        FoodResponse, service.search_foods(s, "food", 100)
+    ),
+    "planned foods": lambda s: dump_list(
+        PlannedFoodResponse, service.get_planned_foods(s, START, END)
+    ),
+    "daily nutrition": lambda s: dump_list(
+        DailyNutritionResponse,
+        nutrition_service.get_daily_nutrition(s, START, END, by_meal=True),
+    ),
+    "shopping list": lambda s: dump_list(
+        ShoppingListItem, shopping_service.get_shopping_list(s, START, END)
+    ),
+    "sync": lambda s: service.get_changes(s),
+    "sync (delta)": lambda s: service.get_changes(s, 1),
+}
+
+
+def count_reads(recipes: int) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{Path(directory) / 'check.db'}")
+        statement_budget.track(engine)
+        Base.metadata.create_all(engine)
+        with Session(engine) as db_session:
+            seed(db_session, recipes)
+        for name, read in READS.items():
+            nutrition_engine.clear()
+            food_matrix.clear()
+            with Session(engine) as db_session:
+                with statement_budget.count_statements() as counter:
+                    read(db_session)
+            counts[name] = counter.count
+        engine.dispose()
+    return counts
+
+
+def main() -> None:
+    args = parse_arguments()
+    small = count_reads(args.small)
+    large = count_reads(args.large)
+
+    failures: List[Tuple[str, int, int]] = []
+    print(f"{'read':>18} {args.small:>6} {args.large:>6}  (recipes)")
+    for name in READS:
+        ok = small[name] == large[name]
+        if not ok:
+            failures.append((name, small[name], large[name]))
+        print(f"{name:>18} {small[name]:>6} {large[name]:>6}  {'ok' if ok else 'N+1'}")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+SQLite storage profile benchmark.
+
+For each profile in src.food.storage, runs concurrent clients against a fresh
+database for a fixed time. Each client repeatedly either plans a food through
+service.create_planned_food (one committed write, including the daily nutrition
+update) or reads a week of planned foods through service.get_planned_foods, with
+its own session per operation like a request. Reports reads and writes per second
+and how many operations failed with "database is locked".
+
+Run from the backend directory:
+    python -m benchmarks.storage_profiles --clients 8 --seconds 5
+"""
+
+import argparse
+import datetime as dt
+import random
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+from sqlalchemy import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from src.food import service
+from src.food.constants import MealType
+from src.food.database import Base, Food
+from src.food.models import CreatePlannedFoodRequest
+from src.food.storage import STORAGE_PROFILES, create_sqlite_engine
+
+START = dt.date(2026, 1, 1)
+FOODS = 100
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Benchmark SQLite storage profiles")
+    parser.add_argument(
+        "--profiles",
+        nargs="+",
+        default=list(STORAGE_PROFILES),
+        choices=list(STORAGE_PROFILES),
+        help="Profiles to run (default: all)",
+    )
+    parser.add_argument(
+        "--clients", type=int, default=8, help="Concurrent clients (default: 8)"
+    )
+    parser.add_argument(
+        "--seconds", type=float, default=5.0, help="Duration per profile (default: 5)"
+    )
+    parser.add_argument(
+        "--write-fraction",
+        type=float,
+        default=0.3,
+        help="Share of operations that are writes (default: 0.3)",
+    )
+    return parser.parse_args()
+
+
+@dataclass
+class Counts:
+    reads: int = 0
+    writes: int = 0
+    locked: int = 0
+
+
+def seed(engine: Engine) -> None:
+    Base.metadata.create_all(engine)
+    with Session(engine) as db_session:
+        db_session.execute(
+            Food.__table__.insert(),
+            [
+                {
+                    "name": f"Food {i}",
+                    "serving_size": 100.0,
+                    "serving_size_unit": "g",
+                    "calories": i,
+                    "fat": 1,
+                    "protein": 1,
+                    "carbohydrates": 1,
+                }
+                for i in range(1, FOODS + 1)
+            ],
+        )
+        db_session.commit()
+
+
+def client(
+    engine: Engine, deadline: float, write_fraction: float, counts: Counts
+) -> None:
+    rng = random.Random(threading.get_ident())
+    while time.perf_counter() < deadline:
+        day = START + dt.timedelta(days=rng.randrange(365))
+        try:
+            with Session(engine) as db_session:
+                if rng.random() < write_fraction:
+                    service.create_planned_food(
+                        db_session=db_session,
+                        request=CreatePlannedFoodRequest(
+                            date=day,
+                            meal=rng.choice(list(MealType)),
+                            servings=1.0,
+                            food_id=rng.randint(1, FOODS),
+                        ),
+                    )
+                    counts.writes += 1
+                else:
+                    service.get_planned_foods(
+                        db_session=db_session,
+                        start_date=day,
+                        end_date=day + dt.timedelta(days=6),
+                    )
+                    counts.reads += 1
+        except OperationalError as e:
+            if "locked" not in str(e):
+                raise
+            counts.locked += 1
+
+
+def run(profile: str, clients: int, seconds: float, write_fraction: float) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_sqlite_engine(
+            f"sqlite:///{Path(directory) / 'bench.db'}", profile
+        )
+        seed(engine)
+
+        per_client: List[Counts] = [Counts() for _ in range(clients)]
+        deadline = time.perf_counter() + seconds
+        threads = [
+            threading.Thread(
+                target=client, args=(engine, deadline, write_fraction, counts)
+            )
+            for counts in per_client
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        engine.dispose()
+
+    reads = sum(counts.reads for counts in per_client)
+    writes = sum(counts.writes for counts in per_client)
+    locked = sum(counts.locked for counts in per_client)
+    print(
+        f"{profile:>10}: {reads / elapsed:9.0f} reads/s {writes / elapsed:9.0f} "
+        f"writes/s {locked:6} locked"
+    )
+
+
+def main() -> None:
+    args = parse_arguments()
+    print(
+        f"{args.clients} clients, {args.seconds:g}s per profile, "
+        f"{args.write_fraction:.0%} writes"
+    )
+    for profile in args.profiles:
+        run(profile, args.clients, args.seconds, args.write_fraction)
+
+
+if __name__ == "__main__":
+    main()
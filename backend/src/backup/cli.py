@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Export the database as NDJSON, or import an export into it.
+
+Run from the backend directory:
+    python -m src.backup.cli export backup.ndjson   # or to stdout without a path
+    python -m src.backup.cli import backup.ndjson   # or from stdin without a path
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, BinaryIO, Iterator, List
+
+from src.backup import service
+from src.food.constants import BULK_INSERT_CHUNK_SIZE
+from src.food.database import ReadSessionLocal, SessionLocal
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Export or import the database")
+    parser.add_argument("command", choices=("export", "import"))
+    parser.add_argument(
+        "path", nargs="?", help="NDJSON file (default: stdout or stdin)"
+    )
+    return parser.parse_args()
+
+
+def read_lines(file: BinaryIO) -> Iterator[Any]:
+    """Parse NDJSON line by line; invalid lines are yielded as their ValueError."""
+    for line in file:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield e
+
+
+def export(file: BinaryIO) -> None:
+    with ReadSessionLocal() as db_session:
+        for chunk in service.export_lines(db_session):
+            file.write(chunk)
+
+
+def import_(file: BinaryIO) -> int:
+    with SessionLocal() as db_session:
+        importer = service.Importer(db_session)
+        lines: List[Any] = []
+        try:
+            for line in read_lines(file):
+                lines.append(line)
+                if len(lines) == BULK_INSERT_CHUNK_SIZE:
+                    importer.add(lines)
+                    lines = []
+            importer.add(lines)
+            imported = importer.finish()
+        except service.ImportFormatError as e:
+            print(e, file=sys.stderr)
+            return 1
+        db_session.commit()
+
+    for table, count in imported.items():
+        print(f"{table:>20}: {count:>10} rows")
+    return 0
+
+
+def main() -> int:
+    args = parse_arguments()
+    if args.command == "export":
+        if args.path is None:
+            export(sys.stdout.buffer)
+        else:
+            with open(args.path, "wb") as file:
+                export(file)
+        return 0
+
+    if args.path is None:
+        return import_(sys.stdin.buffer)
+    with open(args.path, "rb") as file:
+        return import_(file)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
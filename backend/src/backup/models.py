@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+
+class ImportResponse(BaseModel):
+    # Rows imported per table
+    imported: dict[str, int]
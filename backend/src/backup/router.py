@@ -0,0 +1,60 @@
+from typing import Any, Iterator, List
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from src.backup import service
+from src.backup.models import ImportResponse
+from src.food.constants import BULK_INSERT_CHUNK_SIZE
+from src.food.database import get_db_session, open_read_db_session
+from src.food.router import read_json_items
+
+router = APIRouter()
+
+
+@router.get("/export")
+def export_database(
+    db_session: Session = Depends(open_read_db_session),
+) -> StreamingResponse:
+    """Stream every table as NDJSON, for backups and moving to another instance."""
+
+    def stream() -> Iterator[bytes]:
+        try:
+            yield from service.export_lines(db_session)
+        finally:
+            db_session.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="private-chef.ndjson"'},
+    )
+
+
+@router.post("/import", response_model=ImportResponse)
+async def import_database(
+    request: Request, db_session: Session = Depends(get_db_session)
+) -> ImportResponse:
+    """Add the rows of an NDJSON export to this database, in one transaction.
+
+    Imported rows get new IDs after the existing ones, so nothing is overwritten. Any
+    invalid line, or a missing or mismatched end record, rejects the whole import.
+    The upload is checked as it arrives and only written once complete, so other
+    writers aren't held up while it is sent.
+    """
+    importer = service.Importer(db_session)
+    lines: List[Any] = []
+    try:
+        async for _, line in read_json_items(request):
+            lines.append(line)
+            if len(lines) == BULK_INSERT_CHUNK_SIZE:
+                await run_in_threadpool(importer.add, lines)
+                lines = []
+        await run_in_threadpool(importer.add, lines)
+        imported = await run_in_threadpool(importer.finish)
+    except service.ImportFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await run_in_threadpool(db_session.commit)
+    return ImportResponse(imported=imported)
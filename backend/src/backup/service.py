@@ -0,0 +1,310 @@
+"""
+Whole-database export and import as NDJSON.
+
+An export is a header line, one line per row, table by table, and an end record
+with the number of rows of every table:
+
+    {"format": "private-chef-export", "version": 2}
+    {"table": "recipe", "row": {"id": 1, "name": "Soup", "override_nutrition": false}}
+    {"table": "food", "row": {"id": 1, "name": "Soup", "source_recipe_id": 1, ...}}
+    {"end": {"recipe": 1, "food": 1, ...}}
+
+A truncated upload or file therefore fails to import instead of loading part of
+the data. Version 1 exports have no end record and are imported without the check.
+
+Rows are read with yield_per cursors and encoded batch by batch, so memory stays
+flat however large the database. Imports insert in chunks and never hold more than
+one chunk either: instead of mapping every old ID to a new one, each table's IDs are
+shifted past the largest ID already in it, and foreign keys by the shift of the
+table they reference. An export can therefore be loaded into a database that already
+has data without collisions.
+"""
+
+from collections import defaultdict
+import datetime as dt
+import enum
+import json
+import tempfile
+from typing import (
+    Any,
+    Callable,
+    DefaultDict,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from pydantic_core import to_json
+from sqlalchemy import Table, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.food.constants import BULK_INSERT_CHUNK_SIZE, STREAM_BATCH_SIZE
+from src.food.database import (
+    Food,
+    Inventory,
+    PlannedFood,
+    Recipe,
+    RecipeIngredient,
+    RecipeInstruction,
+    food_search,
+)
+from src.food.service import bump_revisions
+from src.nutrition.service import replace_daily_nutrition
+
+EXPORT_FORMAT = "private-chef-export"
+EXPORT_VERSION = 2
+# Versions that can be imported; 1 has no end record
+IMPORT_VERSIONS = (1, 2)
+# Validated lines are buffered in memory up to this many bytes, then on disk
+SPOOL_MAX_MEMORY = 16 * 1024 * 1024
+
+# In export order. Every table has an integer `id`; derived tables (the search
+# index, daily_nutrition, table_revision) are rebuilt on import instead.
+TABLES: Dict[str, Table] = {
+    model.__tablename__: model.__table__
+    for model in (
+        Recipe,
+        Food,
+        RecipeIngredient,
+        RecipeInstruction,
+        PlannedFood,
+        Inventory,
+    )
+}
+
+
+class ImportFormatError(ValueError):
+    """A line of an import is not a valid export line."""
+
+    def __init__(self, index: int, message: str):
+        self.index = index
+        super().__init__(f"Line {index + 1}: {message}")
+
+
+def export_lines(db_session: Session) -> Iterator[bytes]:
+    """Stream the database as NDJSON, one chunk per batch of rows.
+
+    Args:
+        db_session: Database session, which must stay open while iterating
+    """
+    # Every table's SELECT runs in the session's one transaction and so reads the
+    # same snapshot, so foreign keys in the export resolve
+    yield to_json({"format": EXPORT_FORMAT, "version": EXPORT_VERSION}) + b"\n"
+    counts: Dict[str, int] = {}
+    for name, table in TABLES.items():
+        counts[name] = 0
+        result = db_session.execute(
+            select(table)
+            .order_by(*table.primary_key.columns)
+            .execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        for rows in result.mappings().partitions():
+            counts[name] += len(rows)
+            yield b"".join(
+                to_json({"table": name, "row": dict(row)}) + b"\n" for row in rows
+            )
+    yield to_json({"end": counts}) + b"\n"
+
+
+def _converters(table: Table) -> Dict[str, Callable[[Any], Any]]:
+    # JSON has no dates or enums; their columns need Python values back
+    converters: Dict[str, Callable[[Any], Any]] = {}
+    for column in table.columns:
+        python_type = column.type.python_type
+        if python_type is dt.date:
+            converters[column.name] = dt.date.fromisoformat
+        elif issubclass(python_type, enum.Enum):
+            converters[column.name] = python_type
+    return converters
+
+
+def _shifts(offsets: Dict[str, int]) -> Dict[str, List[Tuple[str, int]]]:
+    """(column, offset) of the columns of each table that hold an ID, given the
+    offset of every table's IDs."""
+    return {
+        name: [
+            (column.name, offsets[fk.column.table.name])
+            for column in table.columns
+            for fk in column.foreign_keys
+        ]
+        + [("id", offsets[name])]
+        for name, table in TABLES.items()
+    }
+
+
+class Importer:
+    """Validate the lines of an export, then insert them in chunks. Does not commit.
+
+    Feed every line, in order, to `add`, then call `finish` once. `add` only checks
+    and spools the lines, without touching the database, so however slow the upload,
+    other writers only wait for `finish`: it takes the write lock, inserts, and holds
+    the lock until the session commits or rolls back.
+    """
+
+    def __init__(self, db_session: Session, chunk_size: int = BULK_INSERT_CHUNK_SIZE):
+        self.db_session = db_session
+        self.chunk_size = chunk_size
+        self.counts: DefaultDict[str, int] = defaultdict(int)
+        self._converters = {name: _converters(table) for name, table in TABLES.items()}
+        self._spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+        self._lines = 0
+        self._version: Optional[int] = None
+        # Rows per table, and those the end record says the export has
+        self._rows: DefaultDict[str, int] = defaultdict(int)
+        self._end: Optional[Dict[str, int]] = None
+        # Set by `finish` once it holds the write lock; until then rows are only
+        # checked, with every ID shifted by 0
+        self._revision = 0
+        self._shifts = _shifts({name: 0 for name in TABLES})
+        self._table: Optional[str] = None
+        self._pending: List[Dict[str, Any]] = []
+        # Line index of the first pending row
+        self._pending_start = 0
+
+    def add(self, lines: Iterable[Any]) -> None:
+        """Check parsed export lines and spool them for `finish`.
+
+        Raises:
+            ImportFormatError: if a line isn't a header, row of a known table or end
+                record where one is expected
+        """
+        for line in lines:
+            index = self._lines
+            self._lines += 1
+            if isinstance(line, ValueError):
+                raise ImportFormatError(index, str(line))
+            if index == 0:
+                self._check_header(line)
+                continue
+            if self._end is not None:
+                raise ImportFormatError(index, "line after the end record")
+            if isinstance(line, dict) and "end" in line:
+                self._check_end(index, line["end"])
+                continue
+            if not isinstance(line, dict) or not isinstance(line.get("row"), dict):
+                raise ImportFormatError(index, "expected a table and a row object")
+            name = line.get("table")
+            if name not in TABLES:
+                raise ImportFormatError(index, f"unknown table {name!r}")
+            self._convert(index, name, line["row"])
+            self._rows[name] += 1
+            self._spool.write(to_json(line) + b"\n")
+
+    def finish(self) -> Dict[str, int]:
+        """Insert the spooled rows and rebuild derived tables.
+
+        Returns:
+            Rows imported per table
+
+        Raises:
+            ImportFormatError: if the import is empty or truncated, or its rows
+                conflict with each other
+        """
+        if self._lines == 0:
+            raise ImportFormatError(0, "empty import")
+        if self._version != 1:
+            if self._end is None:
+                raise ImportFormatError(self._lines, "truncated import: no end record")
+            for name in TABLES:
+                expected, found = self._end.get(name, 0), self._rows[name]
+                if expected != found:
+                    raise ImportFormatError(
+                        self._lines - 1,
+                        f"truncated import: the end record counts {expected} {name} "
+                        f"rows, found {found}",
+                    )
+
+        self._lock()
+        with self._spool:
+            self._spool.seek(0)
+            # Rows come after the header
+            for index, raw in enumerate(self._spool, start=1):
+                line = json.loads(raw)
+                name = line["table"]
+                if name != self._table or len(self._pending) == self.chunk_size:
+                    self._flush()
+                    self._table = name
+                    self._pending_start = index
+                self._pending.append(self._convert(index, name, line["row"]))
+            self._flush()
+        replace_daily_nutrition(self.db_session)
+        return {name: self.counts[name] for name in TABLES}
+
+    def _lock(self) -> None:
+        db_session = self.db_session
+        # Take the write lock before reading the largest IDs, so no other writer can
+        # take the IDs the import is shifted into
+        db_session.connection(execution_options={"sqlite_begin": "IMMEDIATE"})
+        # Imported rows are new writes as far as delta sync is concerned
+        self._revision = bump_revisions(db_session, *TABLES)
+        self._shifts = _shifts(
+            {
+                name: db_session.scalar(select(func.max(table.c.id))) or 0
+                for name, table in TABLES.items()
+            }
+        )
+
+    def _check_header(self, line: Any) -> None:
+        if not isinstance(line, dict) or line.get("format") != EXPORT_FORMAT:
+            raise ImportFormatError(0, f"expected a {EXPORT_FORMAT} header")
+        if line.get("version") not in IMPORT_VERSIONS:
+            raise ImportFormatError(
+                0, f"unsupported export version {line.get('version')!r}"
+            )
+        self._version = line["version"]
+
+    def _check_end(self, index: int, counts: Any) -> None:
+        if (
+            self._version == 1
+            or not isinstance(counts, dict)
+            or not all(
+                name in TABLES and type(count) is int for name, count in counts.items()
+            )
+        ):
+            raise ImportFormatError(index, "invalid end record")
+        self._end = counts
+
+    def _convert(self, index: int, name: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        table = TABLES[name]
+        unknown = row.keys() - table.columns.keys()
+        if unknown:
+            raise ImportFormatError(index, f"unknown {name} columns {sorted(unknown)}")
+        # Every row of a chunk needs the same keys for executemany
+        converted = {column: row.get(column) for column in table.columns.keys()}
+        try:
+            for column, convert in self._converters[name].items():
+                if converted[column] is not None:
+                    converted[column] = convert(converted[column])
+            for column, offset in self._shifts[name]:
+                if converted[column] is not None:
+                    converted[column] = int(converted[column]) + offset
+        except (TypeError, ValueError) as e:
+            raise ImportFormatError(index, f"invalid {name} row: {e}") from None
+        if "revision" in converted:
+            converted["revision"] = self._revision
+        if converted["id"] is None:
+            raise ImportFormatError(index, f"{name} row has no id")
+        return converted
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        assert self._table is not None
+        try:
+            self.db_session.execute(insert(TABLES[self._table]), self._pending)
+        except IntegrityError as e:
+            raise ImportFormatError(
+                self._pending_start,
+                f"{self._table} rows from here on conflict: {e.orig}",
+            ) from None
+        if self._table == "food":
+            self.db_session.execute(
+                insert(food_search),
+                [{"rowid": row["id"], "name": row["name"]} for row in self._pending],
+            )
+        self.counts[self._table] += len(self._pending)
+        self._pending = []
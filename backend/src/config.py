@@ -1,12 +1,45 @@
 # TODO: pydantic_settings
+from typing import Optional
+import os
+
+from sqlalchemy import make_url
+
 from src.constants import Environment
 
 
 class Config:
     DATABASE_URL: str = "sqlite:///./private_chef.db"
+    # PRAGMAs and pool settings for every connection, see src.food.storage
+    STORAGE_PROFILE: str = "balanced"
+    # Connections kept for GET routes, which use their own read-only pool
+    READ_POOL_SIZE: int = 20
+    # Test mode: fail any request that issues more SQL statements than this, to catch
+    # N+1 queries. None disables the check. Read at import, from the environment
+    # variable of the same name.
+    MAX_STATEMENTS_PER_REQUEST: Optional[int] = (
+        int(os.environ["MAX_STATEMENTS_PER_REQUEST"])
+        if os.environ.get("MAX_STATEMENTS_PER_REQUEST")
+        else None
+    )
+    # Per-route request and SQL metrics at /api/_metrics
+    METRICS_ENABLED: bool = True
+    # SQL statements taking at least this long are logged with their parameters
+    SLOW_QUERY_MS: float = 100.0
+    # Serve the read-heavy routes (recipes, search, planned foods, nutrition
+    # summaries) from async handlers on an aiosqlite engine instead of the threadpool
+    ASYNC_DATABASE: bool = False
     ENVIRONMENT: Environment = Environment.Development
     HOST: str = "0.0.0.0"
     PORT: int = 8000
 
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        """DATABASE_URL through the aiosqlite driver."""
+        return (
+            make_url(self.DATABASE_URL)
+            .set(drivername="sqlite+aiosqlite")
+            .render_as_string(hide_password=False)
+        )
+
 
 settings = Config()
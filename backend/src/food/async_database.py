@@ -0,0 +1,33 @@
+"""
+Async engine and session dependency, used by the async routes when
+settings.ASYNC_DATABASE is enabled. Kept apart from src.food.database so the sync
+app never needs the async driver installed.
+"""
+
+from typing import AsyncGenerator
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.config import settings
+from src.food import metrics, statement_budget
+from src.food.storage import create_async_sqlite_engine
+
+# The async routes only read, so the pool is read-only like the sync read pool
+async_engine = create_async_sqlite_engine(
+    settings.ASYNC_DATABASE_URL,
+    settings.STORAGE_PROFILE,
+    read_only=True,
+    pool_size=settings.READ_POOL_SIZE,
+)
+if settings.MAX_STATEMENTS_PER_REQUEST is not None:
+    statement_budget.track(async_engine.sync_engine)
+if settings.METRICS_ENABLED:
+    metrics.track(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
+
+async def get_async_db_session() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,95 @@
+"""
+Async variants of the food router's read routes, mounted ahead of it when
+settings.ASYNC_DATABASE is enabled so they take precedence. Requests wait on the
+database without holding a threadpool worker.
+"""
+
+from typing import List
+import datetime as dt
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.food import async_service
+from src.food.async_database import get_async_db_session
+from src.food.cache import (
+    cache_headers,
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+    response_cache,
+)
+from src.food.models import (
+    FoodResponse,
+    Nutrition,
+    PlannedFoodResponse,
+    RecipeResponse,
+)
+from src.food.nutrition import NutritionCycleError
+from src.food.serialization import dump_documents, json_list_response, json_response
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/foods/search", response_model=List[FoodResponse])
+async def search_foods(
+    q: str = Query(min_length=1),
+    limit: int = Query(default=20, gt=0, le=100),
+    db_session: AsyncSession = Depends(get_async_db_session),
+) -> Response:
+    """Typeahead search over food names, best matches first."""
+    foods = await async_service.search_foods(
+        db_session=db_session, query=q, limit=limit
+    )
+    return json_list_response(FoodResponse, foods)
+
+
+@router.get("/recipes", response_model=List[RecipeResponse])
+async def get_recipes(
+    request: Request, db_session: AsyncSession = Depends(get_async_db_session)
+) -> Response:
+    """Get all recipes. Responses carry an ETag and honour If-None-Match."""
+    revisions = await async_service.get_revisions(db_session, "food", "recipe")
+    etag = make_etag(request, revisions)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    body = response_cache.get(etag)
+    if body is None:
+        body = dump_documents(await async_service.get_recipe_documents(db_session))
+        response_cache.put(etag, body)
+    return json_response(body, headers=cache_headers(etag))
+
+
+@router.get("/recipes/{recipe_id}/nutrition", response_model=Nutrition)
+async def get_recipe_nutrition(
+    recipe_id: int, db_session: AsyncSession = Depends(get_async_db_session)
+) -> Nutrition:
+    """Get a recipe's per-serving nutrition, rolled up from its ingredients."""
+    try:
+        nutrition = await async_service.get_nutrition(
+            db_session=db_session, recipe_id=recipe_id
+        )
+    except NutritionCycleError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if nutrition is None:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    return nutrition
+
+
+@router.get("/planned-foods", response_model=List[PlannedFoodResponse])
+async def get_planned_foods(
+    start: dt.date,
+    end: dt.date,
+    db_session: AsyncSession = Depends(get_async_db_session),
+) -> Response:
+    """Get planned foods between two dates, inclusive of both ends."""
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    planned_foods = await async_service.get_planned_foods(
+        db_session=db_session, start_date=start, end_date=end
+    )
+    return json_list_response(PlannedFoodResponse, planned_foods)
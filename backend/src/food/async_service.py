@@ -0,0 +1,45 @@
+"""
+Async versions of the read paths in src.food.service.
+Statements are shared with the sync service, so both return the same rows with the
+same relationships loaded. Reads that go through the nutrition engine run the sync
+code with AsyncSession.run_sync, which still awaits the driver for every statement.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+import datetime as dt
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.food import service
+from src.food.database import Food, PlannedFood
+from src.food.models import Nutrition
+
+
+async def get_revisions(db_session: AsyncSession, *tables: str) -> Tuple[int, ...]:
+    return await db_session.run_sync(service.get_revisions, *tables)
+
+
+async def search_foods(db_session: AsyncSession, query: str, limit: int) -> List[Food]:
+    statement = service.search_query(query, limit)
+    if statement is None:
+        return []
+    return list(await db_session.scalars(statement))
+
+
+async def get_recipe_documents(db_session: AsyncSession) -> List[Dict[str, Any]]:
+    return await db_session.run_sync(service.get_recipe_documents)
+
+
+async def get_nutrition(
+    db_session: AsyncSession, recipe_id: int
+) -> Optional[Nutrition]:
+    """Raises NutritionCycleError like service.get_nutrition."""
+    return await db_session.run_sync(service.get_nutrition, recipe_id)
+
+
+async def get_planned_foods(
+    db_session: AsyncSession, start_date: dt.date, end_date: dt.date
+) -> List[PlannedFood]:
+    return list(
+        await db_session.scalars(service.planned_food_query(start_date, end_date))
+    )
@@ -0,0 +1,78 @@
+"""
+Conditional GET support for catalog listings.
+Every service-layer write bumps the revision of the tables it touches (see
+service.bump_revisions), so a listing's ETag can be derived from the revisions of the
+tables it reads without touching the rows. Serialized bodies are kept in memory
+keyed by ETag; entries for old revisions simply age out.
+"""
+
+from collections import OrderedDict
+import hashlib
+import threading
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+from fastapi import Request, Response
+
+# Serialized listings kept in memory
+MAX_ENTRIES = 64
+
+
+class ResponseCache:
+    """LRU cache of serialized response bodies keyed by ETag."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES) -> None:
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._max_entries = max_entries
+
+    def get(self, etag: str) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(etag)
+            if body is not None:
+                self._entries.move_to_end(etag)
+            return body
+
+    def put(self, etag: str, body: bytes) -> None:
+        with self._lock:
+            self._entries[etag] = body
+            self._entries.move_to_end(etag)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def capture(self, etag: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Pass a streamed body through, caching it once it has been fully sent."""
+        body: List[bytes] = []
+        for chunk in chunks:
+            body.append(chunk)
+            yield chunk
+        self.put(etag, b"".join(body))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+response_cache = ResponseCache()
+
+
+def make_etag(request: Request, revisions: Sequence[int]) -> str:
+    """Strong ETag for this URL (path and query) at the given table revisions."""
+    key = f"{request.url.path}?{request.url.query}|{','.join(map(str, revisions))}"
+    return '"' + hashlib.blake2b(key.encode(), digest_size=12).hexdigest() + '"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates or "*" in candidates
+
+
+def cache_headers(etag: str) -> dict[str, str]:
+    # Clients may keep the body but must revalidate it on every use
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag))
@@ -7,8 +7,29 @@ class FoodState(str, Enum):
     READY = "READY"
 
 
+class Dimension(str, Enum):
+    MASS = "MASS"
+    VOLUME = "VOLUME"
+    COUNT = "COUNT"
+    # Servings of whatever food is measured, 1:1 whatever its serving unit
+    SERVING = "SERVING"
+
+
 class MealType(str, Enum):
     BREAKFAST = "BREAKFAST"
     LUNCH = "LUNCH"
     DINNER = "DINNER"
     SNACK = "SNACK"
+
+
+# Rows fetched per round trip when streaming large result sets
+STREAM_BATCH_SIZE = 500
+
+# Rows per INSERT statement for bulk writes
+BULK_INSERT_CHUNK_SIZE = 1000
+
+# table_revision row counting writes to any table, the revision rows are stamped with
+ANY_TABLE = "*"
+
+# Nutrition columns of Food, in the order totals and matrices hold them
+NUTRIENTS = ("calories", "fat", "protein", "carbohydrates")
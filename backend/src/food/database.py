@@ -1,5 +1,19 @@
 from typing import Any, Generator, List, Optional
-from sqlalchemy import Boolean, Date, Enum, ForeignKey, Integer, Float, String
+from sqlalchemy import (
+    DDL,
+    Boolean,
+    Date,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    Float,
+    String,
+    UniqueConstraint,
+    column,
+    event,
+    table,
+)
 from sqlalchemy.orm import (
     DeclarativeBase,
     Mapped,
@@ -12,19 +26,57 @@ import datetime as dt
 
 from src.food.constants import FoodState, MealType
 from src.config import settings
-from sqlalchemy import create_engine
+from src.food import metrics, statement_budget
+from src.food.storage import create_sqlite_engine
+
+# Writes go through `engine`; reads get their own pool of read-only connections so
+# long catalog reads never wait on writers for a connection
+engine = create_sqlite_engine(settings.DATABASE_URL, settings.STORAGE_PROFILE)
+read_engine = create_sqlite_engine(
+    settings.DATABASE_URL,
+    settings.STORAGE_PROFILE,
+    read_only=True,
+    pool_size=settings.READ_POOL_SIZE,
+)
 
-engine = create_engine(settings.DATABASE_URL)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+if settings.MAX_STATEMENTS_PER_REQUEST is not None:
+    statement_budget.track(engine)
+    statement_budget.track(read_engine)
+if settings.METRICS_ENABLED:
+    metrics.track(engine)
+    metrics.track(read_engine)
 
 
 def get_db_session() -> Generator[Session, Any, Any]:
-    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    """Session for routes that write."""
+    db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
 
 
+def get_read_db_session() -> Generator[Session, Any, Any]:
+    """Session on the read-only pool, for routes that only read."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def open_read_db_session() -> Session:
+    """Session on the read-only pool for routes that stream their response.
+
+    Dependencies are torn down before a streamed body is sent, so this one doesn't
+    close the session: the route's stream must.
+    """
+    return ReadSessionLocal()
+
+
 class Base(DeclarativeBase):
     pass
 
@@ -43,16 +95,33 @@ class Food(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String)
     source_recipe_id: Mapped[Optional[int]] = mapped_column(
-        ForeignKey("recipe.id", ondelete="CASCADE")
+        ForeignKey("recipe.id", ondelete="CASCADE"), index=True
     )
     source_recipe: Mapped[Optional["Recipe"]] = relationship(back_populates="food")
 
     serving_size: Mapped[float] = mapped_column(Float)
     serving_size_unit: Mapped[str] = mapped_column(String)
+    # g/ml, lets volume and mass quantities of this food be converted
+    density: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     calories: Mapped[int] = mapped_column(Integer)
     fat: Mapped[int] = mapped_column(Integer)
     protein: Mapped[int] = mapped_column(Integer)
     carbohydrates: Mapped[int] = mapped_column(Integer)
+    # Revision of the last write to this row, see TableRevision
+    revision: Mapped[int] = mapped_column(Integer, default=0, index=True)
+
+
+# Full-text index over Food.name, keyed by food ID (rowid). It is not part of the
+# ORM metadata; the food service keeps it in sync on every write.
+FOOD_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS food_search USING fts5("
+    "name, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+food_search = table("food_search", column("rowid", Integer), column("name", String))
+
+event.listen(
+    Food.__table__, "after_create", DDL(FOOD_SEARCH_DDL).execute_if(dialect="sqlite")
+)
 
 
 class Recipe(Base):
@@ -74,6 +143,8 @@ class Recipe(Base):
         back_populates="recipe", cascade="all, delete-orphan"
     )
     override_nutrition: Mapped[bool] = mapped_column(Boolean)
+    # Revision of the last write to this recipe, its ingredients or instructions
+    revision: Mapped[int] = mapped_column(Integer, default=0, index=True)
 
 
 class RecipeIngredient(Base):
@@ -82,10 +153,13 @@ class RecipeIngredient(Base):
     __tablename__ = "recipe_ingredient"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    food_id: Mapped[int] = mapped_column(ForeignKey("food.id"))
+    # Indexed to find the recipes using a changed food
+    food_id: Mapped[int] = mapped_column(ForeignKey("food.id"), index=True)
     food: Mapped[Food] = relationship()  # Food containing nutrition for this ingredient
     note: Mapped[Optional[str]] = mapped_column(String, nullable=True)
-    recipe_id: Mapped[int] = mapped_column(ForeignKey("recipe.id", ondelete="CASCADE"))
+    recipe_id: Mapped[int] = mapped_column(
+        ForeignKey("recipe.id", ondelete="CASCADE"), index=True
+    )
     recipe: Mapped[Recipe] = relationship(
         back_populates="ingredients"
     )  # Recipe this ingredient is part of
@@ -99,13 +173,17 @@ class RecipeInstruction(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     step: Mapped[int] = mapped_column(Integer)
-    recipe_id: Mapped[int] = mapped_column(ForeignKey("recipe.id", ondelete="CASCADE"))
+    recipe_id: Mapped[int] = mapped_column(
+        ForeignKey("recipe.id", ondelete="CASCADE"), index=True
+    )
     recipe: Mapped[Recipe] = relationship(back_populates="instructions")
     text: Mapped[str] = mapped_column(String)
 
 
 class PlannedFood(Base):
     __tablename__ = "planned_food"
+    # Date range queries filter on date and order by (date, meal)
+    __table_args__ = (Index("ix_planned_food_date_meal", "date", "meal"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     # When is the food planned for
@@ -113,16 +191,70 @@ class PlannedFood(Base):
     meal: Mapped[MealType] = mapped_column(Enum(MealType))
     # Food details
     servings: Mapped[float] = mapped_column(Float)
-    food_id: Mapped[int] = mapped_column(ForeignKey("food.id"))
+    food_id: Mapped[int] = mapped_column(ForeignKey("food.id"), index=True)
     food: Mapped[Food] = relationship()
     eaten: Mapped[bool] = mapped_column(Boolean, default=False)
+    revision: Mapped[int] = mapped_column(Integer, default=0, index=True)
+
+
+class DailyNutrition(Base):
+    """
+    Planned and eaten nutrition totals per (date, meal).
+    Kept up to date with deltas by every write that affects a planned food's
+    nutrition, so range summaries don't have to scan planned_food.
+    """
+
+    __tablename__ = "daily_nutrition"
+
+    date: Mapped[dt.date] = mapped_column(Date, primary_key=True)
+    meal: Mapped[MealType] = mapped_column(Enum(MealType), primary_key=True)
+    # Number of planned foods in this slot
+    entries: Mapped[int] = mapped_column(Integer, default=0)
+    planned_calories: Mapped[float] = mapped_column(Float, default=0)
+    planned_fat: Mapped[float] = mapped_column(Float, default=0)
+    planned_protein: Mapped[float] = mapped_column(Float, default=0)
+    planned_carbohydrates: Mapped[float] = mapped_column(Float, default=0)
+    eaten_calories: Mapped[float] = mapped_column(Float, default=0)
+    eaten_fat: Mapped[float] = mapped_column(Float, default=0)
+    eaten_protein: Mapped[float] = mapped_column(Float, default=0)
+    eaten_carbohydrates: Mapped[float] = mapped_column(Float, default=0)
+
+
+class TableRevision(Base):
+    """
+    Write counter per table, bumped by the service layer in the writing transaction.
+    The ANY_TABLE row counts every write. Food, recipe and planned food rows are
+    stamped with its value when written, and deletions leave a Tombstone with it, so
+    delta sync can return everything after a given revision.
+    """
+
+    __tablename__ = "table_revision"
+
+    table_name: Mapped[str] = mapped_column(String, primary_key=True)
+    revision: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class Tombstone(Base):
+    """A deleted row, kept so delta sync can tell clients to drop it."""
+
+    __tablename__ = "tombstone"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    table_name: Mapped[str] = mapped_column(String)
+    row_id: Mapped[int] = mapped_column(Integer)
+    revision: Mapped[int] = mapped_column(Integer, index=True)
 
 
 class Inventory(Base):
+    """Servings of a food in stock, one row per (food, state)."""
+
     __tablename__ = "inventory"
+    __table_args__ = (
+        UniqueConstraint("food_id", "state", name="uq_inventory_food_state"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    state: Mapped[FoodState] = mapped_column(Enum(FoodState), primary_key=True)
+    state: Mapped[FoodState] = mapped_column(Enum(FoodState))
     food_id: Mapped[int] = mapped_column(ForeignKey("food.id"))
-    food: Mapped[List[Food]] = relationship()
+    food: Mapped[Food] = relationship()
     quantity: Mapped[float] = mapped_column(Float)
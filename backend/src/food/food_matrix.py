@@ -0,0 +1,246 @@
+"""
+Process-resident columnar copy of food nutrition and serving data.
+Every food's per-serving nutrients, serving size, serving unit code, density and
+source recipe live in NumPy arrays indexed by food ID, so nutrition math gathers
+whole columns (`servings @ nutrients[food_ids]`) instead of loading Food objects.
+
+The arrays are loaded once per process and patched in place by create_food and
+update_food. Writes made elsewhere (bulk inserts, recipe edits, imports, other
+processes) are picked up by `refresh`, which compares the food table's write
+counter with the one the arrays reflect and reloads only the rows stamped with a
+newer revision, plus the foods deleted since.
+
+The lock only guards the arrays: queries run outside it, so a refresh waiting on
+the database never blocks readers. Async routes reach the matrix through run_sync,
+where a lock held across a statement wouldn't even exclude other requests: they run
+on the same thread, switching whenever one waits on the driver.
+"""
+
+from dataclasses import dataclass
+import threading
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+
+from src.food.constants import ANY_TABLE, NUTRIENTS
+from src.food.database import Food, TableRevision, Tombstone
+from src.food.units import unit_table
+
+# (id, source_recipe_id, serving_size, serving_size_unit, density, *NUTRIENTS)
+FoodColumnsRow = Tuple[Any, ...]
+
+# source_recipe_id of foods not made from a recipe
+NO_RECIPE = -1
+
+
+@dataclass(frozen=True)
+class FoodColumns:
+    """Columns of the foods asked for, row i describing the i-th food ID."""
+
+    nutrients: np.ndarray  # (foods, NUTRIENTS), per serving
+    serving_size: np.ndarray
+    serving_unit: np.ndarray  # unit_table codes
+    density: np.ndarray  # g/ml, NaN if unknown
+    source_recipe_id: np.ndarray  # NO_RECIPE if not made from a recipe
+
+
+def _columns_query() -> Select[FoodColumnsRow]:
+    return select(
+        Food.id,
+        Food.source_recipe_id,
+        Food.serving_size,
+        Food.serving_size_unit,
+        Food.density,
+        *(getattr(Food, n) for n in NUTRIENTS),
+    )
+
+
+class FoodMatrix:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # Database the arrays were loaded from
+        self._source: Optional[str] = None
+        # Food table write counter and ANY_TABLE revision the arrays reflect
+        self._food_writes = -1
+        self._revision = 0
+        # Bumped by every change to the arrays, so a refresh can tell whether they
+        # changed while it queried
+        self._generation = 0
+        self._allocate(0)
+
+    def _allocate(self, capacity: int) -> None:
+        self._present = np.zeros(capacity, dtype=bool)
+        self._nutrients = np.zeros((capacity, len(NUTRIENTS)), dtype=np.float64)
+        self._serving_size = np.ones(capacity, dtype=np.float64)
+        self._serving_unit = np.zeros(capacity, dtype=np.int64)
+        self._density = np.full(capacity, np.nan, dtype=np.float64)
+        self._source_recipe_id = np.full(capacity, NO_RECIPE, dtype=np.int64)
+
+    def _grow(self, max_id: int) -> None:
+        capacity = len(self._present)
+        if max_id < capacity:
+            return
+        old = (
+            self._present,
+            self._nutrients,
+            self._serving_size,
+            self._serving_unit,
+            self._density,
+            self._source_recipe_id,
+        )
+        self._allocate(max(max_id + 1, 2 * capacity))
+        new = (
+            self._present,
+            self._nutrients,
+            self._serving_size,
+            self._serving_unit,
+            self._density,
+            self._source_recipe_id,
+        )
+        for old_array, new_array in zip(old, new):
+            new_array[:capacity] = old_array
+
+    def refresh(self, db_session: Session) -> None:
+        """Bring the arrays up to date with the database, in one query if nothing
+        changed. The session must not hold uncommitted food writes.
+        """
+        source = str(db_session.get_bind().url)
+        while True:
+            counters = dict(
+                db_session.execute(
+                    select(TableRevision.table_name, TableRevision.revision).where(
+                        TableRevision.table_name.in_(["food", ANY_TABLE])
+                    )
+                ).all()
+            )
+            food_writes = counters.get("food", 0)
+            revision = counters.get(ANY_TABLE, 0)
+            with self._lock:
+                if source == self._source and food_writes == self._food_writes:
+                    return
+                reload = source != self._source
+                since, generation = self._revision, self._generation
+
+            query = _columns_query()
+            deleted: List[int] = []
+            if not reload:
+                query = query.where(Food.revision > since)
+                deleted = list(
+                    db_session.scalars(
+                        select(Tombstone.row_id).where(
+                            Tombstone.table_name == "food",
+                            Tombstone.revision > since,
+                        )
+                    )
+                )
+            rows = [tuple(row) for row in db_session.execute(query)]
+
+            with self._lock:
+                # Another refresh or update changed the arrays while this one
+                # queried: its rows may be older than theirs, so start over
+                if self._generation != generation:
+                    continue
+                if reload:
+                    self._allocate(0)
+                # Deletions first: an ID SQLite reused for a newer row is in both
+                if deleted:
+                    ids = np.array(deleted, dtype=np.int64)
+                    self._present[ids[ids < len(self._present)]] = False
+                self._patch(rows)
+                self._generation += 1
+                self._source = source
+                self._food_writes = food_writes
+                self._revision = revision
+                return
+
+    def update(self, foods: Iterable[Food], revision: int) -> None:
+        """Patch committed foods in place.
+
+        Args:
+            foods: Foods the write created or changed
+            revision: Revision the write stamped them with
+        """
+        with self._lock:
+            self._patch(
+                [
+                    (
+                        food.id,
+                        food.source_recipe_id,
+                        food.serving_size,
+                        food.serving_size_unit,
+                        food.density,
+                        *(getattr(food, n) for n in NUTRIENTS),
+                    )
+                    for food in foods
+                ]
+            )
+            self._generation += 1
+            # Nothing else was written in between, so the arrays are current
+            if revision == self._revision + 1:
+                self._food_writes += 1
+                self._revision = revision
+
+    def _patch(self, rows: Sequence[FoodColumnsRow]) -> None:
+        if not rows:
+            return
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self._grow(int(ids.max()))
+        self._present[ids] = True
+        self._source_recipe_id[ids] = [
+            NO_RECIPE if row[1] is None else row[1] for row in rows
+        ]
+        self._serving_size[ids] = [row[2] for row in rows]
+        self._serving_unit[ids] = unit_table.codes([row[3] for row in rows])
+        self._density[ids] = [np.nan if row[4] is None else row[4] for row in rows]
+        self._nutrients[ids] = [row[5:] for row in rows]
+
+    def ids(self) -> np.ndarray:
+        """IDs of every food, ascending."""
+        with self._lock:
+            return np.flatnonzero(self._present)
+
+    def missing(self, food_ids: Iterable[int]) -> List[int]:
+        """The IDs among `food_ids` of foods that don't exist, sorted."""
+        ids = np.fromiter(food_ids, dtype=np.int64)
+        with self._lock:
+            return self._missing(ids)
+
+    def _missing(self, ids: np.ndarray) -> List[int]:
+        ids = np.unique(ids)
+        known = ids[(ids >= 0) & (ids < len(self._present))]
+        present = known[self._present[known]]
+        return np.setdiff1d(ids, present).tolist()
+
+    def gather(self, db_session: Session, food_ids: Sequence[int]) -> FoodColumns:
+        """Columns of `food_ids`, refreshing first if any of them isn't loaded yet.
+
+        Raises:
+            KeyError: if some of the foods don't exist
+        """
+        ids = np.asarray(food_ids, dtype=np.int64)
+        if self.missing(ids):
+            self.refresh(db_session)
+        with self._lock:
+            missing = self._missing(ids)
+            if missing:
+                raise KeyError(missing)
+            return FoodColumns(
+                nutrients=self._nutrients[ids],
+                serving_size=self._serving_size[ids],
+                serving_unit=self._serving_unit[ids],
+                density=self._density[ids],
+                source_recipe_id=self._source_recipe_id[ids],
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._source = None
+            self._food_writes = -1
+            self._revision = 0
+            self._generation += 1
+            self._allocate(0)
+
+
+food_matrix = FoodMatrix()
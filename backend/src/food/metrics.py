@@ -0,0 +1,247 @@
+"""
+Per-route request and database metrics, exposed in Prometheus text format.
+MetricsMiddleware times every HTTP request and labels it with the route template
+(e.g. /api/recipes/{recipe_id}) it matched. Engines passed to `track` time every
+statement and attribute it to the request that issued it through a context
+variable, which is copied into the threadpool running sync routes and streaming
+bodies. Statements slower than settings.SLOW_QUERY_MS are logged with their
+parameters.
+"""
+
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import logging
+import threading
+import time
+from typing import Any, DefaultDict, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, Response
+from sqlalchemy import Engine, event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import settings
+
+slow_query_logger = logging.getLogger(f"{__name__}.slow_query")
+
+# Upper bounds of the request latency histogram, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# (method, route)
+RouteKey = Tuple[str, str]
+
+
+@dataclass
+class RequestStats:
+    statements: int = 0
+    db_seconds: float = 0.0
+
+
+@dataclass
+class RouteMetrics:
+    # Requests per response status
+    responses: DefaultDict[int, int] = field(default_factory=lambda: defaultdict(int))
+    # Requests per latency bucket, the last entry counting those above every bound
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    seconds: float = 0.0
+    statements: int = 0
+    db_seconds: float = 0.0
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._routes: Dict[RouteKey, RouteMetrics] = defaultdict(RouteMetrics)
+        self._slow_queries = 0
+
+    def observe(
+        self, key: RouteKey, status: int, seconds: float, stats: RequestStats
+    ) -> None:
+        with self._lock:
+            route = self._routes[key]
+            route.responses[status] += 1
+            route.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            route.seconds += seconds
+            route.statements += stats.statements
+            route.db_seconds += stats.db_seconds
+
+    def slow_query(self) -> None:
+        with self._lock:
+            self._slow_queries += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._routes.clear()
+            self._slow_queries = 0
+
+    def render(self) -> str:
+        """The current metrics in Prometheus text exposition format."""
+        with self._lock:
+            routes = sorted(self._routes.items())
+            slow_queries = self._slow_queries
+
+        lines = [
+            "# HELP http_requests_total HTTP requests by route and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for key, route in routes:
+            for status, count in sorted(route.responses.items()):
+                lines.append(
+                    f'http_requests_total{{{_labels(key)},status="{status}"}} {count}'
+                )
+
+        lines += [
+            "# HELP http_request_duration_seconds HTTP request latency by route.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for key, route in routes:
+            labels = _labels(key)
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, route.buckets):
+                cumulative += count
+                lines.append(
+                    f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} '
+                    f"{cumulative}"
+                )
+            total = cumulative + route.buckets[-1]
+            lines += [
+                f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {total}',
+                f"http_request_duration_seconds_sum{{{labels}}} {route.seconds}",
+                f"http_request_duration_seconds_count{{{labels}}} {total}",
+            ]
+
+        lines += [
+            "# HELP db_statements_total SQL statements executed by route.",
+            "# TYPE db_statements_total counter",
+        ]
+        for key, route in routes:
+            lines.append(f"db_statements_total{{{_labels(key)}}} {route.statements}")
+
+        lines += [
+            "# HELP db_statement_seconds_total Time spent executing SQL by route.",
+            "# TYPE db_statement_seconds_total counter",
+        ]
+        for key, route in routes:
+            lines.append(
+                f"db_statement_seconds_total{{{_labels(key)}}} {route.db_seconds}"
+            )
+
+        lines += [
+            "# HELP db_slow_queries_total SQL statements slower than the slow query "
+            "threshold.",
+            "# TYPE db_slow_queries_total counter",
+            f"db_slow_queries_total {slow_queries}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(key: RouteKey) -> str:
+    method, route = key
+    return f'method="{_escape(method)}",route="{_escape(route)}"'
+
+
+metrics_registry = MetricsRegistry()
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_stats", default=None
+)
+
+
+def _before_cursor_execute(
+    conn: Any,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Any,
+    executemany: bool,
+) -> None:
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Any,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Any,
+    executemany: bool,
+) -> None:
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+
+    if elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        metrics_registry.slow_query()
+        slow_query_logger.warning(
+            "Slow query (%.1f ms): %s; parameters: %.500r",
+            elapsed * 1000,
+            " ".join(statement.split()),
+            parameters,
+        )
+
+
+def _handle_error(context: Any) -> None:
+    # A failed statement never reaches after_cursor_execute
+    connection = context.connection
+    if connection is not None and connection.info.get("query_start"):
+        connection.info["query_start"].pop()
+
+
+def track(engine: Engine) -> None:
+    """Time the statements `engine` executes and attribute them to the request."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class MetricsMiddleware:
+    """Record latency, status and database usage of every HTTP request by route."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        token = _request_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_stats.reset(token)
+            # Routing stores the matched route in the scope
+            route = scope.get("route")
+            metrics_registry.observe(
+                (scope["method"], getattr(route, "path", "unmatched")),
+                status,
+                elapsed,
+                stats,
+            )
+
+
+router = APIRouter()
+
+
+@router.get("/_metrics", include_in_schema=False)
+def get_metrics() -> Response:
+    """Request and database metrics in Prometheus text format."""
+    return Response(metrics_registry.render(), media_type="text/plain; version=0.0.4")
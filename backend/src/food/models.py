@@ -1,5 +1,5 @@
 from typing import Optional
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 
 from src.food.constants import FoodState, MealType
 import datetime as dt
@@ -44,6 +44,22 @@ class FoodResponse(Nutrition):
     source_recipe_id: Optional[int] = None
     serving_size: float
     serving_size_unit: str
+    density: Optional[float] = None
+
+
+class PartialFoodResponse(BaseModel):
+    """A food as listed by GET /foods, which only returns the ``fields`` asked for."""
+
+    id: int
+    name: Optional[str] = None
+    source_recipe_id: Optional[int] = None
+    serving_size: Optional[float] = None
+    serving_size_unit: Optional[str] = None
+    density: Optional[float] = None
+    calories: Optional[int] = None
+    fat: Optional[int] = None
+    protein: Optional[int] = None
+    carbohydrates: Optional[int] = None
 
 
 class IngredientResponse(BaseResponse):
@@ -74,14 +90,28 @@ class CreateFoodRequest(Nutrition):
     name: str
     serving_size: float
     serving_size_unit: str
+    density: Optional[float] = None  # g/ml
     # TODO: if nutrition not present look up from usda
 
 
+class BulkFoodResult(BaseModel):
+    index: int  # Position of the food in the request
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BulkFoodResponse(BaseModel):
+    created: int
+    failed: int
+    results: list[BulkFoodResult]
+
+
 class UpdateFoodRequest(BaseModel):
     id: int
     name: Optional[str] = None
     serving_size: Optional[float] = None
     serving_size_unit: Optional[str] = None
+    density: Optional[float] = None
     calories: Optional[int] = None
     fat: Optional[int] = None
     protein: Optional[int] = None
@@ -89,15 +119,23 @@ class UpdateFoodRequest(BaseModel):
 
 
 # Add inventory
-class AddInventoryRequest(Nutrition):
-    state: Optional[FoodState] = FoodState.PLANNED
+class AddInventoryRequest(BaseModel):
+    state: FoodState = FoodState.PLANNED
     food_id: int
+    quantity: float = Field(gt=0)  # Servings, added to what is already in stock
 
 
 # Update food in inventory
-class UpdateInventoryRequest(Nutrition):
+class UpdateInventoryRequest(BaseModel):
     food_id: int
     state: FoodState
+    quantity: float = Field(ge=0)  # Servings, replacing what is in stock
+
+
+class InventoryResponse(BaseResponse):
+    id: int
+    state: FoodState
+    food: FoodResponse
     quantity: float
 
 
@@ -133,8 +171,23 @@ class UpdatePlannedFoodRequest(BaseModel):
 
 class PlannedFoodResponse(BaseResponse):
     id: int
-    date: str
-    meal_type: str
+    date: dt.date
+    meal: MealType
     food: FoodResponse
     servings: float
     eaten: bool
+
+
+# Delta sync models
+class DeletedRowsResponse(BaseModel):
+    foods: list[int]
+    recipes: list[int]
+    planned_foods: list[int]
+
+
+class SyncResponse(BaseModel):
+    revision: int  # Pass as `since` on the next sync
+    foods: list[FoodResponse]
+    recipes: list[RecipeResponse]
+    planned_foods: list[PlannedFoodResponse]
+    deleted: DeletedRowsResponse
@@ -0,0 +1,362 @@
+"""
+Recipe nutrition rollup.
+A recipe's nutrition is the sum of its ingredients' nutrition, where an ingredient's
+food may itself be made from another recipe. Recipes and foods form a DAG that is
+walked children first, and every recipe's totals are memoized until one of its
+inputs changes.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.food.constants import NUTRIENTS
+from src.food.database import Food, Recipe, RecipeIngredient
+from src.food.food_matrix import NO_RECIPE, FoodColumns, FoodMatrix, food_matrix
+from src.food.units import unit_table
+
+logger = logging.getLogger(__name__)
+
+# (calories, fat, protein, carbohydrates)
+Totals = Tuple[float, float, float, float]
+
+
+class NutritionCycleError(ValueError):
+    """A recipe (indirectly) uses itself as an ingredient."""
+
+    def __init__(self, recipe_ids: List[int]):
+        self.recipe_ids = recipe_ids
+        super().__init__(
+            "Recipe cycle: " + " -> ".join(str(recipe_id) for recipe_id in recipe_ids)
+        )
+
+
+@dataclass
+class RecipeNode:
+    id: int
+    food_id: int
+    override_nutrition: bool
+    # (ingredient food ID, quantity, unit)
+    ingredients: List[Tuple[int, float, str]] = field(default_factory=list)
+    # Filled in from the food matrix by `scale_ingredients`: the per-serving
+    # nutrients of the recipe's own food, and per ingredient the servings of its
+    # food (zero if its unit can't be converted, flagged in `unconvertible`), that
+    # food's per-serving nutrients and the recipe it is made from
+    food_nutrients: np.ndarray = field(default_factory=lambda: np.zeros(len(NUTRIENTS)))
+    servings: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    unconvertible: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=bool))
+    nutrients: np.ndarray = field(default_factory=lambda: np.zeros((0, len(NUTRIENTS))))
+    source_recipe_ids: np.ndarray = field(
+        default_factory=lambda: np.zeros(0, dtype=np.int64)
+    )
+
+
+def scale_ingredients(
+    db_session: Session, nodes: Iterable[RecipeNode], matrix: FoodMatrix = food_matrix
+) -> None:
+    """Gather the foods of `nodes` and their ingredients from the food matrix, and
+    convert every ingredient line to servings of its food, in one pass.
+
+    Lines whose unit can't be converted to servings of their food are logged and
+    count as zero servings.
+    """
+    nodes = list(nodes)
+    rows = [row for node in nodes for row in node.ingredients]
+    columns = matrix.gather(
+        db_session,
+        [node.food_id for node in nodes] + [food_id for food_id, _, _ in rows],
+    )
+    # Ingredient rows come after one row per node
+    first = len(nodes)
+    servings = np.zeros(0)
+    unconvertible = np.zeros(0, dtype=bool)
+    if rows:
+        servings = unit_table.to_servings(
+            quantity=np.array([quantity for _, quantity, _ in rows], dtype=np.float64),
+            unit=unit_table.codes([unit for _, _, unit in rows]),
+            serving_size=columns.serving_size[first:],
+            serving_unit=columns.serving_unit[first:],
+            density=columns.density[first:],
+        )
+        unconvertible = np.isnan(servings)
+        if unconvertible.any():
+            for index in np.flatnonzero(unconvertible).tolist():
+                food_id, quantity, unit = rows[index]
+                logger.warning(
+                    "Can't convert %s %r of food %d to servings, counting it as zero",
+                    quantity,
+                    unit,
+                    food_id,
+                )
+            servings[unconvertible] = 0.0
+
+    start = 0
+    for index, node in enumerate(nodes):
+        end = start + len(node.ingredients)
+        node.food_nutrients = columns.nutrients[index]
+        node.servings = servings[start:end]
+        node.unconvertible = unconvertible[start:end]
+        node.nutrients = columns.nutrients[first + start : first + end]
+        node.source_recipe_ids = columns.source_recipe_id[first + start : first + end]
+        start = end
+
+
+def _load_level(
+    db_session: Session, recipe_ids: Set[int], matrix: FoodMatrix = food_matrix
+) -> Dict[int, RecipeNode]:
+    """Load a set of recipes with their ingredient lines in two queries."""
+    nodes = {
+        recipe_id: RecipeNode(
+            id=recipe_id, food_id=food_id, override_nutrition=override_nutrition
+        )
+        for recipe_id, override_nutrition, food_id in db_session.execute(
+            select(Recipe.id, Recipe.override_nutrition, Food.id)
+            .join(Food, Food.source_recipe_id == Recipe.id)
+            .where(Recipe.id.in_(recipe_ids))
+        )
+    }
+
+    expand = [node.id for node in nodes.values() if not node.override_nutrition]
+    if expand:
+        for recipe_id, food_id, quantity, unit in db_session.execute(
+            select(
+                RecipeIngredient.recipe_id,
+                RecipeIngredient.food_id,
+                RecipeIngredient.quantity,
+                RecipeIngredient.unit,
+            )
+            # Lines whose food no longer exists don't count
+            .join(Food, Food.id == RecipeIngredient.food_id).where(
+                RecipeIngredient.recipe_id.in_(expand)
+            )
+        ):
+            nodes[recipe_id].ingredients.append((food_id, quantity, unit))
+    scale_ingredients(db_session, nodes.values(), matrix)
+    return nodes
+
+
+def load_graph(
+    db_session: Session,
+    recipe_ids: Set[int],
+    skip: Callable[[int], bool] = lambda recipe_id: False,
+    matrix: FoodMatrix = food_matrix,
+) -> Dict[int, RecipeNode]:
+    """Load every recipe reachable from `recipe_ids`, one query per depth, without
+    following ingredients into recipes `skip` returns True for."""
+    nodes: Dict[int, RecipeNode] = {}
+    pending = set(recipe_ids)
+    while pending:
+        level = _load_level(db_session, pending, matrix)
+        nodes.update(level)
+        pending = {
+            source_recipe_id
+            for node in level.values()
+            for source_recipe_id in node.source_recipe_ids.tolist()
+            if source_recipe_id != NO_RECIPE
+            and source_recipe_id not in nodes
+            and not skip(source_recipe_id)
+        }
+    return nodes
+
+
+def check_acyclic(db_session: Session, recipe_id: int) -> None:
+    """Raise NutritionCycleError if a recipe (indirectly) uses itself, e.g. before
+    committing new ingredients. Sees the session's uncommitted rows."""
+    food_matrix.refresh(db_session)
+    nodes = load_graph(db_session, {recipe_id})
+    if recipe_id in nodes:
+        topological_order(nodes, [recipe_id])
+
+
+def topological_order(
+    nodes: Dict[int, RecipeNode], root_ids: Iterable[int]
+) -> List[RecipeNode]:
+    """Order the recipes reachable from `root_ids` children first, raising on cycles.
+
+    Ingredients whose recipe isn't in `nodes` are treated as leaves.
+    """
+    order: List[RecipeNode] = []
+    done: Set[int] = set()
+    path: List[int] = []
+    on_path: Set[int] = set()
+
+    def children(node: RecipeNode) -> List[int]:
+        return [
+            recipe_id
+            for recipe_id in node.source_recipe_ids.tolist()
+            if recipe_id in nodes
+        ]
+
+    for root_id in root_ids:
+        if root_id in done:
+            continue
+        # Iterative DFS so deep recipe chains can't hit the recursion limit
+        stack: List[Tuple[int, List[int]]] = [(root_id, children(nodes[root_id]))]
+        path.append(root_id)
+        on_path.add(root_id)
+        while stack:
+            node_id, remaining = stack[-1]
+            if remaining:
+                child_id = remaining.pop()
+                if child_id in on_path:
+                    raise NutritionCycleError(path[path.index(child_id) :] + [child_id])
+                if child_id not in done:
+                    stack.append((child_id, children(nodes[child_id])))
+                    path.append(child_id)
+                    on_path.add(child_id)
+                continue
+            stack.pop()
+            path.pop()
+            on_path.discard(node_id)
+            done.add(node_id)
+            order.append(nodes[node_id])
+    return order
+
+
+class NutritionEngine:
+    """
+    Memoized per-serving nutrition for recipes.
+    The memo is process local: every write that changes a recipe or food input must
+    call `invalidate_recipe` / `invalidate_food` after committing, which drops the
+    affected recipe and every recipe that (transitively) uses it.
+    """
+
+    def __init__(self, matrix: FoodMatrix = food_matrix) -> None:
+        # Where foods' own nutrition and serving data come from
+        self.matrix = matrix
+        self._lock = threading.Lock()
+        self._totals: Dict[int, Totals] = {}
+        # food ID -> recipes with a memoized total that use the food as an ingredient
+        self._dependents: Dict[int, Set[int]] = defaultdict(set)
+        # recipe ID -> ID of the food the recipe produces
+        self._recipe_food: Dict[int, int] = {}
+
+    def recipe_totals(self, db_session: Session, recipe_id: int) -> Optional[Totals]:
+        """Per-serving totals of a recipe, or None if it does not exist."""
+        return self.recipes_totals(db_session, [recipe_id]).get(recipe_id)
+
+    def recipes_totals(
+        self, db_session: Session, recipe_ids: Iterable[int]
+    ) -> Dict[int, Totals]:
+        """Per-serving totals of several recipes, leaving out those that don't exist.
+
+        Every uncached recipe reachable from any of them is loaded together, one
+        query per depth, so the query count doesn't grow with the number of recipes.
+        """
+        wanted = set(recipe_ids)
+        with self._lock:
+            results = {
+                recipe_id: self._totals[recipe_id]
+                for recipe_id in wanted
+                if recipe_id in self._totals
+            }
+        uncached = wanted - results.keys()
+        if not uncached:
+            return results
+
+        self.matrix.refresh(db_session)
+        nodes = self._load_graph(db_session, uncached)
+        roots = [recipe_id for recipe_id in sorted(uncached) if recipe_id in nodes]
+
+        computed: Dict[int, Totals] = {}
+        for node in topological_order(nodes, roots):
+            computed[node.id] = self._rollup(node, computed)
+
+        with self._lock:
+            for node_id, totals in computed.items():
+                node = nodes[node_id]
+                self._totals[node_id] = totals
+                self._recipe_food[node_id] = node.food_id
+                for food_id, _, _ in node.ingredients:
+                    self._dependents[food_id].add(node_id)
+        results.update((recipe_id, computed[recipe_id]) for recipe_id in roots)
+        return results
+
+    def food_nutrients(self, db_session: Session, columns: FoodColumns) -> np.ndarray:
+        """Per-serving nutrients of gathered foods, with foods made from a recipe
+        counting with the recipe's rolled-up totals.
+
+        Raises:
+            NutritionCycleError: if one of the recipes (indirectly) uses itself
+        """
+        nutrients = columns.nutrients.copy()
+        rows = np.flatnonzero(columns.source_recipe_id != NO_RECIPE)
+        if not len(rows):
+            return nutrients
+        recipe_ids, inverse = np.unique(
+            columns.source_recipe_id[rows], return_inverse=True
+        )
+        totals = self.recipes_totals(db_session, recipe_ids.tolist())
+        found = np.array([recipe_id in totals for recipe_id in recipe_ids.tolist()])
+        table = np.array(
+            [
+                totals.get(recipe_id, (0.0,) * len(NUTRIENTS))
+                for recipe_id in recipe_ids.tolist()
+            ]
+        )
+        rows_found = found[inverse]
+        nutrients[rows[rows_found]] = table[inverse[rows_found]]
+        return nutrients
+
+    def invalidate_food(self, food_id: int) -> None:
+        """Forget every memoized recipe that depends on `food_id`."""
+        with self._lock:
+            self._invalidate(self._dependents.pop(food_id, set()))
+
+    def invalidate_recipe(self, recipe_id: int) -> None:
+        """Forget a recipe's totals and those of every recipe that uses it."""
+        with self._lock:
+            self._invalidate({recipe_id})
+
+    def clear(self) -> None:
+        with self._lock:
+            self._totals.clear()
+            self._dependents.clear()
+            self._recipe_food.clear()
+
+    def _invalidate(self, recipe_ids: Iterable[int]) -> None:
+        stack = list(recipe_ids)
+        while stack:
+            recipe_id = stack.pop()
+            self._totals.pop(recipe_id, None)
+            food_id = self._recipe_food.pop(recipe_id, None)
+            if food_id is not None:
+                stack.extend(self._dependents.pop(food_id, ()))
+
+    def _load_graph(
+        self, db_session: Session, recipe_ids: Set[int]
+    ) -> Dict[int, RecipeNode]:
+        """Load every uncached recipe reachable from `recipe_ids`, one query per depth."""
+
+        def cached(recipe_id: int) -> bool:
+            with self._lock:
+                return recipe_id in self._totals
+
+        return load_graph(db_session, recipe_ids, skip=cached, matrix=self.matrix)
+
+    def _rollup(self, node: RecipeNode, computed: Dict[int, Totals]) -> Totals:
+        if node.override_nutrition:
+            return tuple(node.food_nutrients.tolist())  # type: ignore[return-value]
+
+        # Ingredients made from a recipe count with the recipe's rolled-up totals
+        nutrients = node.nutrients
+        for index in np.flatnonzero(node.source_recipe_ids != NO_RECIPE).tolist():
+            source_recipe_id = int(node.source_recipe_ids[index])
+            recipe_totals = computed.get(source_recipe_id)
+            if recipe_totals is None:
+                with self._lock:
+                    recipe_totals = self._totals.get(source_recipe_id)
+            if recipe_totals is not None:
+                if nutrients is node.nutrients:
+                    nutrients = nutrients.copy()
+                nutrients[index] = recipe_totals
+        return tuple((node.servings @ nutrients).tolist())  # type: ignore[return-value]
+
+
+nutrition_engine = NutritionEngine()
@@ -1,12 +1,51 @@
-from typing import Optional, List
-from fastapi import APIRouter, Depends
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    Iterator,
+    Mapping,
+    Optional,
+    List,
+    Tuple,
+)
+import datetime as dt
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from pydantic_core import to_json
 from sqlalchemy.orm import Session
 
 from src.food import service
-from src.food.database import get_db_session
+from src.food.cache import (
+    cache_headers,
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+    response_cache,
+)
+from src.food.constants import BULK_INSERT_CHUNK_SIZE, STREAM_BATCH_SIZE, FoodState
+from src.food.database import (
+    get_db_session,
+    get_read_db_session,
+    open_read_db_session,
+)
+from src.food.nutrition import NutritionCycleError
+from src.food.serialization import (
+    dump_documents,
+    json_list_response,
+    json_response,
+    list_adapter,
+)
 from src.food.models import (
+    BulkFoodResponse,
+    BulkFoodResult,
     CreateFoodRequest,
     FoodResponse,
+    PartialFoodResponse,
+    Nutrition,
     CreateRecipeRequest,
     RecipeResponse,
     UpdateFoodRequest,
@@ -14,6 +53,10 @@ from src.food.models import (
     CreatePlannedFoodRequest,
     UpdatePlannedFoodRequest,
     PlannedFoodResponse,
+    AddInventoryRequest,
+    UpdateInventoryRequest,
+    InventoryResponse,
+    SyncResponse,
 )
 import logging
 
@@ -23,12 +66,94 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-@router.get("/foods", response_model=List[FoodResponse])
-def get_foods(db_session: Session = Depends(get_db_session)) -> List[FoodResponse]:
-    """Get all foods."""
-    foods = service.get_foods(db_session=db_session)
-    [print(f.__dict__) for f in foods]
-    return [FoodResponse.model_validate(food) for food in foods]
+def stream_json_array(rows: Iterable[Mapping[str, Any]]) -> Iterator[bytes]:
+    """Encode rows as a JSON array, yielding one chunk per batch of rows."""
+    yield b"["
+    chunk: List[Dict[str, Any]] = []
+    first = True
+    for row in rows:
+        chunk.append(dict(row))
+        if len(chunk) == STREAM_BATCH_SIZE:
+            # Encode the batch as an array and strip its brackets
+            yield (b"" if first else b",") + to_json(chunk)[1:-1]
+            chunk, first = [], False
+    if chunk:
+        yield (b"" if first else b",") + to_json(chunk)[1:-1]
+    yield b"]"
+
+
+# Streamed, so the body isn't validated against a response_model; `responses`
+# documents its shape
+@router.get("/foods", responses={200: {"model": List[PartialFoodResponse]}})
+def get_foods(
+    request: Request,
+    after: Optional[int] = None,
+    limit: Optional[int] = Query(default=None, gt=0),
+    fields: Optional[str] = None,
+    db_session: Session = Depends(open_read_db_session),
+) -> Response:
+    """Get foods ordered by ID, as a JSON array.
+
+    Results are keyset paginated: pass the ``id`` of the last food received as
+    ``after`` to fetch the next ``limit`` foods. ``fields`` is a comma separated
+    list of columns to return; ``id`` is always included.
+
+    Responses carry an ETag and honour If-None-Match.
+    """
+    # The stream outlives the request's dependencies, so it closes the session. The
+    # engine begins a transaction with the session's first statement (see
+    # src.food.storage), so the revision and the rows come from one snapshot.
+    try:
+        requested = (
+            [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+        )
+        unknown = set(requested or ()) - set(service.FOOD_FIELDS)
+        if unknown:
+            raise HTTPException(
+                status_code=400, detail=f"Unknown food fields: {sorted(unknown)}"
+            )
+        etag = make_etag(request, service.get_revisions(db_session, "food"))
+    except Exception:
+        db_session.close()
+        raise
+    if is_not_modified(request, etag):
+        db_session.close()
+        return not_modified_response(etag)
+    body = response_cache.get(etag)
+    if body is not None:
+        db_session.close()
+        return json_response(body, headers=cache_headers(etag))
+
+    def stream() -> Iterator[bytes]:
+        try:
+            yield from response_cache.capture(
+                etag,
+                stream_json_array(
+                    service.get_foods(
+                        db_session=db_session,
+                        after_id=after,
+                        limit=limit,
+                        fields=requested,
+                    )
+                ),
+            )
+        finally:
+            db_session.close()
+
+    return StreamingResponse(
+        stream(), media_type="application/json", headers=cache_headers(etag)
+    )
+
+
+@router.get("/foods/search", response_model=List[FoodResponse])
+def search_foods(
+    q: str = Query(min_length=1),
+    limit: int = Query(default=20, gt=0, le=100),
+    db_session: Session = Depends(get_read_db_session),
+) -> Response:
+    """Typeahead search over food names, best matches first."""
+    foods = service.search_foods(db_session=db_session, query=q, limit=limit)
+    return json_list_response(FoodResponse, foods)
 
 
 @router.post("/foods", response_model=FoodResponse)
@@ -38,6 +163,91 @@ def create_food_route(
     return service.create_food(db_session=db_session, request=request)
 
 
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+async def read_json_items(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    """Yield (index, item) from a JSON array body, or line by line from an NDJSON body.
+
+    Items that aren't valid JSON are yielded as the ValueError raised parsing them.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type not in NDJSON_MEDIA_TYPES:
+        try:
+            items = json.loads(await request.body())
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array")
+        for index, item in enumerate(items):
+            yield index, item
+        return
+
+    index = 0
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield index, _parse_json_line(line)
+                index += 1
+    if buffer.strip():
+        yield index, _parse_json_line(buffer)
+
+
+def _parse_json_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return e
+
+
+def _describe_error(error: ValueError) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            ": ".join(filter(None, (".".join(map(str, e["loc"])), e["msg"])))
+            for e in error.errors()
+        )
+    return str(error)
+
+
+@router.post("/foods/bulk", response_model=BulkFoodResponse)
+async def bulk_create_foods(
+    request: Request, db_session: Session = Depends(get_db_session)
+) -> BulkFoodResponse:
+    """Create many foods from a JSON array or an NDJSON stream of CreateFoodRequest.
+
+    Valid rows are inserted in chunks inside a single transaction; invalid rows are
+    skipped and reported with their error.
+    """
+    results: List[BulkFoodResult] = []
+    pending: List[Tuple[int, CreateFoodRequest]] = []
+    async for index, item in read_json_items(request):
+        try:
+            if isinstance(item, ValueError):
+                raise item
+            pending.append((index, CreateFoodRequest.model_validate(item)))
+        except ValueError as e:
+            results.append(BulkFoodResult(index=index, error=_describe_error(e)))
+            continue
+        if len(pending) == BULK_INSERT_CHUNK_SIZE:
+            results += await run_in_threadpool(
+                service.insert_foods, db_session, pending
+            )
+            pending = []
+
+    if pending:
+        results += await run_in_threadpool(service.insert_foods, db_session, pending)
+    await run_in_threadpool(db_session.commit)
+
+    results.sort(key=lambda result: result.index)
+    created = sum(1 for result in results if result.error is None)
+    return BulkFoodResponse(
+        created=created, failed=len(results) - created, results=results
+    )
+
+
 @router.put("/foods/{food_id}", response_model=FoodResponse)
 def update_food_route(
     food_id: int,
@@ -57,6 +267,7 @@ def update_food_route(
         name=food.name,
         serving_size=food.serving_size,
         serving_size_unit=food.serving_size_unit,
+        density=food.density,
         calories=food.calories,
         fat=food.fat,
         protein=food.protein,
@@ -64,13 +275,22 @@ def update_food_route(
     )
 
 
+def missing_foods_error(error: service.MissingFoodsError) -> HTTPException:
+    return HTTPException(
+        status_code=422,
+        detail={"message": str(error), "missing_food_ids": error.food_ids},
+    )
+
+
 @router.post("/recipes", response_model=RecipeResponse)
 def create_recipe(
     request: CreateRecipeRequest, db_session: Session = Depends(get_db_session)
 ) -> Optional[RecipeResponse]:
-    return RecipeResponse.model_validate(
-        service.create_recipe(db_session=db_session, request=request)
-    )
+    try:
+        recipe = service.create_recipe(db_session=db_session, request=request)
+    except service.MissingFoodsError as e:
+        raise missing_foods_error(e)
+    return RecipeResponse.model_validate(recipe)
 
 
 @router.delete("/recipes/{recipe_id}")
@@ -89,7 +309,12 @@ def update_recipe_route(
 ) -> Optional[RecipeResponse]:
     # Ensure the ID in the path matches the ID in the request
     request.id = recipe_id
-    recipe = service.update_recipe(db_session=db_session, request=request)
+    try:
+        recipe = service.update_recipe(db_session=db_session, request=request)
+    except service.MissingFoodsError as e:
+        raise missing_foods_error(e)
+    except NutritionCycleError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     if recipe is None:
         return None
 
@@ -97,20 +322,47 @@ def update_recipe_route(
 
 
 @router.get("/recipes", response_model=List[RecipeResponse])
-def get_recipes(db_session: Session = Depends(get_db_session)) -> List[RecipeResponse]:
-    """Get all recipes."""
-    recipes = service.get_recipes(db_session=db_session)
-    return [RecipeResponse.model_validate(recipe) for recipe in recipes]
+def get_recipes(
+    request: Request, db_session: Session = Depends(get_read_db_session)
+) -> Response:
+    """Get all recipes. Responses carry an ETag and honour If-None-Match."""
+    etag = make_etag(request, service.get_revisions(db_session, "food", "recipe"))
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    body = response_cache.get(etag)
+    if body is None:
+        body = dump_documents(service.get_recipe_documents(db_session=db_session))
+        response_cache.put(etag, body)
+    return json_response(body, headers=cache_headers(etag))
+
+
+@router.get("/recipes/{recipe_id}/nutrition", response_model=Nutrition)
+def get_recipe_nutrition(
+    recipe_id: int, db_session: Session = Depends(get_read_db_session)
+) -> Nutrition:
+    """Get a recipe's per-serving nutrition, rolled up from its ingredients."""
+    try:
+        nutrition = service.get_nutrition(db_session=db_session, recipe_id=recipe_id)
+    except NutritionCycleError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if nutrition is None:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    return nutrition
 
 
 # Planned Foods endpoints
 @router.get("/planned-foods", response_model=List[PlannedFoodResponse])
 def get_planned_foods(
-    date: Optional[str] = None, db_session: Session = Depends(get_db_session)
-) -> List[PlannedFoodResponse]:
-    """Get planned foods, optionally filtered by date."""
-    planned_foods = service.get_planned_foods(db_session=db_session, date=date)
-    return [PlannedFoodResponse.model_validate(pf) for pf in planned_foods]
+    start: dt.date, end: dt.date, db_session: Session = Depends(get_read_db_session)
+) -> Response:
+    """Get planned foods between two dates, inclusive of both ends."""
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    planned_foods = service.get_planned_foods(
+        db_session=db_session, start_date=start, end_date=end
+    )
+    return json_list_response(PlannedFoodResponse, planned_foods)
 
 
 @router.post("/planned-foods", response_model=PlannedFoodResponse)
@@ -147,3 +399,75 @@ def delete_planned_food(
     return service.delete_planned_food(
         db_session=db_session, planned_food_id=planned_food_id
     )
+
+
+# Inventory endpoints
+@router.get("/inventory", response_model=List[InventoryResponse])
+def get_inventory(
+    state: Optional[FoodState] = None,
+    db_session: Session = Depends(get_read_db_session),
+) -> Response:
+    """Get the food in stock, optionally of one state only."""
+    return json_list_response(
+        InventoryResponse, service.get_inventory(db_session=db_session, state=state)
+    )
+
+
+@router.post("/inventory", response_model=InventoryResponse)
+def add_inventory(
+    request: AddInventoryRequest, db_session: Session = Depends(get_db_session)
+) -> InventoryResponse:
+    """Add servings of a food to stock."""
+    try:
+        inventory = service.add_inventory(db_session=db_session, request=request)
+    except service.MissingFoodsError as e:
+        raise missing_foods_error(e)
+    return InventoryResponse.model_validate(inventory)
+
+
+@router.put("/inventory/{food_id}", response_model=InventoryResponse)
+def update_inventory(
+    food_id: int,
+    request: UpdateInventoryRequest,
+    db_session: Session = Depends(get_db_session),
+) -> InventoryResponse:
+    """Set the servings in stock of a food in a state."""
+    # Ensure the ID in the path matches the ID in the request
+    request.food_id = food_id
+    inventory = service.update_inventory(db_session=db_session, request=request)
+    if inventory is None:
+        raise HTTPException(status_code=404, detail="Inventory not found")
+    return InventoryResponse.model_validate(inventory)
+
+
+@router.get("/sync", response_model=SyncResponse)
+def sync(
+    since: int = Query(default=0, ge=0),
+    db_session: Session = Depends(get_read_db_session),
+) -> Response:
+    """Foods, recipes and planned foods created, changed or deleted after revision
+    ``since``. Omit ``since`` for everything; afterwards pass the ``revision`` of
+    the previous response to get only what changed since.
+    """
+    changes = service.get_changes(db_session=db_session, since=since)
+    deleted = changes.deleted
+    # Recipes are already response-shaped dicts; only the ORM rows need validating
+    return json_response(
+        to_json(
+            {
+                "revision": changes.revision,
+                "foods": list_adapter(FoodResponse).validate_python(
+                    changes.foods, from_attributes=True
+                ),
+                "recipes": changes.recipes,
+                "planned_foods": list_adapter(PlannedFoodResponse).validate_python(
+                    changes.planned_foods, from_attributes=True
+                ),
+                "deleted": {
+                    "foods": deleted["food"],
+                    "recipes": deleted["recipe"],
+                    "planned_foods": deleted["planned_food"],
+                },
+            }
+        )
+    )
@@ -0,0 +1,48 @@
+"""
+Single-pass JSON serialization for list routes.
+Returning a list of response models makes FastAPI validate every item a second time
+against `response_model` and encode it through jsonable_encoder and the stdlib json
+module. Instead, list routes return the JSON bytes in a Response, which FastAPI
+passes through, built in one of two ways:
+
+- dump_list validates ORM objects once with a cached TypeAdapter, reading their
+  attributes directly (no per-object model_validate), and lets pydantic-core write
+  the JSON.
+- dump_documents encodes plain dicts that the service already shaped like the
+  response model from column rows, skipping validation and the ORM altogether. Used
+  for the largest listings.
+"""
+
+from functools import lru_cache
+from typing import Any, Iterable, List, Mapping, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: type) -> TypeAdapter:
+    return TypeAdapter(List[model])  # type: ignore[valid-type]
+
+
+def dump_list(model: type, objects: Iterable[Any]) -> bytes:
+    """Validate `objects` (ORM objects, mappings or models) as `model` and encode
+    them as a JSON array."""
+    adapter = list_adapter(model)
+    return adapter.dump_json(
+        adapter.validate_python(list(objects), from_attributes=True)
+    )
+
+
+def dump_documents(documents: List[Mapping[str, Any]]) -> bytes:
+    """Encode already response-shaped dicts as a JSON array, without validation."""
+    return to_json(documents)
+
+
+def json_response(body: bytes, headers: Optional[Mapping[str, str]] = None) -> Response:
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def json_list_response(model: type, objects: Iterable[Any]) -> Response:
+    return json_response(dump_list(model, objects))
@@ -1,75 +1,214 @@
-from typing import Optional, List
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, Optional, List, Sequence, Tuple
 import logging
 
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import (
+    RowMapping,
+    Select,
+    case,
+    delete,
+    func,
+    insert,
+    or_,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, selectinload
+from src.food.constants import ANY_TABLE, STREAM_BATCH_SIZE, FoodState
+from src.food.nutrition import (
+    NUTRIENTS,
+    NutritionCycleError,
+    RecipeNode,
+    check_acyclic,
+    nutrition_engine,
+    scale_ingredients,
+)
+from src.food.food_matrix import food_matrix
+from src.nutrition import service as nutrition_service
 from src.food.database import (
     Food,
+    Inventory,
     Recipe,
     RecipeIngredient,
     RecipeInstruction,
     PlannedFood,
+    TableRevision,
+    Tombstone,
+    food_search,
 )
 from src.food.models import (
+    AddInventoryRequest,
+    BulkFoodResult,
     CreateFoodRequest,
     FoodResponse,
-    IngredientRequest,
     Nutrition,
     CreateRecipeRequest,
     UpdateFoodRequest,
     UpdateRecipeRequest,
     CreatePlannedFoodRequest,
     UpdatePlannedFoodRequest,
+    UpdateInventoryRequest,
 )
 import datetime as dt
 
 logger = logging.getLogger(__name__)
 
 
-def get_nutrition(db_session: Session, recipe: Recipe) -> Nutrition:
-    """Look up recipe. If override_nutrition is present, return that. Otherwise, calculate nutrition."""
-    if recipe.override_nutrition:
-        pass
-    food = recipe.food
+class MissingFoodsError(LookupError):
+    """Request references foods that don't exist."""
+
+    def __init__(self, food_ids: List[int]):
+        self.food_ids = food_ids
+        super().__init__(f"Foods not found: {food_ids}")
+
+
+# Columns that can be requested from the food listing
+FOOD_FIELDS: tuple[str, ...] = tuple(FoodResponse.model_fields)
+
+# Tables delta sync returns, which keep tombstones of their deleted rows
+SYNCED_TABLES = ("food", "recipe", "planned_food")
+
+
+def bump_revisions(db_session: Session, *tables: str) -> int:
+    """Record a write to `tables`. Does not commit, so it lands with the write.
+
+    Returns:
+        The write's revision, from the ANY_TABLE counter. Rows the write creates,
+        changes or deletes are stamped with it.
+    """
+    # Every counter in one statement, as writes add up against the statement budget
+    statement = (
+        sqlite_insert(TableRevision)
+        .values(
+            [{"table_name": table, "revision": 1} for table in (*tables, ANY_TABLE)]
+        )
+        .on_conflict_do_update(
+            index_elements=[TableRevision.table_name],
+            set_={"revision": TableRevision.revision + 1},
+        )
+        .returning(TableRevision.table_name, TableRevision.revision)
+    )
+    # SQLite has one writer at a time, so revisions are committed in order
+    revisions = dict(db_session.execute(statement).tuples().all())
+    return revisions[ANY_TABLE]
+
+
+def add_tombstones(
+    db_session: Session, table: str, row_ids: Iterable[int], revision: int
+) -> None:
+    """Record deleted rows for delta sync. Does not commit."""
+    db_session.execute(
+        insert(Tombstone),
+        [
+            {"table_name": table, "row_id": row_id, "revision": revision}
+            for row_id in row_ids
+        ],
+    )
+
+
+def get_revisions(db_session: Session, *tables: str) -> Tuple[int, ...]:
+    """Current write counters of `tables`, in order; 0 if never written."""
+    revisions = dict(
+        db_session.execute(
+            select(TableRevision.table_name, TableRevision.revision).where(
+                TableRevision.table_name.in_(tables)
+            )
+        ).all()
+    )
+    return tuple(revisions.get(table, 0) for table in tables)
+
+
+def get_nutrition(db_session: Session, recipe_id: int) -> Optional[Nutrition]:
+    """Look up recipe. If override_nutrition is present, return that. Otherwise, calculate nutrition.
+
+    Raises:
+        NutritionCycleError: if the recipe (indirectly) contains itself
+    """
+    totals = nutrition_engine.recipe_totals(db_session, recipe_id)
+    if totals is None:
+        return None
     return Nutrition(
-        calories=food.calories,
-        fat=food.fat,
-        protein=food.protein,
-        carbohydrates=food.carbohydrates,
+        **{nutrient: round(amount) for nutrient, amount in zip(NUTRIENTS, totals)}
     )
 
 
+def index_food(db_session: Session, food: Food) -> None:
+    """Add or refresh a food's entry in the name search index. Does not commit."""
+    db_session.execute(delete(food_search).where(food_search.c.rowid == food.id))
+    db_session.execute(insert(food_search).values(rowid=food.id, name=food.name))
+
+
+def search_query(query: str, limit: int) -> Optional[Select[Tuple[Food]]]:
+    """Foods whose name contains a word starting with each term of `query`, best
+    match first, or None if `query` has no terms."""
+    terms = ['"' + term.replace('"', '""') + '"*' for term in query.split()]
+    if not terms:
+        return None
+
+    return (
+        select(Food)
+        .join(food_search, food_search.c.rowid == Food.id)
+        .where(text("food_search MATCH :match").bindparams(match=" ".join(terms)))
+        .order_by(text("food_search.rank"))
+        .limit(limit)
+    )
+
+
+def search_foods(db_session: Session, query: str, limit: int) -> List[Food]:
+    """Rank foods whose name contains a word starting with each term of `query`."""
+    statement = search_query(query, limit)
+    if statement is None:
+        return []
+    return list(db_session.scalars(statement))
+
+
 def get_food(db_session: Session, id: int) -> Optional[Food]:
     return db_session.query(Food).filter(Food.id == id).first()
 
 
 def get_recipe_ingredient(db_session: Session, id: int) -> Optional[RecipeIngredient]:
-    return (
-        db_session.query(RecipeIngredient)
-        .filter(RecipeIngredient.id == id)
-        .options(joinedload(RecipeIngredient.food))
-        .first()
-    )
+    return db_session.scalars(
+        select(RecipeIngredient)
+        .where(RecipeIngredient.id == id)
+        .options(selectinload(RecipeIngredient.food))
+    ).first()
 
 
-def create_recipe_ingredient(
-    db_session: Session, recipe: Recipe, ingredient_data: IngredientRequest
-) -> Optional[RecipeIngredient]:
-    food = get_food(db_session, ingredient_data.food_id)
-    assert food is not None, f"Food with ID {ingredient_data.food_id} not found."
+def get_foods_by_id(db_session: Session, food_ids: Iterable[int]) -> Dict[int, Food]:
+    """Load foods by ID in a single query.
 
-    # Create the recipe ingredient
-    recipe_ingredient = RecipeIngredient(
-        recipe=recipe,
-        food=food,
-        quantity=ingredient_data.quantity,
-        unit=ingredient_data.unit,
+    Raises:
+        MissingFoodsError: if any of the IDs doesn't exist
+    """
+    wanted = set(food_ids)
+    if not wanted:
+        return {}
+    foods = {
+        food.id: food
+        for food in db_session.scalars(select(Food).where(Food.id.in_(wanted)))
+    }
+    missing = wanted - foods.keys()
+    if missing:
+        raise MissingFoodsError(sorted(missing))
+    return foods
+
+
+def recipe_query() -> Select[Tuple[Recipe]]:
+    """Recipes with everything RecipeResponse reads loaded up front."""
+    return select(Recipe).options(
+        selectinload(Recipe.food),
+        selectinload(Recipe.ingredients).selectinload(RecipeIngredient.food),
+        selectinload(Recipe.instructions),
     )
 
-    db_session.add(recipe_ingredient)
-    db_session.commit()
-    db_session.refresh(recipe_ingredient)
 
-    return recipe_ingredient
+def get_recipe(db_session: Session, recipe_id: int) -> Optional[Recipe]:
+    """Get a recipe with its food, ingredients and instructions loaded."""
+    return db_session.scalars(recipe_query().where(Recipe.id == recipe_id)).first()
 
 
 def create_food(
@@ -80,15 +219,20 @@ def create_food(
         source_recipe=None,
         serving_size=request.serving_size,
         serving_size_unit=request.serving_size_unit,
+        density=request.density,
         calories=request.calories,
         fat=request.fat,
         protein=request.protein,
         carbohydrates=request.carbohydrates,
+        revision=bump_revisions(db_session, "food"),
     )
 
     db_session.add(food)
+    db_session.flush()
+    index_food(db_session, food)
     db_session.commit()
     db_session.refresh(food)
+    food_matrix.update([food], food.revision)
 
     # Return the response
     return FoodResponse(
@@ -97,43 +241,123 @@ def create_food(
         calories=food.calories,
         serving_size=food.serving_size,
         serving_size_unit=food.serving_size_unit,
+        density=food.density,
         fat=food.fat,
         protein=food.protein,
         carbohydrates=food.carbohydrates,
     )
 
 
+def insert_foods(
+    db_session: Session, requests: Sequence[Tuple[int, CreateFoodRequest]]
+) -> List[BulkFoodResult]:
+    """Insert a chunk of foods with a single INSERT ... RETURNING. Does not commit.
+
+    The chunk runs in a savepoint. If it fails, its rows are retried one at a time
+    so only the offending rows are reported as errors.
+
+    Args:
+        db_session: Database session
+        requests: (index, request) pairs, index being the row's position in the upload
+
+    Returns:
+        One result per request, in the same order
+    """
+    try:
+        with db_session.begin_nested():
+            revision = bump_revisions(db_session, "food")
+            rows = [
+                {**request.model_dump(), "revision": revision}
+                for _, request in requests
+            ]
+            # SQLite can't order RETURNING rows for a batched insert, but within one
+            # statement each new rowid is larger than the last, so sorting the IDs
+            # restores parameter order.
+            ids = sorted(db_session.scalars(insert(Food).returning(Food.id), rows))
+            db_session.execute(
+                insert(food_search),
+                [{"rowid": id, "name": row["name"]} for id, row in zip(ids, rows)],
+            )
+        return [
+            BulkFoodResult(index=index, id=id) for (index, _), id in zip(requests, ids)
+        ]
+    # The driver raises OverflowError, unwrapped, for integers SQLite can't store
+    except (SQLAlchemyError, OverflowError) as e:
+        if len(requests) == 1:
+            return [
+                BulkFoodResult(
+                    index=requests[0][0], error=str(getattr(e, "orig", None) or e)
+                )
+            ]
+        return [
+            result
+            for request in requests
+            for result in insert_foods(db_session, [request])
+        ]
+
+
 def create_recipe(db_session: Session, request: CreateRecipeRequest) -> Recipe:
-    # Create the Recipe first
-    recipe = Recipe(name=request.name, override_nutrition=request.override_nutrition)
-    db_session.add(recipe)
-    db_session.flush()  # Get the ID without committing
+    """Create a recipe, its food, ingredients and instructions in one transaction.
 
-    # Create the Food object for this recipe
-    food = Food(
+    Raises:
+        MissingFoodsError: if an ingredient references a food that doesn't exist
+    """
+    get_foods_by_id(db_session, (i.food_id for i in request.ingredients))
+    revision = bump_revisions(db_session, "food", "recipe")
+
+    # Create the Recipe with the Food object for it
+    recipe = Recipe(
         name=request.name,
-        source_recipe_id=recipe.id,
-        serving_size=1.0,  # Default serving size
-        serving_size_unit="serving",
-        calories=request.calories,
-        fat=request.fat,
-        protein=request.protein,
-        carbohydrates=request.carbohydrates,
+        override_nutrition=request.override_nutrition,
+        revision=revision,
+        food=Food(
+            name=request.name,
+            serving_size=1.0,  # Default serving size
+            serving_size_unit="serving",
+            calories=request.calories,
+            fat=request.fat,
+            protein=request.protein,
+            carbohydrates=request.carbohydrates,
+            revision=revision,
+        ),
     )
-    db_session.add(food)
-
-    # Create recipe ingredients
-    for ingredient_data in request.ingredients:
-        ingredient = create_recipe_ingredient(
-            db_session=db_session, recipe=recipe, ingredient_data=ingredient_data
+    db_session.add(recipe)
+    db_session.flush()  # Get the IDs without committing
+    index_food(db_session, recipe.food)
+
+    # Ingredient and instruction IDs aren't needed, so insert each in one executemany
+    if request.ingredients:
+        db_session.execute(
+            insert(RecipeIngredient),
+            [
+                {
+                    "recipe_id": recipe.id,
+                    "food_id": ingredient_data.food_id,
+                    "note": ingredient_data.note,
+                    "quantity": ingredient_data.quantity,
+                    "unit": ingredient_data.unit,
+                }
+                for ingredient_data in request.ingredients
+            ],
+        )
+    if request.instructions:
+        db_session.execute(
+            insert(RecipeInstruction),
+            [
+                {
+                    "recipe_id": recipe.id,
+                    "step": instruction_data.step,
+                    "text": instruction_data.text,
+                }
+                for instruction_data in request.instructions
+            ],
         )
-        assert ingredient is not None
-        recipe.ingredients.append(ingredient)
-
     db_session.commit()
-    db_session.refresh(recipe)
 
-    return recipe
+    # Reload the whole graph eagerly instead of lazily refreshing expired rows
+    created = get_recipe(db_session, recipe.id)
+    assert created is not None
+    return created
 
 
 def update_food(db_session: Session, request: UpdateFoodRequest) -> Optional[Food]:
@@ -141,14 +365,18 @@ def update_food(db_session: Session, request: UpdateFoodRequest) -> Optional[Foo
     food = db_session.query(Food).filter(Food.id == request.id).first()
     if not food:
         return None
+    old_nutrition = {nutrient: getattr(food, nutrient) for nutrient in NUTRIENTS}
 
     # Update each field if provided in the request
     if request.name is not None:
         food.name = request.name
+        index_food(db_session, food)
     if request.serving_size is not None:
         food.serving_size = request.serving_size
     if request.serving_size_unit is not None:
         food.serving_size_unit = request.serving_size_unit
+    if request.density is not None:
+        food.density = request.density
     if request.calories is not None:
         food.calories = request.calories
     if request.fat is not None:
@@ -157,10 +385,35 @@ def update_food(db_session: Session, request: UpdateFoodRequest) -> Optional[Foo
         food.protein = request.protein
     if request.carbohydrates is not None:
         food.carbohydrates = request.carbohydrates
+    if food.source_recipe_id is None:
+        nutrition_service.apply_food_change(
+            db_session,
+            food_id=food.id,
+            old=old_nutrition,
+            new={nutrient: getattr(food, nutrient) for nutrient in NUTRIENTS},
+        )
+    # Foods made from recipes count with their rolled-up nutrition, which changes
+    # with this food's nutrition and serving data: recompute their days once the
+    # rollups see the change
+    recompute: List[dt.date] = []
+    if any(
+        getattr(request, field) is not None
+        for field in ("serving_size", "serving_size_unit", "density", *NUTRIENTS)
+    ):
+        recompute = nutrition_service.recipe_food_dates(db_session, [food.id])
+    food.revision = bump_revisions(db_session, "food")
 
     # Commit changes to the database
     db_session.commit()
     db_session.refresh(food)
+    food_matrix.update([food], food.revision)
+
+    nutrition_engine.invalidate_food(food.id)
+    if food.source_recipe_id is not None:
+        nutrition_engine.invalidate_recipe(food.source_recipe_id)
+    if recompute:
+        nutrition_service.recompute_days(db_session, recompute)
+        db_session.refresh(food)
 
     return food
 
@@ -168,8 +421,16 @@ def update_food(db_session: Session, request: UpdateFoodRequest) -> Optional[Foo
 def update_recipe(
     db_session: Session, request: UpdateRecipeRequest
 ) -> Optional[Recipe]:
-    # Find the recipe by ID
-    recipe = db_session.query(Recipe).filter(Recipe.id == request.id).first()
+    """Update a recipe's fields, replacing ingredients/instructions if provided.
+
+    Raises:
+        MissingFoodsError: if an ingredient references a food that doesn't exist
+        NutritionCycleError: if the recipe would (indirectly) use itself
+    """
+    # Find the recipe by ID, with the food whose nutrition may change
+    recipe = db_session.scalars(
+        select(Recipe).where(Recipe.id == request.id).options(selectinload(Recipe.food))
+    ).first()
     if not recipe:
         return None
 
@@ -197,24 +458,22 @@ def update_recipe(
             RecipeIngredient.recipe_id == recipe.id
         ).delete()
 
-        # Then add the new ingredients
-        for ingredient_data in request.ingredients:
-            food = (
-                db_session.query(Food)
-                .filter(Food.id == ingredient_data.food_id)
-                .first()
+        # Then add the new ingredients, in one executemany like create_recipe
+        get_foods_by_id(db_session, (i.food_id for i in request.ingredients))
+        if request.ingredients:
+            db_session.execute(
+                insert(RecipeIngredient),
+                [
+                    {
+                        "recipe_id": recipe.id,
+                        "food_id": ingredient_data.food_id,
+                        "note": ingredient_data.note,
+                        "quantity": ingredient_data.quantity,
+                        "unit": ingredient_data.unit,
+                    }
+                    for ingredient_data in request.ingredients
+                ],
             )
-            assert (
-                food is not None
-            ), f"Food with ID {ingredient_data.food_id} not found."
-            recipe_ingredient = RecipeIngredient(
-                recipe_id=recipe.id,
-                food_id=food.id,
-                quantity=ingredient_data.quantity,
-                unit=ingredient_data.unit,
-                note=ingredient_data.note,
-            )
-            recipe.ingredients.append(recipe_ingredient)
 
     # Update instructions if provided
     if request.instructions is not None:
@@ -224,31 +483,130 @@ def update_recipe(
         ).delete()
 
         # Then add the new instructions
-        for instruction_data in request.instructions:
-            recipe_instruction = RecipeInstruction(
-                recipe_id=recipe.id,
-                step=instruction_data.step,
-                text=instruction_data.text,
+        if request.instructions:
+            db_session.execute(
+                insert(RecipeInstruction),
+                [
+                    {
+                        "recipe_id": recipe.id,
+                        "step": instruction_data.step,
+                        "text": instruction_data.text,
+                    }
+                    for instruction_data in request.instructions
+                ],
             )
-            recipe.instructions.append(recipe_instruction)
 
-    # Commit changes to the database
+    # A cycle would fail every later nutrition read of the recipe and its users, so
+    # refuse it before it is saved
+    if request.ingredients is not None or request.override_nutrition is not None:
+        db_session.flush()
+        try:
+            check_acyclic(db_session, recipe.id)
+        except NutritionCycleError:
+            db_session.rollback()
+            raise
+
+    # The recipe's food and its users count with rolled-up nutrition, so their days
+    # are recomputed once the rollups see the change
+    recompute = nutrition_service.recipe_food_dates(db_session, [food.id])
+    recipe.revision = food.revision = bump_revisions(db_session, "food", "recipe")
+
+    # Commit changes to the database. The recipe is expired from here on, so use the
+    # request's ID rather than reloading it.
     db_session.commit()
-    db_session.refresh(recipe)
+    nutrition_engine.invalidate_recipe(request.id)
+    nutrition_service.recompute_days(db_session, recompute)
 
-    return recipe
+    return get_recipe(db_session, request.id)
 
 
 def get_recipes(db_session: Session) -> List[Recipe]:
-    """Get all recipes with their ingredients and food data."""
-    return (
-        db_session.query(Recipe)
-        .options(
-            joinedload(Recipe.food),
-            joinedload(Recipe.ingredients).joinedload(RecipeIngredient.food),
+    """Get all recipes with their food, ingredients and instructions loaded."""
+    return list(db_session.scalars(recipe_query()))
+
+
+def get_recipe_documents(
+    db_session: Session, recipe_ids: Optional[Select[Tuple[int]]] = None
+) -> List[Dict[str, Any]]:
+    """Get all recipes as plain dicts shaped like RecipeResponse.
+
+    Reads columns with three queries and builds no ORM objects, so the listing can
+    be encoded straight to JSON without validating anything.
+
+    Args:
+        db_session: Database session
+        recipe_ids: Only return the recipes whose ID this query selects
+    """
+    food_fields = tuple(FoodResponse.model_fields)
+    food_columns = [getattr(Food, name) for name in food_fields]
+    # Foods used by many recipes share one dict
+    foods: Dict[int, Dict[str, Any]] = {}
+
+    def food_document(values: Sequence[Any]) -> Dict[str, Any]:
+        document = dict(zip(food_fields, values))
+        return foods.setdefault(document["id"], document)
+
+    recipe_select = (
+        select(Recipe.id, Recipe.name, *food_columns)
+        .join(Food, Food.source_recipe_id == Recipe.id)
+        .order_by(Recipe.id)
+    )
+    ingredient_select = (
+        select(
+            RecipeIngredient.recipe_id,
+            RecipeIngredient.note,
+            RecipeIngredient.quantity,
+            RecipeIngredient.unit,
+            *food_columns,
         )
-        .all()
+        .join(Food, Food.id == RecipeIngredient.food_id)
+        .order_by(RecipeIngredient.id)
     )
+    instruction_select = select(
+        RecipeInstruction.recipe_id,
+        RecipeInstruction.id,
+        RecipeInstruction.step,
+        RecipeInstruction.text,
+    ).order_by(RecipeInstruction.id)
+    if recipe_ids is not None:
+        recipe_select = recipe_select.where(Recipe.id.in_(recipe_ids))
+        ingredient_select = ingredient_select.where(
+            RecipeIngredient.recipe_id.in_(recipe_ids)
+        )
+        instruction_select = instruction_select.where(
+            RecipeInstruction.recipe_id.in_(recipe_ids)
+        )
+
+    recipes: Dict[int, Dict[str, Any]] = {}
+    for recipe_id, name, *food in db_session.execute(recipe_select):
+        recipes[recipe_id] = {
+            "food": food_document(food),
+            "id": recipe_id,
+            "name": name,
+            "ingredients": [],
+            "instructions": [],
+        }
+
+    for recipe_id, note, quantity, unit, *food in db_session.execute(ingredient_select):
+        if recipe_id in recipes:
+            recipes[recipe_id]["ingredients"].append(
+                {
+                    "food": food_document(food),
+                    "note": note,
+                    "quantity": quantity,
+                    "unit": unit,
+                }
+            )
+
+    for recipe_id, instruction_id, step, instruction_text in db_session.execute(
+        instruction_select
+    ):
+        if recipe_id in recipes:
+            recipes[recipe_id]["instructions"].append(
+                {"id": instruction_id, "step": step, "text": instruction_text}
+            )
+
+    return list(recipes.values())
 
 
 def delete_recipe(db_session: Session, recipe_id: int) -> bool:
@@ -257,33 +615,80 @@ def delete_recipe(db_session: Session, recipe_id: int) -> bool:
     if not recipe:
         return False
 
-    # Delete the recipe and its ingredients
+    # Delete the recipe and its ingredients. Its food's planned entries stop
+    # counting, and its users' rollups lose an ingredient.
+    recompute: List[dt.date] = []
+    if recipe.food is not None:
+        db_session.execute(
+            delete(food_search).where(food_search.c.rowid == recipe.food.id)
+        )
+        recompute = nutrition_service.recipe_food_dates(db_session, [recipe.food.id])
+    revision = bump_revisions(db_session, "food", "recipe")
+    add_tombstones(db_session, "recipe", [recipe.id], revision)
+    if recipe.food is not None:
+        add_tombstones(db_session, "food", [recipe.food.id], revision)
     db_session.delete(recipe)
     db_session.commit()
+    nutrition_engine.invalidate_recipe(recipe_id)
+    nutrition_service.recompute_days(db_session, recompute)
     return True
 
 
-def get_foods(db_session: Session) -> List[Food]:
-    """Get all foods."""
-    return db_session.query(Food).all()
+def get_foods(
+    db_session: Session,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> Iterator[RowMapping]:
+    """Stream foods in ID order without loading the whole table.
+
+    Args:
+        db_session: Database session, which must stay open while iterating
+        after_id: Keyset cursor; only foods with a greater ID are returned
+        limit: Maximum number of foods to return
+        fields: Columns to select, defaults to all of FOOD_FIELDS. ``id`` is always
+            included so the caller can continue from the last row.
+
+    Returns:
+        Iterator of row mappings keyed by column name
+    """
+    names = ["id", *(f for f in fields if f != "id")] if fields else FOOD_FIELDS
+    query = select(*(getattr(Food, name) for name in names)).order_by(Food.id)
+    if after_id is not None:
+        query = query.where(Food.id > after_id)
+    if limit is not None:
+        query = query.limit(limit)
+
+    result = db_session.execute(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+    yield from result.mappings()
 
 
 #
 # Planned Food
+def planned_food_query(
+    start_date: dt.date, end_date: dt.date
+) -> Select[Tuple[PlannedFood]]:
+    """Planned foods between two dates with their food loaded.
+
+    The range is served by the (date, meal) index, which also provides the order.
+    Foods are loaded with one IN query over the distinct food IDs rather than joined
+    onto every planned row.
+    """
+    return (
+        select(PlannedFood)
+        .options(selectinload(PlannedFood.food))
+        .where(PlannedFood.date >= start_date, PlannedFood.date <= end_date)
+        .order_by(PlannedFood.date, PlannedFood.meal)
+    )
+
+
 def get_planned_foods(
     db_session: Session,
     start_date: dt.date,
     end_date: dt.date,
 ) -> List["PlannedFood"]:
-    query = db_session.query(PlannedFood).options(
-        joinedload(PlannedFood.food).joinedload(Food.source_recipe),
-    )
-
-    # Apply date range filters (both are required)
-    query = query.filter(PlannedFood.date >= start_date)
-    query = query.filter(PlannedFood.date <= end_date)
-
-    return query.order_by(PlannedFood.date, PlannedFood.meal).all()
+    """Get planned foods between two dates, inclusive of both ends."""
+    return list(db_session.scalars(planned_food_query(start_date, end_date)))
 
 
 def create_planned_food(
@@ -307,9 +712,11 @@ def create_planned_food(
         servings=request.servings,
         food=food,
         eaten=request.eaten,
+        revision=bump_revisions(db_session, "planned_food"),
     )
 
     db_session.add(planned_food)
+    nutrition_service.apply_planned_food(db_session, planned_food, food)
     db_session.commit()
     db_session.refresh(planned_food)
 
@@ -333,6 +740,11 @@ def update_planned_food(
     )
     if not planned_food:
         return None
+    nutrition_service.apply_planned_food(
+        db_session, planned_food, planned_food.food, sign=-1
+    )
+    food = planned_food.food
+    was_eaten = planned_food.eaten
 
     # Update fields if provided
     if request.date is not None:
@@ -350,6 +762,10 @@ def update_planned_food(
         assert food is not None, f"Food with ID {request.food_id} not found."
         planned_food.food_id = request.food_id
 
+    nutrition_service.apply_planned_food(db_session, planned_food, food)
+    if planned_food.eaten and not was_eaten:
+        consume_eaten(db_session, food, planned_food.servings)
+    planned_food.revision = bump_revisions(db_session, "planned_food")
     db_session.commit()
     db_session.refresh(planned_food)
 
@@ -372,9 +788,205 @@ def delete_planned_food(db_session: Session, planned_food_id: int) -> bool:
     if not planned_food:
         return False
 
+    nutrition_service.apply_planned_food(
+        db_session, planned_food, planned_food.food, sign=-1
+    )
+    revision = bump_revisions(db_session, "planned_food")
+    add_tombstones(db_session, "planned_food", [planned_food.id], revision)
     db_session.delete(planned_food)
     db_session.commit()
     return True
 
 
 # Planned Food
+
+
+#
+# Inventory
+def get_inventory(
+    db_session: Session, state: Optional[FoodState] = None
+) -> List[Inventory]:
+    """Get stock, optionally of one state only, ordered by food."""
+    query = (
+        select(Inventory)
+        .options(selectinload(Inventory.food))
+        .order_by(Inventory.food_id, Inventory.state)
+    )
+    if state is not None:
+        query = query.where(Inventory.state == state)
+    return list(db_session.scalars(query))
+
+
+def add_inventory(db_session: Session, request: AddInventoryRequest) -> Inventory:
+    """Add servings of a food to stock, creating its (food, state) row if needed.
+
+    Raises:
+        MissingFoodsError: if the food doesn't exist
+    """
+    get_foods_by_id(db_session, [request.food_id])
+    statement = sqlite_insert(Inventory).values(
+        food_id=request.food_id, state=request.state, quantity=request.quantity
+    )
+    inventory_id = db_session.scalar(
+        statement.on_conflict_do_update(
+            index_elements=[Inventory.food_id, Inventory.state],
+            set_={"quantity": Inventory.quantity + statement.excluded.quantity},
+        ).returning(Inventory.id)
+    )
+    db_session.commit()
+    inventory = db_session.get(Inventory, inventory_id)
+    assert inventory is not None
+    return inventory
+
+
+def update_inventory(
+    db_session: Session, request: UpdateInventoryRequest
+) -> Optional[Inventory]:
+    """Set the servings in stock of a food in a state.
+
+    Returns:
+        Updated Inventory object or None if the food has no stock in that state
+    """
+    inventory = db_session.scalar(
+        select(Inventory).where(
+            Inventory.food_id == request.food_id, Inventory.state == request.state
+        )
+    )
+    if inventory is None:
+        return None
+    inventory.quantity = request.quantity
+    db_session.commit()
+    db_session.refresh(inventory)
+    return inventory
+
+
+def consume_inventory(
+    db_session: Session, servings: Dict[int, float], state: FoodState
+) -> None:
+    """Take servings of foods out of their stock in `state`, in one UPDATE.
+
+    Stock doesn't go below zero, and foods without stock are skipped. Does not
+    commit, so it lands with the write that used the food.
+
+    Args:
+        db_session: Database session
+        servings: Food ID -> servings used
+        state: Stock to take them from
+    """
+    if not servings:
+        return
+    db_session.execute(
+        update(Inventory)
+        .where(Inventory.food_id.in_(servings), Inventory.state == state)
+        .values(
+            quantity=func.max(
+                Inventory.quantity - case(servings, value=Inventory.food_id), 0.0
+            )
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def consume_eaten(db_session: Session, food: Food, servings: float) -> None:
+    """Take what eating `servings` of `food` used out of stock. Does not commit.
+
+    A food made from a recipe was cooked from its ingredients, so their UNCOOKED
+    stock goes down. Any other food was eaten as it was, so its own READY stock
+    does.
+    """
+    used: Dict[int, float] = defaultdict(float)
+    if food.source_recipe_id is not None:
+        node = RecipeNode(
+            id=food.source_recipe_id, food_id=food.id, override_nutrition=False
+        )
+        node.ingredients.extend(
+            tuple(row)
+            for row in db_session.execute(
+                select(
+                    RecipeIngredient.food_id,
+                    RecipeIngredient.quantity,
+                    RecipeIngredient.unit,
+                )
+                .join(Food, Food.id == RecipeIngredient.food_id)
+                .where(RecipeIngredient.recipe_id == food.source_recipe_id)
+            )
+        )
+        food_matrix.refresh(db_session)
+        scale_ingredients(db_session, [node])
+        for (food_id, _, _), per_serving in zip(
+            node.ingredients, node.servings.tolist()
+        ):
+            used[food_id] += servings * per_serving
+    if used:
+        consume_inventory(db_session, used, FoodState.UNCOOKED)
+    else:
+        consume_inventory(db_session, {food.id: servings}, FoodState.READY)
+
+
+#
+# Delta sync
+@dataclass
+class Changes:
+    # Pass as `since` to get the changes after these
+    revision: int
+    foods: List[Food]
+    # Shaped like RecipeResponse, see get_recipe_documents
+    recipes: List[Dict[str, Any]]
+    planned_foods: List[PlannedFood]
+    # Deleted row IDs by table
+    deleted: Dict[str, List[int]]
+
+
+def get_changes(db_session: Session, since: int = 0) -> Changes:
+    """Foods, recipes and planned foods written after revision `since`, and the IDs
+    of those deleted. With `since` 0, everything and no deletions.
+
+    Recipes and planned foods embed foods, so they are also returned when a food
+    they embed changed.
+    """
+    # Read before the rows: everything committed up to this revision is visible to
+    # the queries below. Rows committed meanwhile may be returned too; the client
+    # gets them again on its next sync, which is harmless.
+    (revision,) = get_revisions(db_session, ANY_TABLE)
+
+    foods = select(Food).order_by(Food.id)
+    recipe_ids: Optional[Select[Tuple[int]]] = None
+    planned_foods = (
+        select(PlannedFood)
+        .options(selectinload(PlannedFood.food))
+        .order_by(PlannedFood.id)
+    )
+    deleted: Dict[str, List[int]] = {table: [] for table in SYNCED_TABLES}
+    if since:
+        changed_foods = select(Food.id).where(Food.revision > since)
+        foods = foods.where(Food.revision > since)
+        recipe_ids = select(Recipe.id).where(
+            or_(
+                Recipe.revision > since,
+                Recipe.id.in_(
+                    select(Food.source_recipe_id).where(Food.revision > since)
+                ),
+                Recipe.id.in_(
+                    select(RecipeIngredient.recipe_id).where(
+                        RecipeIngredient.food_id.in_(changed_foods)
+                    )
+                ),
+            )
+        )
+        planned_foods = planned_foods.where(
+            or_(PlannedFood.revision > since, PlannedFood.food_id.in_(changed_foods))
+        )
+        for table, row_id in db_session.execute(
+            select(Tombstone.table_name, Tombstone.row_id)
+            .where(Tombstone.revision > since)
+            .order_by(Tombstone.id)
+        ):
+            deleted[table].append(row_id)
+
+    return Changes(
+        revision=revision,
+        foods=list(db_session.scalars(foods)),
+        recipes=get_recipe_documents(db_session, recipe_ids),
+        planned_foods=list(db_session.scalars(planned_foods)),
+        deleted=deleted,
+    )
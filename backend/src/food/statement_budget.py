@@ -0,0 +1,112 @@
+"""
+Per-request SQL statement budget, a test-mode guard against N+1 queries.
+When settings.MAX_STATEMENTS_PER_REQUEST is set, every engine counts the statements
+it executes on behalf of the current request, and the statement that goes over the
+budget raises StatementBudgetExceeded, failing the request. A lazy load inside a
+loop therefore fails as soon as the data grows, instead of silently slowing down.
+
+The count lives in a context variable, which is copied into the threadpool that
+runs sync routes and streaming bodies, so statements from either are attributed to
+the request that issued them.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+import logging
+from typing import Any, Iterator, Optional
+
+from sqlalchemy import Engine, event
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StatementCounter:
+    limit: Optional[int]
+    count: int = 0
+
+
+class StatementBudgetExceeded(RuntimeError):
+    """A request issued more SQL statements than its budget allows."""
+
+    def __init__(self, limit: int, statement: str):
+        self.limit = limit
+        self.statement = statement
+        super().__init__(
+            f"More than {limit} SQL statements in one request, the last was: "
+            f"{statement[:200]}"
+        )
+
+
+_counter: ContextVar[Optional[StatementCounter]] = ContextVar(
+    "statement_counter", default=None
+)
+
+
+def _before_cursor_execute(
+    conn: Any,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Any,
+    executemany: bool,
+) -> None:
+    counter = _counter.get()
+    if counter is None:
+        return
+    counter.count += 1
+    if counter.limit is not None and counter.count > counter.limit:
+        raise StatementBudgetExceeded(counter.limit, statement)
+
+
+def track(engine: Engine) -> None:
+    """Count the statements `engine` executes towards the current budget."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+
+
+@contextmanager
+def count_statements(limit: Optional[int] = None) -> Iterator[StatementCounter]:
+    """Count statements issued by tracked engines within the block.
+
+    Args:
+        limit: Raise StatementBudgetExceeded on the statement after this many
+    """
+    counter = StatementCounter(limit=limit)
+    token = _counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _counter.reset(token)
+
+
+class StatementBudgetMiddleware:
+    """Give every HTTP request its own statement budget."""
+
+    def __init__(self, app: ASGIApp, limit: int) -> None:
+        self.app = app
+        self.limit = limit
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with count_statements(self.limit) as counter:
+            try:
+                await self.app(scope, receive, send)
+            except StatementBudgetExceeded:
+                logger.error(
+                    "%s %s exceeded its budget of %d SQL statements",
+                    scope["method"],
+                    scope["path"],
+                    self.limit,
+                )
+                raise
+            logger.debug(
+                "%s %s issued %d SQL statements",
+                scope["method"],
+                scope["path"],
+                counter.count,
+            )
@@ -0,0 +1,153 @@
+"""
+SQLite storage profiles.
+A profile is a named set of connect-time PRAGMAs and pool settings, selected with
+settings.STORAGE_PROFILE and applied to every connection the engines open:
+
+- durable: SQLite's defaults (rollback journal, synchronous=FULL). Writers block
+  readers, so concurrent edits queue behind each other.
+- balanced: WAL journal with synchronous=NORMAL, a memory-mapped read path and a
+  busy timeout. Readers no longer wait on the writer and a commit no longer fsyncs;
+  the last transactions can be lost on power failure, but the file can't corrupt.
+- bulk-load: like balanced but with synchronous=OFF, a larger page cache and a
+  single pooled connection, for seeding and imports that can be re-run after a crash.
+
+The sqlite3 driver opens transactions on its own, only before writes, so SELECTs
+run outside any transaction and a SAVEPOINT issued first becomes the outermost
+transaction, committed by its RELEASE. The engines turn that off and emit BEGIN
+themselves whenever SQLAlchemy starts a transaction, so a session's reads share
+one snapshot and begin_nested() nests. Writable engines begin IMMEDIATE, taking
+the write lock up front; the `sqlite_begin` execution option overrides the mode.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import Connection, Engine, create_engine, event, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+
+@dataclass(frozen=True)
+class StorageProfile:
+    # Applied in order on every new connection
+    pragmas: Tuple[Tuple[str, str], ...]
+    # Keyword arguments for the engine's connection pool
+    pool: Dict[str, Any] = field(default_factory=dict)
+
+
+STORAGE_PROFILES: Dict[str, StorageProfile] = {
+    "durable": StorageProfile(
+        pragmas=(
+            ("journal_mode", "DELETE"),
+            ("synchronous", "FULL"),
+            ("busy_timeout", "5000"),
+        ),
+    ),
+    "balanced": StorageProfile(
+        pragmas=(
+            ("journal_mode", "WAL"),
+            ("synchronous", "NORMAL"),
+            ("busy_timeout", "5000"),
+            ("mmap_size", str(256 * 1024 * 1024)),
+            # Negative sizes are in KiB
+            ("cache_size", str(-32 * 1024)),
+            ("temp_store", "MEMORY"),
+        ),
+        pool={"pool_size": 10, "max_overflow": 20},
+    ),
+    "bulk-load": StorageProfile(
+        pragmas=(
+            ("journal_mode", "WAL"),
+            ("synchronous", "OFF"),
+            ("busy_timeout", "30000"),
+            ("mmap_size", str(1024 * 1024 * 1024)),
+            ("cache_size", str(-256 * 1024)),
+            ("temp_store", "MEMORY"),
+        ),
+        # SQLite has one writer at a time, extra connections would only contend
+        pool={"pool_size": 1, "max_overflow": 0},
+    ),
+}
+
+
+def get_profile(name: str) -> StorageProfile:
+    try:
+        return STORAGE_PROFILES[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown storage profile {name!r}, expected one of "
+            f"{sorted(STORAGE_PROFILES)}"
+        ) from None
+
+
+def _on_connect(profile: StorageProfile, read_only: bool) -> Any:
+    pragmas = profile.pragmas + ((("query_only", "ON"),) if read_only else ())
+
+    def apply_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+        # Leave transaction control to _on_begin
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    return apply_pragmas
+
+
+def _on_begin(read_only: bool) -> Any:
+    # A write transaction that read before a concurrent commit can't be upgraded
+    # in WAL mode, and busy_timeout doesn't retry that, so writers lock up front
+    default = "DEFERRED" if read_only else "IMMEDIATE"
+
+    def begin(connection: Connection) -> None:
+        mode = connection.get_execution_options().get("sqlite_begin", default)
+        connection.exec_driver_sql(f"BEGIN {mode}")
+
+    return begin
+
+
+def _pool_options(
+    url: str, profile: StorageProfile, pool_size: Optional[int]
+) -> Dict[str, Any]:
+    # In-memory databases use a single-connection pool that takes no sizing options
+    if make_url(url).database in (None, "", ":memory:"):
+        return {}
+    if pool_size is None:
+        return profile.pool
+    return {**profile.pool, "pool_size": pool_size}
+
+
+def create_sqlite_engine(
+    url: str,
+    profile_name: str,
+    read_only: bool = False,
+    pool_size: Optional[int] = None,
+) -> Engine:
+    """Create an engine whose connections are configured by the named profile.
+
+    Args:
+        url: Database URL
+        profile_name: Key of STORAGE_PROFILES
+        read_only: Reject writes on every connection (PRAGMA query_only)
+        pool_size: Override the profile's pool size
+    """
+    profile = get_profile(profile_name)
+    engine = create_engine(url, **_pool_options(url, profile, pool_size))
+    event.listen(engine, "connect", _on_connect(profile, read_only))
+    event.listen(engine, "begin", _on_begin(read_only))
+    return engine
+
+
+def create_async_sqlite_engine(
+    url: str,
+    profile_name: str,
+    read_only: bool = False,
+    pool_size: Optional[int] = None,
+) -> AsyncEngine:
+    """Async counterpart of `create_sqlite_engine`."""
+    profile = get_profile(profile_name)
+    engine = create_async_engine(url, **_pool_options(url, profile, pool_size))
+    event.listen(engine.sync_engine, "connect", _on_connect(profile, read_only))
+    event.listen(engine.sync_engine, "begin", _on_begin(read_only))
+    return engine
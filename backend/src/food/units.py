@@ -0,0 +1,208 @@
+"""
+Unit parsing and conversion.
+Units are free text on both RecipeIngredient.unit and Food.serving_size_unit. They are
+parsed once per distinct string into a dimension (mass, volume, count or servings)
+and a factor to that dimension's base unit (g, ml, each, serving), and interned
+into a table so whole columns of quantities can be converted with array lookups.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+import threading
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from src.food.constants import Dimension
+
+# Base units: g, ml, each, serving
+_UNITS: Dict[str, tuple[Dimension, float]] = {
+    # Mass
+    "mg": (Dimension.MASS, 0.001),
+    "g": (Dimension.MASS, 1.0),
+    "kg": (Dimension.MASS, 1000.0),
+    "oz": (Dimension.MASS, 28.349523125),
+    "lb": (Dimension.MASS, 453.59237),
+    # Volume
+    "ml": (Dimension.VOLUME, 1.0),
+    "cl": (Dimension.VOLUME, 10.0),
+    "dl": (Dimension.VOLUME, 100.0),
+    "l": (Dimension.VOLUME, 1000.0),
+    "tsp": (Dimension.VOLUME, 4.92892159375),
+    "tbsp": (Dimension.VOLUME, 14.78676478125),
+    "fl oz": (Dimension.VOLUME, 29.5735295625),
+    "cup": (Dimension.VOLUME, 236.5882365),
+    "pint": (Dimension.VOLUME, 473.176473),
+    "quart": (Dimension.VOLUME, 946.352946),
+    "gallon": (Dimension.VOLUME, 3785.411784),
+    # Count
+    "each": (Dimension.COUNT, 1.0),
+    "dozen": (Dimension.COUNT, 12.0),
+    # Servings
+    "serving": (Dimension.SERVING, 1.0),
+}
+
+_ALIASES = {
+    "gram": "g",
+    "gm": "g",
+    "gr": "g",
+    "milligram": "mg",
+    "kilogram": "kg",
+    "kilo": "kg",
+    "ounce": "oz",
+    "pound": "lb",
+    "lbs": "lb",
+    "milliliter": "ml",
+    "millilitre": "ml",
+    "centiliter": "cl",
+    "deciliter": "dl",
+    "liter": "l",
+    "litre": "l",
+    "teaspoon": "tsp",
+    "tablespoon": "tbsp",
+    "tbs": "tbsp",
+    "tbl": "tbsp",
+    "fluid ounce": "fl oz",
+    "floz": "fl oz",
+    "pt": "pint",
+    "qt": "quart",
+    "gal": "gallon",
+    "ea": "each",
+    "piece": "each",
+    "pc": "each",
+    "pcs": "each",
+    "item": "each",
+    "whole": "each",
+    "unit": "each",
+    "portion": "serving",
+}
+
+_DIMENSIONS = list(Dimension)
+UNKNOWN = -1
+
+
+@dataclass(frozen=True)
+class Unit:
+    name: str
+    # None if the unit isn't recognized; it then only matches the exact same name
+    dimension: Optional[Dimension]
+    to_base: float
+
+
+@lru_cache(maxsize=1024)
+def parse_unit(text: str) -> Unit:
+    """Normalize a free-text unit such as "Tbsp.", "cups" or "Fluid Ounces"."""
+    name = " ".join(text.lower().replace(".", " ").split())
+    for candidate in (name, name[:-1] if name.endswith("s") else None):
+        if candidate is None:
+            continue
+        candidate = _ALIASES.get(candidate, candidate)
+        if candidate in _UNITS:
+            dimension, to_base = _UNITS[candidate]
+            return Unit(name=candidate, dimension=dimension, to_base=to_base)
+    return Unit(name=name, dimension=None, to_base=1.0)
+
+
+class UnitTable:
+    """
+    Interned units compiled into lookup arrays.
+    A unit code indexes `dimension` and `to_base`; distinct strings that normalize to
+    the same unit share a code, so conversions never touch strings after `codes`.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._codes: Dict[str, int] = {}
+        self._unit_codes: Dict[Unit, int] = {}
+        self.dimension = np.empty(0, dtype=np.int8)
+        self.to_base = np.empty(0, dtype=np.float64)
+
+    def code(self, text: str) -> int:
+        code = self._codes.get(text)
+        if code is None:
+            code = self._intern(text)
+        return code
+
+    def codes(self, units: Sequence[str]) -> np.ndarray:
+        """Unit codes for a column of unit strings, parsing each distinct string once."""
+        distinct, inverse = np.unique(
+            np.asarray(units, dtype=object), return_inverse=True
+        )
+        return np.fromiter(
+            (self.code(text) for text in distinct), dtype=np.int64, count=len(distinct)
+        )[inverse]
+
+    def _intern(self, text: str) -> int:
+        unit = parse_unit(text)
+        with self._lock:
+            code = self._unit_codes.get(unit)
+            if code is None:
+                code = self._unit_codes[unit] = len(self._unit_codes)
+                dimension = (
+                    UNKNOWN
+                    if unit.dimension is None
+                    else _DIMENSIONS.index(unit.dimension)
+                )
+                self.dimension = np.append(self.dimension, np.int8(dimension))
+                self.to_base = np.append(self.to_base, unit.to_base)
+            self._codes[text] = code
+        return code
+
+    def convert(
+        self,
+        quantity: np.ndarray,
+        unit: np.ndarray,
+        target: np.ndarray,
+        density: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Convert quantities between unit codes.
+        :param density: g/ml per row, used to cross between mass and volume. NaN if unknown.
+        :return: Converted quantities, NaN where the units can't be reconciled
+        """
+        dimension, to_base = self.dimension, self.to_base
+        amount = quantity * to_base[unit]
+        source_dim = dimension[unit]
+        target_dim = dimension[target]
+
+        if density is not None:
+            mass, volume = (
+                _DIMENSIONS.index(Dimension.MASS),
+                _DIMENSIONS.index(Dimension.VOLUME),
+            )
+            known = np.nan_to_num(density) > 0
+            to_mass = known & (source_dim == volume) & (target_dim == mass)
+            to_volume = known & (source_dim == mass) & (target_dim == volume)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                amount = np.where(to_mass, amount * density, amount)
+                amount = np.where(to_volume, amount / density, amount)
+            source_dim = np.where(to_mass | to_volume, target_dim, source_dim)
+
+        compatible = ((source_dim == target_dim) & (source_dim != UNKNOWN)) | (
+            unit == target
+        )
+        return np.where(compatible, amount / to_base[target], np.nan)
+
+    def to_servings(
+        self,
+        quantity: np.ndarray,
+        unit: np.ndarray,
+        serving_size: np.ndarray,
+        serving_unit: np.ndarray,
+        density: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Number of servings each quantity amounts to.
+        Quantities in servings count as they are, whatever the food's serving unit.
+        :return: Servings, NaN where the unit can't be converted to the serving unit
+          (e.g. "1 cup" of a food measured in grams with no density)
+        """
+        converted = self.convert(quantity, unit, serving_unit, density)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            servings = converted / serving_size
+        servings = np.where(np.isfinite(servings), servings, np.nan)
+        in_servings = self.dimension[unit] == _DIMENSIONS.index(Dimension.SERVING)
+        return np.where(in_servings, quantity * self.to_base[unit], servings)
+
+
+unit_table = UnitTable()
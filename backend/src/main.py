@@ -1,10 +1,37 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from src.config import settings
 
+from src.backup.router import router as backup_router
+from src.food.database import ReadSessionLocal
+from src.food.food_matrix import food_matrix
+from src.food.metrics import MetricsMiddleware, router as metrics_router
 from src.food.router import router as food_router
+from src.food.statement_budget import StatementBudgetMiddleware
+from src.nutrition.router import router as nutrition_router
+from src.planner.router import router as planner_router
+from src.shopping.router import router as shopping_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Load the food matrix now rather than on the first nutrition request
+    with ReadSessionLocal() as db_session:
+        food_matrix.refresh(db_session)
+    yield
+    if settings.ASYNC_DATABASE:
+        from src.food.async_database import async_engine
+
+        # Close pooled aiosqlite connections, whose worker threads keep the process alive
+        await async_engine.dispose()
+
 
-app = FastAPI(title="Grocery, Meal Planning, and Calorie Tracking API")
+app = FastAPI(
+    title="Grocery, Meal Planning, and Calorie Tracking API", lifespan=lifespan
+)
 
 # Configure CORS
 origins = [
@@ -22,7 +49,28 @@ app.add_middleware(
     max_age=86400,  # Cache preflight requests for 24 hours
 )
 
+if settings.ASYNC_DATABASE:
+    from src.food.async_router import router as async_food_router
+    from src.nutrition.async_router import router as async_nutrition_router
+
+    # Registered first so they shadow the sync versions of the same routes
+    app.include_router(async_food_router, prefix="/api")
+    app.include_router(async_nutrition_router, prefix="/api")
+
+if settings.MAX_STATEMENTS_PER_REQUEST is not None:
+    app.add_middleware(
+        StatementBudgetMiddleware, limit=settings.MAX_STATEMENTS_PER_REQUEST
+    )
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router, prefix="/api")
+
 app.include_router(food_router, prefix="/api")
+app.include_router(nutrition_router, prefix="/api")
+app.include_router(backup_router, prefix="/api")
+app.include_router(shopping_router, prefix="/api")
+app.include_router(planner_router, prefix="/api")
 
 if __name__ == "__main__":
     import uvicorn
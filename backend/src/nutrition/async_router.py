@@ -0,0 +1,49 @@
+from typing import List
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+import datetime as dt
+
+from src.food.async_database import get_async_db_session
+from src.food.serialization import json_list_response
+from src.nutrition import service
+from src.nutrition.models import DailyNutritionResponse
+from src.nutrition.router import check_range
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Async variants of the nutrition routes, see src.food.async_router
+router = APIRouter()
+
+
+@router.get("/nutrition/daily", response_model=List[DailyNutritionResponse])
+async def get_daily_nutrition(
+    start: dt.date,
+    end: dt.date,
+    db_session: AsyncSession = Depends(get_async_db_session),
+) -> Response:
+    """Planned and eaten nutrition totals per day, inclusive of both ends."""
+    check_range(start, end)
+    return json_list_response(
+        DailyNutritionResponse,
+        await db_session.run_sync(
+            service.get_daily_nutrition, start_date=start, end_date=end
+        ),
+    )
+
+
+@router.get("/nutrition/meals", response_model=List[DailyNutritionResponse])
+async def get_meal_nutrition(
+    start: dt.date,
+    end: dt.date,
+    db_session: AsyncSession = Depends(get_async_db_session),
+) -> Response:
+    """Planned and eaten nutrition totals per day and meal, inclusive of both ends."""
+    check_range(start, end)
+    return json_list_response(
+        DailyNutritionResponse,
+        await db_session.run_sync(
+            service.get_daily_nutrition, start_date=start, end_date=end, by_meal=True
+        ),
+    )
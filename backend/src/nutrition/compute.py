@@ -0,0 +1,85 @@
+"""
+Nutrition of unsaved ingredient lists.
+The lists of a request are flattened into one column of ingredient lines. Their
+foods are gathered from the food matrix at once, quantities are converted to
+servings in one vectorized pass, and the lines are summed per list. Lines whose
+unit can't be converted to servings of their food are left out and reported. An
+ingredient made from a recipe counts with the recipe's rolled-up nutrition, as it
+would in a saved recipe; the recipes of all lists are loaded together.
+"""
+
+from typing import List
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from src.food.food_matrix import food_matrix
+from src.food.nutrition import NUTRIENTS, nutrition_engine
+from src.food.service import MissingFoodsError
+from src.food.units import unit_table
+from src.nutrition.models import (
+    ComputedNutrition,
+    ComputeNutritionRequest,
+    ComputeNutritionResponse,
+    NutritionTotals,
+)
+
+
+def compute_nutrition(
+    db_session: Session, request: ComputeNutritionRequest
+) -> ComputeNutritionResponse:
+    """Total and per-serving nutrition of every ingredient list. Nothing is saved.
+
+    Raises:
+        MissingFoodsError: if an ingredient references a food that doesn't exist
+        NutritionCycleError: if an ingredient's recipe (indirectly) uses itself
+    """
+    lines = [
+        (index, position, ingredient)
+        for index, ingredient_list in enumerate(request.lists)
+        for position, ingredient in enumerate(ingredient_list.ingredients)
+    ]
+    totals = np.zeros((len(request.lists), len(NUTRIENTS)))
+    # Per list, positions of the ingredients left out of its totals
+    unconvertible: List[List[int]] = [[] for _ in request.lists]
+    if lines:
+        food_matrix.refresh(db_session)
+        food_ids = [ingredient.food_id for _, _, ingredient in lines]
+        missing = food_matrix.missing(food_ids)
+        if missing:
+            raise MissingFoodsError(missing)
+        columns = food_matrix.gather(db_session, food_ids)
+        servings = unit_table.to_servings(
+            quantity=np.array(
+                [ingredient.quantity for _, _, ingredient in lines], dtype=np.float64
+            ),
+            unit=unit_table.codes([ingredient.unit for _, _, ingredient in lines]),
+            serving_size=columns.serving_size,
+            serving_unit=columns.serving_unit,
+            density=columns.density,
+        )
+        for line in np.flatnonzero(np.isnan(servings)).tolist():
+            index, position, _ = lines[line]
+            unconvertible[index].append(position)
+        servings = np.nan_to_num(servings, nan=0.0)
+        nutrients = nutrition_engine.food_nutrients(db_session, columns)
+        np.add.at(
+            totals,
+            np.array([index for index, _, _ in lines]),
+            servings[:, np.newaxis] * nutrients,
+        )
+
+    yields = np.array([ingredient_list.servings for ingredient_list in request.lists])
+    per_serving = totals / yields[:, np.newaxis]
+    return ComputeNutritionResponse(
+        results=[
+            ComputedNutrition(
+                totals=NutritionTotals(**dict(zip(NUTRIENTS, list_totals))),
+                per_serving=NutritionTotals(**dict(zip(NUTRIENTS, list_per_serving))),
+                unconvertible=list_unconvertible,
+            )
+            for list_totals, list_per_serving, list_unconvertible in zip(
+                totals.tolist(), per_serving.tolist(), unconvertible
+            )
+        ]
+    )
@@ -0,0 +1,46 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+import datetime as dt
+
+from src.food.constants import MealType
+
+
+class NutritionTotals(BaseModel):
+    calories: float = 0
+    fat: float = 0
+    protein: float = 0
+    carbohydrates: float = 0
+
+
+class DailyNutritionResponse(BaseModel):
+    date: dt.date
+    meal: Optional[MealType] = None  # Set when totals are broken down per meal
+    planned: NutritionTotals  # Everything planned, eaten or not
+    eaten: NutritionTotals
+
+
+class ComputeIngredient(BaseModel):
+    food_id: int
+    quantity: float
+    unit: str
+
+
+class IngredientList(BaseModel):
+    ingredients: list[ComputeIngredient]
+    servings: float = Field(default=1.0, gt=0)  # Servings the list makes
+
+
+class ComputeNutritionRequest(BaseModel):
+    lists: list[IngredientList] = Field(min_length=1)
+
+
+class ComputedNutrition(BaseModel):
+    totals: NutritionTotals
+    per_serving: NutritionTotals
+    # Positions of ingredients whose unit can't be converted to servings of their
+    # food, e.g. "1 cup" of a food measured in grams with no density. Not counted.
+    unconvertible: list[int] = []
+
+
+class ComputeNutritionResponse(BaseModel):
+    results: list[ComputedNutrition]  # One per list, in request order
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Rebuild or check the daily_nutrition totals table.
+
+Run from the backend directory:
+    python -m src.nutrition.rebuild          # recompute from planned_food, then verify
+    python -m src.nutrition.rebuild --check  # only report slots that are out of date
+"""
+
+import argparse
+import sys
+
+from sqlalchemy.orm import Session
+
+from src.food.database import engine
+from src.nutrition import service
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Rebuild the daily_nutrition table from planned_food"
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Verify the stored totals without rewriting them",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_arguments()
+    with Session(engine) as db_session:
+        if not args.check:
+            slots = service.rebuild_daily_nutrition(db_session)
+            print(f"Rebuilt {slots} (date, meal) slots")
+
+        mismatches = service.verify_daily_nutrition(db_session)
+
+    for date, meal in mismatches:
+        print(f"Out of date: {date} {meal.value}")
+    if mismatches:
+        print(f"{len(mismatches)} slots differ from planned_food")
+        return 1
+    print("daily_nutrition matches planned_food")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
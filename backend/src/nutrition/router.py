@@ -0,0 +1,69 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.orm import Session
+import datetime as dt
+
+from src.food.database import get_read_db_session
+from src.food.nutrition import NutritionCycleError
+from src.food.router import missing_foods_error
+from src.food.serialization import json_list_response
+from src.food.service import MissingFoodsError
+from src.nutrition import compute, service
+from src.nutrition.models import (
+    ComputeNutritionRequest,
+    ComputeNutritionResponse,
+    DailyNutritionResponse,
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+router = APIRouter()
+
+
+def check_range(start: dt.date, end: dt.date) -> None:
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+
+
+@router.get("/nutrition/daily", response_model=List[DailyNutritionResponse])
+def get_daily_nutrition(
+    start: dt.date, end: dt.date, db_session: Session = Depends(get_read_db_session)
+) -> Response:
+    """Planned and eaten nutrition totals per day, inclusive of both ends."""
+    check_range(start, end)
+    return json_list_response(
+        DailyNutritionResponse,
+        service.get_daily_nutrition(
+            db_session=db_session, start_date=start, end_date=end
+        ),
+    )
+
+
+@router.get("/nutrition/meals", response_model=List[DailyNutritionResponse])
+def get_meal_nutrition(
+    start: dt.date, end: dt.date, db_session: Session = Depends(get_read_db_session)
+) -> Response:
+    """Planned and eaten nutrition totals per day and meal, inclusive of both ends."""
+    check_range(start, end)
+    return json_list_response(
+        DailyNutritionResponse,
+        service.get_daily_nutrition(
+            db_session=db_session, start_date=start, end_date=end, by_meal=True
+        ),
+    )
+
+
+@router.post("/nutrition/compute", response_model=ComputeNutritionResponse)
+def compute_nutrition(
+    request: ComputeNutritionRequest,
+    db_session: Session = Depends(get_read_db_session),
+) -> ComputeNutritionResponse:
+    """Nutrition of unsaved ingredient lists, e.g. a recipe being edited."""
+    try:
+        return compute.compute_nutrition(db_session=db_session, request=request)
+    except MissingFoodsError as e:
+        raise missing_foods_error(e)
+    except NutritionCycleError as e:
+        raise HTTPException(status_code=409, detail=str(e))
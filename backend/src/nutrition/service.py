@@ -0,0 +1,420 @@
+"""
+Planned and eaten nutrition per day and meal.
+daily_nutrition keeps every (date, meal) slot's totals, maintained as planned foods
+and foods change. A food made from a recipe counts with the recipe's rolled-up
+nutrition, as everywhere else; that can change without a write to the food, so
+those changes recompute the days the affected foods are planned on instead.
+"""
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+from sqlalchemy import ColumnElement, Select, case, delete, func, literal, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+import datetime as dt
+
+from src.food.constants import MealType
+from src.food.database import (
+    DailyNutrition,
+    Food,
+    PlannedFood,
+    Recipe,
+    RecipeIngredient,
+)
+from src.food.food_matrix import FoodMatrix
+from src.food.nutrition import (
+    NUTRIENTS,
+    NutritionCycleError,
+    NutritionEngine,
+    nutrition_engine,
+)
+from src.nutrition.models import DailyNutritionResponse, NutritionTotals
+
+logger = logging.getLogger(__name__)
+
+PLANNED_COLUMNS = tuple(f"planned_{nutrient}" for nutrient in NUTRIENTS)
+EATEN_COLUMNS = tuple(f"eaten_{nutrient}" for nutrient in NUTRIENTS)
+TOTAL_COLUMNS = ("entries", *PLANNED_COLUMNS, *EATEN_COLUMNS)
+
+# Largest relative difference between stored and recomputed totals treated as
+# floating point drift
+TOLERANCE = 1e-9
+
+
+def get_daily_nutrition(
+    db_session: Session, start_date: dt.date, end_date: dt.date, by_meal: bool = False
+) -> List[DailyNutritionResponse]:
+    """Read planned and eaten nutrition per day (and meal) from daily_nutrition.
+
+    Args:
+        db_session: Database session
+        start_date: First day, inclusive
+        end_date: Last day, inclusive
+        by_meal: Return one entry per (date, meal) instead of per date
+
+    Returns:
+        One entry per day (and meal) that has planned food, ordered by date
+    """
+    keys = (
+        [DailyNutrition.date, DailyNutrition.meal] if by_meal else [DailyNutrition.date]
+    )
+    columns = [
+        (
+            getattr(DailyNutrition, column)
+            if by_meal
+            else func.sum(getattr(DailyNutrition, column))
+        )
+        for column in PLANNED_COLUMNS + EATEN_COLUMNS
+    ]
+    query = (
+        select(*keys, *columns)
+        .where(
+            DailyNutrition.date >= start_date,
+            DailyNutrition.date <= end_date,
+            DailyNutrition.entries > 0,
+        )
+        .order_by(*keys)
+    )
+    if not by_meal:
+        query = query.group_by(*keys)
+
+    return [
+        DailyNutritionResponse(
+            date=row[0],
+            meal=row[1] if by_meal else None,
+            planned=NutritionTotals(**dict(zip(NUTRIENTS, row[len(keys) :]))),
+            eaten=NutritionTotals(
+                **dict(zip(NUTRIENTS, row[len(keys) + len(NUTRIENTS) :]))
+            ),
+        )
+        for row in db_session.execute(query)
+    ]
+
+
+def _upsert_totals(db_session: Session, rows: List[Dict[str, object]]) -> None:
+    """Add each row's totals onto its (date, meal) slot, creating the slot if needed."""
+    statement = insert(DailyNutrition)
+    db_session.execute(
+        statement.on_conflict_do_update(
+            index_elements=[DailyNutrition.date, DailyNutrition.meal],
+            set_={
+                column: getattr(DailyNutrition, column) + statement.excluded[column]
+                for column in TOTAL_COLUMNS
+            },
+        ),
+        rows,
+    )
+
+
+def planned_nutrients(
+    db_session: Session,
+    food_ids: Sequence[int],
+    engine: NutritionEngine = nutrition_engine,
+) -> np.ndarray:
+    """Per-serving nutrients (foods x NUTRIENTS) that planned foods count with.
+
+    A recipe that (indirectly) uses itself can't be rolled up, so foods made from
+    it count with their stored nutrition instead of failing the write.
+    """
+    columns = engine.matrix.gather(db_session, food_ids)
+    try:
+        return engine.food_nutrients(db_session, columns)
+    except NutritionCycleError as e:
+        logger.warning("%s, counting its planned foods with stored nutrition", e)
+        return columns.nutrients
+
+
+def apply_planned_food(
+    db_session: Session,
+    planned_food: PlannedFood,
+    food: Optional[Food],
+    sign: int = 1,
+) -> None:
+    """Add (sign=1) or remove (sign=-1) a planned food's share of its slot's totals.
+
+    Does not commit, so the change lands in the caller's transaction. Planned foods
+    whose food no longer exists don't count towards any totals.
+    """
+    if food is None:
+        return
+    if food.source_recipe_id is None:
+        per_serving = [getattr(food, n) for n in NUTRIENTS]
+    else:
+        per_serving = planned_nutrients(db_session, [food.id])[0].tolist()
+    amounts = [sign * planned_food.servings * amount for amount in per_serving]
+    eaten = amounts if planned_food.eaten else [0.0] * len(NUTRIENTS)
+    _upsert_totals(
+        db_session,
+        [
+            {
+                "date": planned_food.date,
+                "meal": planned_food.meal,
+                "entries": sign,
+                **dict(zip(PLANNED_COLUMNS, amounts)),
+                **dict(zip(EATEN_COLUMNS, eaten)),
+            }
+        ],
+    )
+
+
+def apply_food_change(
+    db_session: Session,
+    food_id: int,
+    old: Mapping[str, float],
+    new: Optional[Mapping[str, float]],
+) -> None:
+    """Shift every slot a food is planned in by the change in its nutrition.
+
+    Only for foods not made from a recipe; see `recompute_days` for those.
+
+    Args:
+        db_session: Database session, not committed
+        food_id: Food whose nutrition changed
+        old: Nutrient values before the change
+        new: Nutrient values after the change, or None if the food is being deleted
+    """
+    if new is not None and all(old[n] == new[n] for n in NUTRIENTS):
+        return
+
+    deltas = [(new[n] if new else 0) - old[n] for n in NUTRIENTS]
+    eaten_servings = func.sum(case((PlannedFood.eaten, PlannedFood.servings), else_=0))
+    entries: ColumnElement = (
+        literal(0) if new is not None else -func.count(PlannedFood.id)
+    )
+    query = (
+        select(
+            PlannedFood.date,
+            PlannedFood.meal,
+            entries,
+            *(func.sum(PlannedFood.servings) * delta for delta in deltas),
+            *(eaten_servings * delta for delta in deltas),
+        )
+        .where(PlannedFood.food_id == food_id)
+        .group_by(PlannedFood.date, PlannedFood.meal)
+    )
+    statement = insert(DailyNutrition).from_select(
+        ["date", "meal", *TOTAL_COLUMNS], query
+    )
+    db_session.execute(
+        statement.on_conflict_do_update(
+            index_elements=[DailyNutrition.date, DailyNutrition.meal],
+            set_={
+                column: getattr(DailyNutrition, column) + statement.excluded[column]
+                for column in TOTAL_COLUMNS
+            },
+        )
+    )
+
+
+def _daily_totals_query(dates: Optional[Sequence[dt.date]] = None) -> Select[Any]:
+    """date, meal, then TOTAL_COLUMNS for every slot (on `dates`, if given),
+    aggregated from the planned foods not made from a recipe."""
+    eaten = [
+        func.sum(
+            case(
+                (PlannedFood.eaten, PlannedFood.servings * getattr(Food, nutrient)),
+                else_=0,
+            )
+        )
+        for nutrient in NUTRIENTS
+    ]
+    query = (
+        select(
+            PlannedFood.date,
+            PlannedFood.meal,
+            func.count(PlannedFood.id),
+            *(
+                func.sum(PlannedFood.servings * getattr(Food, nutrient))
+                for nutrient in NUTRIENTS
+            ),
+            *eaten,
+        )
+        .join(Food, Food.id == PlannedFood.food_id)
+        .where(Food.source_recipe_id.is_(None))
+        .group_by(PlannedFood.date, PlannedFood.meal)
+    )
+    if dates is not None:
+        query = query.where(PlannedFood.date.in_(dates))
+    return query
+
+
+def _recipe_food_totals(
+    db_session: Session,
+    dates: Optional[Sequence[dt.date]] = None,
+    engine: NutritionEngine = nutrition_engine,
+) -> Dict[Tuple[dt.date, MealType], np.ndarray]:
+    """TOTAL_COLUMNS for every slot (on `dates`, if given) of the planned foods made
+    from a recipe, which SQL can't total: their nutrition is rolled up in Python."""
+    query = (
+        select(
+            PlannedFood.date,
+            PlannedFood.meal,
+            PlannedFood.food_id,
+            func.count(PlannedFood.id),
+            func.sum(PlannedFood.servings),
+            func.sum(case((PlannedFood.eaten, PlannedFood.servings), else_=0)),
+        )
+        .join(Food, Food.id == PlannedFood.food_id)
+        .where(Food.source_recipe_id.is_not(None))
+        .group_by(PlannedFood.date, PlannedFood.meal, PlannedFood.food_id)
+    )
+    if dates is not None:
+        query = query.where(PlannedFood.date.in_(dates))
+    rows = db_session.execute(query).all()
+    if not rows:
+        return {}
+
+    nutrients = planned_nutrients(db_session, [row[2] for row in rows], engine)
+    entries, servings, eaten_servings = np.array(
+        [row[3:] for row in rows], dtype=np.float64
+    ).T
+    totals = np.column_stack(
+        [
+            entries,
+            servings[:, np.newaxis] * nutrients,
+            eaten_servings[:, np.newaxis] * nutrients,
+        ]
+    )
+    slots: Dict[Tuple[dt.date, MealType], np.ndarray] = {}
+    for row, row_totals in zip(rows, totals):
+        key = (row[0], row[1])
+        slots[key] = slots[key] + row_totals if key in slots else row_totals
+    return slots
+
+
+def compute_daily_nutrition(
+    db_session: Session,
+) -> Dict[Tuple[dt.date, MealType], Tuple[float, ...]]:
+    """Recompute every slot's totals from planned_food, keyed by (date, meal)."""
+    slots = {
+        (row[0], row[1]): np.array(row[2:], dtype=np.float64)
+        for row in db_session.execute(_daily_totals_query())
+    }
+    for key, totals in _recipe_food_totals(db_session).items():
+        slots[key] = slots[key] + totals if key in slots else totals
+    return {key: tuple(totals.tolist()) for key, totals in slots.items()}
+
+
+def _replace_days(
+    db_session: Session,
+    dates: Optional[Sequence[dt.date]],
+    engine: NutritionEngine = nutrition_engine,
+) -> None:
+    """Replace the slots on `dates` (all if None) with recomputed totals."""
+    statement = delete(DailyNutrition)
+    if dates is not None:
+        statement = statement.where(DailyNutrition.date.in_(dates))
+    db_session.execute(statement)
+    # Aggregated and written in one statement, the rows never reach Python
+    db_session.execute(
+        insert(DailyNutrition).from_select(
+            ["date", "meal", *TOTAL_COLUMNS], _daily_totals_query(dates)
+        )
+    )
+    recipe_totals = _recipe_food_totals(db_session, dates, engine)
+    if recipe_totals:
+        _upsert_totals(
+            db_session,
+            [
+                {
+                    "date": date,
+                    "meal": meal,
+                    "entries": int(totals[0]),
+                    **dict(zip(TOTAL_COLUMNS[1:], totals[1:].tolist())),
+                }
+                for (date, meal), totals in recipe_totals.items()
+            ],
+        )
+
+
+def replace_daily_nutrition(db_session: Session) -> int:
+    """Replace daily_nutrition with totals recomputed from scratch. Does not commit.
+
+    Returns:
+        Number of slots written
+    """
+    # Imports and the seeder call this before committing the foods they wrote,
+    # which the shared food matrix and rollup memo must never see
+    _replace_days(db_session, None, NutritionEngine(FoodMatrix()))
+    return db_session.scalar(select(func.count()).select_from(DailyNutrition)) or 0
+
+
+def recipe_food_dates(db_session: Session, food_ids: Iterable[int]) -> List[dt.date]:
+    """Days on which a food made from a recipe is planned whose rolled-up nutrition
+    depends on any of `food_ids`: one of them, or one (indirectly) using one of them
+    as an ingredient. Recipes overriding their nutrition don't depend on their
+    ingredients."""
+    affected = select(Food.id).where(Food.id.in_(list(food_ids))).cte(recursive=True)
+    # UNION rather than UNION ALL, so the walk ends even on a cycle
+    affected = affected.union(
+        select(Food.id)
+        .join(Recipe, Recipe.id == Food.source_recipe_id)
+        .join(RecipeIngredient, RecipeIngredient.recipe_id == Recipe.id)
+        .join(affected, affected.c.id == RecipeIngredient.food_id)
+        .where(Recipe.override_nutrition.is_(False))
+    )
+    return list(
+        db_session.scalars(
+            select(PlannedFood.date)
+            .join(Food, Food.id == PlannedFood.food_id)
+            .where(
+                Food.id.in_(select(affected.c.id)),
+                Food.source_recipe_id.is_not(None),
+            )
+            .distinct()
+        )
+    )
+
+
+def recompute_days(db_session: Session, dates: Sequence[dt.date]) -> None:
+    """Recompute daily_nutrition on `dates`, committing if there are any.
+
+    For foods made from recipes, whose rolled-up nutrition changes without a write
+    to them: find the days with `recipe_food_dates` in the transaction that changes
+    them, then call this after committing it and invalidating the rollups, so the
+    totals are computed from what was committed. If the process dies in between,
+    `python -m src.nutrition.rebuild` repairs the totals.
+    """
+    if not dates:
+        return
+    _replace_days(db_session, dates)
+    db_session.commit()
+
+
+def rebuild_daily_nutrition(db_session: Session) -> int:
+    """Replace daily_nutrition with totals recomputed from scratch. Commits.
+
+    Returns:
+        Number of slots written
+    """
+    slots = replace_daily_nutrition(db_session)
+    db_session.commit()
+    return slots
+
+
+def verify_daily_nutrition(
+    db_session: Session,
+) -> List[Tuple[dt.date, MealType]]:
+    """Compare daily_nutrition with a fresh recomputation.
+
+    Returns:
+        (date, meal) slots whose stored totals are wrong or missing
+    """
+    expected = compute_daily_nutrition(db_session)
+    stored = {
+        (row.date, row.meal): tuple(getattr(row, column) for column in TOTAL_COLUMNS)
+        for row in db_session.scalars(
+            select(DailyNutrition).where(DailyNutrition.entries != 0)
+        )
+    }
+    zero = (0.0,) * len(TOTAL_COLUMNS)
+    return sorted(
+        key
+        for key in expected.keys() | stored.keys()
+        if any(
+            abs(a - b) > TOLERANCE * max(1.0, abs(a), abs(b))
+            for a, b in zip(expected.get(key, zero), stored.get(key, zero))
+        )
+    )
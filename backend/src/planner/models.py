@@ -0,0 +1,45 @@
+from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+import datetime as dt
+
+from src.food.constants import MealType
+from src.food.models import CreatePlannedFoodRequest
+from src.nutrition.models import NutritionTotals
+
+
+class DailyTargets(BaseModel):
+    # Per day; nutrients left out aren't optimized for
+    calories: Optional[float] = Field(default=None, gt=0)
+    fat: Optional[float] = Field(default=None, gt=0)
+    protein: Optional[float] = Field(default=None, gt=0)
+    carbohydrates: Optional[float] = Field(default=None, gt=0)
+
+    @model_validator(mode="after")
+    def check_any(self) -> "DailyTargets":
+        if all(value is None for value in self.model_dump().values()):
+            raise ValueError("at least one target is required")
+        return self
+
+
+class OptimizePlanRequest(BaseModel):
+    start: dt.date
+    days: int = Field(default=7, ge=1, le=31)
+    meals: list[MealType] = Field(
+        default=[MealType.BREAKFAST, MealType.LUNCH, MealType.DINNER], min_length=1
+    )
+    targets: DailyTargets
+    foods_per_meal: int = Field(default=2, ge=1, le=6)
+    max_servings: float = Field(default=3.0, gt=0)  # Per food and meal
+    serving_step: float = Field(default=0.25, ge=0)  # 0 for unrounded servings
+    food_ids: Optional[list[int]] = None  # Foods to choose from, all if not set
+
+
+class PlanDayResponse(BaseModel):
+    date: dt.date
+    totals: NutritionTotals
+
+
+class OptimizePlanResponse(BaseModel):
+    # Ready to create with POST /api/planned-foods
+    planned_foods: list[CreatePlannedFoodRequest]
+    days: list[PlanDayResponse]
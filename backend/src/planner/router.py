@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from src.food.database import get_read_db_session
+from src.food.nutrition import NutritionCycleError
+from src.food.router import missing_foods_error
+from src.food.service import MissingFoodsError
+from src.planner import service
+from src.planner.models import OptimizePlanRequest, OptimizePlanResponse
+
+router = APIRouter()
+
+
+@router.post("/meal-plans/optimize", response_model=OptimizePlanResponse)
+def optimize_plan(
+    request: OptimizePlanRequest, db_session: Session = Depends(get_read_db_session)
+) -> OptimizePlanResponse:
+    """Suggest planned foods hitting daily nutrition targets. Nothing is saved."""
+    try:
+        return service.optimize_plan(db_session=db_session, request=request)
+    except MissingFoodsError as e:
+        raise missing_foods_error(e)
+    except NutritionCycleError as e:
+        raise HTTPException(status_code=409, detail=str(e))
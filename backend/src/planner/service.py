@@ -0,0 +1,148 @@
+"""
+Meal plan optimizer.
+Candidate foods are gathered from the food matrix as foods x nutrients per-serving
+amounts, scaled so every meal's target becomes a vector of ones. Each (date, meal)
+slot is then filled by coordinate descent: one position at a time, every candidate
+food is scored at its best serving count with a few vectorized passes over the
+matrix, and the best one is kept. A penalty on foods already used elsewhere in the
+plan keeps days from repeating each other. A food made from a recipe counts with the
+recipe's rolled-up nutrition, as it would in a saved recipe.
+"""
+
+from typing import List, Optional
+import datetime as dt
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from src.food.food_matrix import food_matrix
+from src.food.models import CreatePlannedFoodRequest
+from src.food.nutrition import NUTRIENTS, nutrition_engine
+from src.food.service import MissingFoodsError
+from src.nutrition.models import NutritionTotals
+from src.planner.models import (
+    OptimizePlanRequest,
+    OptimizePlanResponse,
+    PlanDayResponse,
+)
+
+# Sweeps over a slot's positions before settling for what it has
+MAX_SWEEPS = 4
+
+# Added to a food's squared relative error for every other slot of the plan that
+# already uses it
+REPEAT_PENALTY = 0.02
+
+
+def _load_foods(
+    db_session: Session, food_ids: Optional[List[int]]
+) -> tuple[np.ndarray, np.ndarray]:
+    """IDs and per-serving nutrient matrix (foods x NUTRIENTS) of the candidates.
+
+    Raises:
+        MissingFoodsError: if any of `food_ids` doesn't exist
+        NutritionCycleError: if a candidate's recipe (indirectly) uses itself
+    """
+    food_matrix.refresh(db_session)
+    if food_ids is None:
+        ids = food_matrix.ids()
+    else:
+        missing = food_matrix.missing(food_ids)
+        if missing:
+            raise MissingFoodsError(missing)
+        ids = np.unique(np.array(food_ids, dtype=np.int64))
+    columns = food_matrix.gather(db_session, ids)
+    return ids, nutrition_engine.food_nutrients(db_session, columns)
+
+
+def optimize_plan(
+    db_session: Session, request: OptimizePlanRequest
+) -> OptimizePlanResponse:
+    """Choose foods and servings for every meal of the days requested so each day's
+    nutrition is close to the targets. Nothing is written.
+
+    Each meal aims for an equal share of the daily targets, in relative terms, so
+    being 10% off on protein costs as much as being 10% off on calories.
+
+    Raises:
+        MissingFoodsError: if any of the requested food IDs doesn't exist
+        NutritionCycleError: if a candidate's recipe (indirectly) uses itself
+    """
+    ids, nutrients = _load_foods(db_session, request.food_ids)
+    targets = request.targets.model_dump()
+    active = [i for i, n in enumerate(NUTRIENTS) if targets[n] is not None]
+    meal_target = np.array([targets[NUTRIENTS[i]] for i in active]) / len(request.meals)
+    # Per-serving amounts as a fraction of a meal's target
+    scaled = nutrients[:, active] / meal_target
+    norms = np.einsum("ij,ij->i", scaled, scaled)
+    usable = norms > 0
+    safe_norms = np.where(usable, norms, 1.0)
+    step = request.serving_step
+    uses = np.zeros(len(ids), dtype=np.float64)
+
+    planned_foods: List[CreatePlannedFoodRequest] = []
+    days: List[PlanDayResponse] = []
+    for day in range(request.days):
+        date = request.start + dt.timedelta(days=day)
+        day_totals = np.zeros(len(NUTRIENTS))
+        for meal in request.meals:
+            # Food index and servings per position, -1 for an empty position
+            chosen = np.full(request.foods_per_meal, -1, dtype=np.int64)
+            servings = np.zeros(request.foods_per_meal)
+            residual = np.ones(len(active))
+            for _ in range(MAX_SWEEPS if len(ids) else 0):
+                changed = False
+                for position in range(request.foods_per_meal):
+                    current = chosen[position]
+                    if current >= 0:
+                        residual += servings[position] * scaled[current]
+                        uses[current] -= 1
+                        chosen[position] = -1
+                    # Best servings of every food for what the others leave over,
+                    # and the squared error it ends with
+                    projection = scaled @ residual
+                    amounts = np.clip(projection / safe_norms, 0, request.max_servings)
+                    if step:
+                        amounts = np.minimum(
+                            np.round(amounts / step) * step, request.max_servings
+                        )
+                    error = (
+                        amounts * amounts * norms
+                        - 2 * amounts * projection
+                        + REPEAT_PENALTY * uses
+                    )
+                    error[~usable | (amounts <= 0)] = np.inf
+                    error[chosen[chosen >= 0]] = np.inf
+                    best = int(np.argmin(error))
+                    # Leaving the position empty costs nothing extra
+                    if not error[best] < 0:
+                        best = -1
+                    if best != current:
+                        changed = True
+                    chosen[position] = best
+                    servings[position] = amounts[best] if best >= 0 else 0.0
+                    if best >= 0:
+                        residual -= servings[position] * scaled[best]
+                        uses[best] += 1
+                if not changed:
+                    break
+
+            for food_index, amount in zip(chosen, servings):
+                if food_index < 0:
+                    continue
+                day_totals += amount * nutrients[food_index]
+                planned_foods.append(
+                    CreatePlannedFoodRequest(
+                        date=date,
+                        meal=meal,
+                        servings=float(amount),
+                        food_id=int(ids[food_index]),
+                    )
+                )
+        days.append(
+            PlanDayResponse(
+                date=date,
+                totals=NutritionTotals(**dict(zip(NUTRIENTS, day_totals.tolist()))),
+            )
+        )
+    return OptimizePlanResponse(planned_foods=planned_foods, days=days)
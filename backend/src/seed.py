@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic dataset and bulk-load it.
+
+The hand-written payloads in backend/data are the templates: every generated food
+takes its serving and nutrition from food_request.json, every recipe its nutrition,
+override flag, ingredient notes and steps from recipe_request.json, with seeded
+random variation. Later recipes also use the foods of earlier ones, so nutrition
+rolls up through several levels of recipes. The same --seed always produces the
+same dataset.
+
+Rows are generated lazily and written with chunked Core INSERTs in one transaction,
+IDs assigned up front so children never wait on RETURNING, and daily_nutrition is
+rebuilt in the same transaction. A million planned meals load in seconds.
+
+Run from the backend directory, after `alembic upgrade head`:
+    python -m src.seed --foods 50000 --recipes 5000 --days 1095
+    python -m src.seed --database sqlite:///./load.db --create-schema --days 100000
+"""
+
+import argparse
+import datetime as dt
+from dataclasses import dataclass
+import itertools
+from pathlib import Path
+import random
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Insert, bindparam, func, insert, select
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import Session
+
+from src.config import settings
+from src.food.constants import BULK_INSERT_CHUNK_SIZE, MealType
+from src.food.database import (
+    Base,
+    Food,
+    PlannedFood,
+    Recipe,
+    RecipeIngredient,
+    RecipeInstruction,
+    food_search,
+)
+from src.food.models import CreateFoodRequest, CreateRecipeRequest
+from src.food.nutrition import NUTRIENTS
+from src.food.service import bump_revisions
+from src.food.storage import STORAGE_PROFILES, create_sqlite_engine
+from src.nutrition.service import replace_daily_nutrition
+
+DATA_DIRECTORY = Path(__file__).resolve().parent.parent / "data"
+
+# Generated food names are a preparation and the template's name
+PREPARATIONS = ("Raw", "Cooked", "Dried", "Fresh", "Smoked", "Roasted", "Steamed")
+# Ingredient units with the range of quantities drawn for each
+INGREDIENT_QUANTITIES: Dict[str, Tuple[float, float]] = {
+    "g": (10.0, 500.0),
+    "oz": (0.5, 16.0),
+    "cup": (0.25, 3.0),
+    "tbsp": (1.0, 4.0),
+}
+SERVINGS = (0.5, 1.0, 1.5, 2.0)
+
+_NAMED_DIALECT = sqlite.dialect(paramstyle="named")
+
+
+@dataclass(frozen=True)
+class Scale:
+    foods: int
+    recipes: int
+    # Per recipe
+    ingredients: int
+    instructions: int
+    # Days of planned meals, starting on `start`
+    days: int
+    foods_per_meal: int
+    start: dt.date = dt.date(2024, 1, 1)
+    # Recipes are split into this many equal tiers, and each recipe past the first
+    # tier uses `nested_ingredients` foods of recipes in the tier before it
+    recipe_tiers: int = 3
+    nested_ingredients: int = 2
+
+
+@dataclass(frozen=True)
+class Templates:
+    food: CreateFoodRequest
+    recipe: CreateRecipeRequest
+
+
+@dataclass(frozen=True)
+class SeedResult:
+    # Rows inserted per table
+    rows: Dict[str, int]
+    # IDs of the generated raw foods and recipes, inclusive
+    food_ids: Tuple[int, int]
+    recipe_ids: Tuple[int, int]
+
+
+def load_templates(directory: Path = DATA_DIRECTORY) -> Templates:
+    """Parse the example payloads. Fields the request models don't have are ignored."""
+    return Templates(
+        food=CreateFoodRequest.model_validate_json(
+            (directory / "food_request.json").read_text()
+        ),
+        recipe=CreateRecipeRequest.model_validate_json(
+            (directory / "recipe_request.json").read_text()
+        ),
+    )
+
+
+def _vary(rng: random.Random, value: float) -> int:
+    return round(value * (0.5 + rng.random()))
+
+
+def _pick(rng: random.Random, ids: Tuple[int, int]) -> int:
+    # randint's rejection sampling is several times slower, and this is per row
+    return ids[0] + int(rng.random() * (ids[1] - ids[0] + 1))
+
+
+def _foods(
+    rng: random.Random,
+    template: CreateFoodRequest,
+    first_id: int,
+    count: int,
+    revision: int,
+) -> Iterator[Dict[str, Any]]:
+    for id in range(first_id, first_id + count):
+        yield {
+            "id": id,
+            "name": f"{rng.choice(PREPARATIONS)} {template.name} {id}",
+            "source_recipe_id": None,
+            "serving_size": template.serving_size,
+            "serving_size_unit": template.serving_size_unit,
+            "density": round(rng.uniform(0.5, 1.5), 3),
+            **{n: _vary(rng, getattr(template, n)) for n in NUTRIENTS},
+            "revision": revision,
+        }
+
+
+def _recipes(
+    template: CreateRecipeRequest, first_id: int, count: int, revision: int
+) -> Iterator[Dict[str, Any]]:
+    for id in range(first_id, first_id + count):
+        yield {
+            "id": id,
+            "name": f"{template.name} {id}",
+            "override_nutrition": template.override_nutrition,
+            "revision": revision,
+        }
+
+
+def _recipe_foods(
+    rng: random.Random,
+    template: CreateRecipeRequest,
+    first_id: int,
+    recipes: range,
+    revision: int,
+) -> Iterator[Dict[str, Any]]:
+    # The food a recipe is planned as, the same shape create_recipe gives it
+    for id, recipe_id in enumerate(recipes, start=first_id):
+        yield {
+            "id": id,
+            "name": f"{template.name} {recipe_id}",
+            "source_recipe_id": recipe_id,
+            "serving_size": 1.0,
+            "serving_size_unit": "serving",
+            "density": None,
+            **{n: _vary(rng, getattr(template, n)) for n in NUTRIENTS},
+            "revision": revision,
+        }
+
+
+def _ingredients(
+    rng: random.Random,
+    template: CreateRecipeRequest,
+    recipes: range,
+    scale: Scale,
+    food_ids: Tuple[int, int],
+    first_recipe_food: int,
+) -> Iterator[Dict[str, Any]]:
+    notes = [ingredient.note for ingredient in template.ingredients] or [""]
+    units = list(INGREDIENT_QUANTITIES)
+    tier_size = max(1, -(-len(recipes) // max(1, scale.recipe_tiers)))
+    for index, recipe_id in enumerate(recipes):
+        tier = index // tier_size
+        nested = min(scale.nested_ingredients, scale.ingredients) if tier else 0
+        for _ in range(scale.ingredients - nested):
+            unit = rng.choice(units)
+            yield {
+                "recipe_id": recipe_id,
+                "food_id": _pick(rng, food_ids),
+                "note": rng.choice(notes),
+                "quantity": round(rng.uniform(*INGREDIENT_QUANTITIES[unit]), 2),
+                "unit": unit,
+            }
+        # Recipe foods are measured in servings, from the tier before, which is full
+        previous = first_recipe_food + (tier - 1) * tier_size
+        for _ in range(nested):
+            yield {
+                "recipe_id": recipe_id,
+                "food_id": _pick(rng, (previous, previous + tier_size - 1)),
+                "note": rng.choice(notes),
+                "quantity": rng.choice(SERVINGS),
+                "unit": "serving",
+            }
+
+
+def _instructions(
+    template: CreateRecipeRequest, recipes: range, per_recipe: int
+) -> Iterator[Dict[str, Any]]:
+    texts = [instruction.text for instruction in template.instructions] or ["Cook"]
+    for recipe_id in recipes:
+        for step in range(1, per_recipe + 1):
+            yield {
+                "recipe_id": recipe_id,
+                "step": step,
+                "text": texts[(step - 1) % len(texts)],
+            }
+
+
+def _planned_foods(
+    rng: random.Random, scale: Scale, food_ids: Tuple[int, int], revision: int
+) -> Iterator[Dict[str, Any]]:
+    # The first half of the range is in the past and has been eaten
+    for day in range(scale.days):
+        date = scale.start + dt.timedelta(days=day)
+        for meal in MealType:
+            for _ in range(scale.foods_per_meal):
+                yield {
+                    "date": date,
+                    "meal": meal,
+                    "servings": rng.choice(SERVINGS),
+                    "food_id": _pick(rng, food_ids),
+                    "eaten": day < scale.days // 2,
+                    "revision": revision,
+                }
+
+
+def _chunks(
+    rows: Iterable[Dict[str, Any]], size: int
+) -> Iterator[List[Dict[str, Any]]]:
+    iterator = iter(rows)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def _insert(
+    db_session: Session,
+    statements: Sequence[Insert],
+    rows: Iterable[Dict[str, Any]],
+    chunk_size: int,
+) -> int:
+    """Execute each of `statements` for `rows`, chunk by chunk; the number of rows.
+
+    The statements are compiled once, for the keys of the first row, and chunks go
+    to the driver's executemany as they are: SQLAlchemy's per-row parameter
+    handling would otherwise cost more than SQLite spends inserting them.
+    """
+    connection = db_session.connection()
+    chunks = _chunks(rows, chunk_size)
+    first = next(chunks, None)
+    if first is None:
+        return 0
+    keys = list(first[0])
+    # Named parameters let the driver read the row dicts directly
+    sql = [
+        str(statement.compile(dialect=_NAMED_DIALECT, column_keys=keys))
+        for statement in statements
+    ]
+    # Values the driver can't take as they are, e.g. dates and enums, are converted
+    # the way the column types would
+    columns = statements[0].table.c
+    processors = [
+        (key, processor)
+        for key in keys
+        if key in columns
+        and (
+            processor := columns[key]
+            .type.dialect_impl(connection.dialect)
+            .bind_processor(connection.dialect)
+        )
+        is not None
+    ]
+
+    count = 0
+    for chunk in itertools.chain([first], chunks):
+        for row in chunk:
+            for key, processor in processors:
+                row[key] = processor(row[key])
+        for statement in sql:
+            connection.exec_driver_sql(statement, chunk)
+        count += len(chunk)
+    return count
+
+
+def seed(
+    db_session: Session,
+    scale: Scale,
+    seed: int = 0,
+    templates: Optional[Templates] = None,
+    chunk_size: int = BULK_INSERT_CHUNK_SIZE,
+) -> SeedResult:
+    """Generate a dataset at `scale` and insert it after any existing rows. Commits.
+
+    Args:
+        db_session: Database session
+        scale: How many of each row to generate
+        seed: Random seed; the same seed and scale give the same dataset
+        templates: Payloads to vary, load_templates() by default
+        chunk_size: Rows per INSERT statement
+    """
+    rng = random.Random(seed)
+    templates = templates or load_templates()
+    revision = bump_revisions(db_session, "food", "recipe", "planned_food")
+    first_food = (db_session.scalar(select(func.max(Food.id))) or 0) + 1
+    first_recipe = (db_session.scalar(select(func.max(Recipe.id))) or 0) + 1
+    food_ids = (first_food, first_food + scale.foods - 1)
+    recipes = range(first_recipe, first_recipe + scale.recipes)
+    # Foods and recipe foods both go into the search index, keyed by food ID
+    food_statements = [
+        insert(Food.__table__),
+        insert(food_search).values(rowid=bindparam("id"), name=bindparam("name")),
+    ]
+
+    rows = {
+        "food": _insert(
+            db_session,
+            food_statements,
+            _foods(rng, templates.food, first_food, scale.foods, revision),
+            chunk_size,
+        ),
+        "recipe": _insert(
+            db_session,
+            [insert(Recipe.__table__)],
+            _recipes(templates.recipe, first_recipe, scale.recipes, revision),
+            chunk_size,
+        ),
+    }
+    rows["food"] += _insert(
+        db_session,
+        food_statements,
+        _recipe_foods(rng, templates.recipe, food_ids[1] + 1, recipes, revision),
+        chunk_size,
+    )
+    rows["recipe_ingredient"] = _insert(
+        db_session,
+        [insert(RecipeIngredient.__table__)],
+        _ingredients(rng, templates.recipe, recipes, scale, food_ids, food_ids[1] + 1),
+        chunk_size,
+    )
+    rows["recipe_instruction"] = _insert(
+        db_session,
+        [insert(RecipeInstruction.__table__)],
+        _instructions(templates.recipe, recipes, scale.instructions),
+        chunk_size,
+    )
+    rows["planned_food"] = _insert(
+        db_session,
+        [insert(PlannedFood.__table__)],
+        _planned_foods(rng, scale, (first_food, food_ids[1] + scale.recipes), revision),
+        chunk_size,
+    )
+    rows["daily_nutrition"] = replace_daily_nutrition(db_session)
+    db_session.commit()
+    return SeedResult(
+        rows=rows,
+        food_ids=food_ids,
+        recipe_ids=(recipes.start, recipes.stop - 1),
+    )
+
+
+def parse_arguments() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic dataset and bulk-load it"
+    )
+    parser.add_argument("--foods", type=int, default=50_000, help="default: 50000")
+    parser.add_argument("--recipes", type=int, default=5_000, help="default: 5000")
+    parser.add_argument(
+        "--ingredients", type=int, default=20, help="Per recipe (default: 20)"
+    )
+    parser.add_argument(
+        "--recipe-tiers",
+        type=int,
+        default=3,
+        help="Levels of recipes made from other recipes' foods (default: 3)",
+    )
+    parser.add_argument(
+        "--nested-ingredients",
+        type=int,
+        default=2,
+        help="Per recipe past the first tier, foods of recipes (default: 2)",
+    )
+    parser.add_argument(
+        "--instructions", type=int, default=8, help="Per recipe (default: 8)"
+    )
+    parser.add_argument(
+        "--days", type=int, default=3 * 365, help="Days of planned meals"
+    )
+    parser.add_argument(
+        "--foods-per-meal", type=int, default=3, help="Planned foods per meal"
+    )
+    parser.add_argument(
+        "--start",
+        type=dt.date.fromisoformat,
+        default=dt.date(2024, 1, 1),
+        help="First day of planned meals (default: 2024-01-01)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument(
+        "--database",
+        default=settings.DATABASE_URL,
+        help="Database URL (default: settings.DATABASE_URL)",
+    )
+    parser.add_argument(
+        "--create-schema",
+        action="store_true",
+        help="Create missing tables first, for throwaway databases outside alembic",
+    )
+    parser.add_argument(
+        "--profile",
+        default="bulk-load",
+        choices=list(STORAGE_PROFILES),
+        help="Storage profile (default: bulk-load)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=BULK_INSERT_CHUNK_SIZE,
+        help=f"Rows per INSERT (default: {BULK_INSERT_CHUNK_SIZE})",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_arguments()
+    scale = Scale(
+        foods=args.foods,
+        recipes=args.recipes,
+        ingredients=args.ingredients,
+        instructions=args.instructions,
+        days=args.days,
+        foods_per_meal=args.foods_per_meal,
+        start=args.start,
+        recipe_tiers=args.recipe_tiers,
+        nested_ingredients=args.nested_ingredients,
+    )
+    engine = create_sqlite_engine(args.database, args.profile)
+    if args.create_schema:
+        Base.metadata.create_all(engine)
+
+    start = time.perf_counter()
+    with Session(engine) as db_session:
+        result = seed(db_session, scale, args.seed, chunk_size=args.chunk_size)
+    elapsed = time.perf_counter() - start
+    engine.dispose()
+
+    for table, count in result.rows.items():
+        print(f"{table:>20}: {count:>10} rows")
+    print(f"Loaded {sum(result.rows.values())} rows in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
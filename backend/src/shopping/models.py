@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+
+
+class ShoppingListItem(BaseModel):
+    food_id: int
+    name: str
+    needed: float  # Servings the plan uses, after expanding recipes
+    in_inventory: float  # Servings of it in inventory
+    servings: float  # Servings to buy
+    quantity: float  # Servings to buy in the food's serving unit
+    unit: str
+    # Set on items for recipe lines whose unit can't be converted to servings of the
+    # food (e.g. "1 cup" of a food measured in grams with no density): quantity and
+    # unit are then the lines' own, inventory isn't subtracted, and the servings
+    # fields are 0. Bought on top of any item for the food's convertible lines.
+    unconvertible: bool = False
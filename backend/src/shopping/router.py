@@ -0,0 +1,28 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.orm import Session
+import datetime as dt
+
+from src.food.database import get_read_db_session
+from src.food.nutrition import NutritionCycleError
+from src.food.serialization import json_list_response
+from src.nutrition.router import check_range
+from src.shopping import service
+from src.shopping.models import ShoppingListItem
+
+router = APIRouter()
+
+
+@router.get("/shopping-list", response_model=List[ShoppingListItem])
+def get_shopping_list(
+    start: dt.date, end: dt.date, db_session: Session = Depends(get_read_db_session)
+) -> Response:
+    """Foods to buy for the meals planned between two dates, inclusive."""
+    check_range(start, end)
+    try:
+        items = service.get_shopping_list(
+            db_session=db_session, start_date=start, end_date=end
+        )
+    except NutritionCycleError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return json_list_response(ShoppingListItem, items)
@@ -0,0 +1,204 @@
+"""
+Shopping list generation.
+Planned foods in a date range are totalled per food in servings. Foods made from a
+recipe are expanded into its ingredients, scaled by the servings still needed after
+what is in inventory, until only bought foods remain. Recipes are loaded level by
+level, one query per depth of nesting, and demand is pushed through them parents
+first so a recipe used at several depths is expanded once with its total demand.
+"""
+
+from collections import defaultdict
+from typing import DefaultDict, Dict, List, Set, Tuple
+import datetime as dt
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from src.food.constants import FoodState
+from src.food.database import Food, Inventory, PlannedFood, RecipeIngredient
+from src.food.food_matrix import NO_RECIPE, food_matrix
+from src.food.nutrition import RecipeNode, scale_ingredients, topological_order
+from src.food.units import parse_unit
+from src.shopping.models import ShoppingListItem
+
+# Servings to buy below this are floating point leftovers of inventory subtraction
+EPSILON = 1e-9
+
+
+def _load_recipes(
+    db_session: Session,
+    recipe_foods: Dict[int, int],
+    foods: Dict[int, Tuple[str, str]],
+) -> Dict[int, RecipeNode]:
+    """Load the ingredients of every recipe reachable from `recipe_foods`.
+
+    Args:
+        db_session: Database session
+        recipe_foods: Recipe ID -> ID of the food it makes
+        foods: Filled with the name and serving unit of every ingredient food
+
+    Returns:
+        Recipe ID -> recipe with its ingredients in servings
+    """
+    nodes: Dict[int, RecipeNode] = {}
+    pending = dict(recipe_foods)
+    while pending:
+        level = {
+            recipe_id: RecipeNode(
+                id=recipe_id, food_id=food_id, override_nutrition=False
+            )
+            for recipe_id, food_id in pending.items()
+        }
+        for (
+            recipe_id,
+            food_id,
+            quantity,
+            unit,
+            name,
+            serving_unit,
+        ) in db_session.execute(
+            select(
+                RecipeIngredient.recipe_id,
+                RecipeIngredient.food_id,
+                RecipeIngredient.quantity,
+                RecipeIngredient.unit,
+                Food.name,
+                Food.serving_size_unit,
+            )
+            .join(Food, Food.id == RecipeIngredient.food_id)
+            .where(RecipeIngredient.recipe_id.in_(level))
+            .order_by(RecipeIngredient.id)
+        ):
+            level[recipe_id].ingredients.append((food_id, quantity, unit))
+            foods[food_id] = (name, serving_unit)
+        scale_ingredients(db_session, level.values())
+        nodes.update(level)
+        pending = {
+            source_recipe_id: food_id
+            for node in level.values()
+            for (food_id, _, _), source_recipe_id in zip(
+                node.ingredients, node.source_recipe_ids.tolist()
+            )
+            if source_recipe_id != NO_RECIPE and source_recipe_id not in nodes
+        }
+    return nodes
+
+
+def get_shopping_list(
+    db_session: Session, start_date: dt.date, end_date: dt.date
+) -> List[ShoppingListItem]:
+    """Foods to buy for the meals planned between two dates.
+
+    Planned foods already eaten are left out. Uncooked and ready inventory counts as
+    on hand, planned inventory doesn't, and inventory of a food made from a recipe is
+    used before its ingredients. Recipe lines whose unit can't be converted to
+    servings of their food are listed as they are, flagged `unconvertible`.
+
+    Args:
+        db_session: Database session
+        start_date: First day, inclusive
+        end_date: Last day, inclusive
+
+    Returns:
+        Foods to buy, ordered by name
+
+    Raises:
+        NutritionCycleError: if a planned recipe (indirectly) uses itself
+    """
+    food_matrix.refresh(db_session)
+    # Servings needed of every food, filled in parents first
+    demand: DefaultDict[int, float] = defaultdict(float)
+    # Food ID -> (name, serving unit)
+    foods: Dict[int, Tuple[str, str]] = {}
+    for food_id, name, serving_unit, servings in db_session.execute(
+        select(
+            Food.id, Food.name, Food.serving_size_unit, func.sum(PlannedFood.servings)
+        )
+        .join(PlannedFood, PlannedFood.food_id == Food.id)
+        .where(
+            PlannedFood.date >= start_date,
+            PlannedFood.date <= end_date,
+            PlannedFood.eaten.is_(False),
+        )
+        .group_by(Food.id)
+    ):
+        foods[food_id] = (name, serving_unit)
+        demand[food_id] += servings
+    if not demand:
+        return []
+
+    inventory: Dict[int, float] = {
+        food_id: quantity
+        for food_id, quantity in db_session.execute(
+            select(Inventory.food_id, func.sum(Inventory.quantity))
+            .where(Inventory.state != FoodState.PLANNED)
+            .group_by(Inventory.food_id)
+        )
+    }
+
+    planned = list(demand)
+    recipe_foods = {
+        source_recipe_id: food_id
+        for food_id, source_recipe_id in zip(
+            planned,
+            food_matrix.gather(db_session, planned).source_recipe_id.tolist(),
+        )
+        if source_recipe_id != NO_RECIPE
+    }
+    nodes = _load_recipes(db_session, recipe_foods, foods)
+    # Recipes without ingredients can't be made, so their food is bought instead
+    made: Set[int] = {node.food_id for node in nodes.values() if node.ingredients}
+    # (food ID, unit) -> quantity of the lines that can't be converted to servings
+    unconverted: DefaultDict[Tuple[int, str], float] = defaultdict(float)
+    for node in reversed(topological_order(nodes, recipe_foods)):
+        if node.food_id not in made:
+            continue
+        needed = max(demand[node.food_id] - inventory.get(node.food_id, 0.0), 0.0)
+        for (food_id, quantity, unit), servings, unconvertible in zip(
+            node.ingredients, node.servings.tolist(), node.unconvertible.tolist()
+        ):
+            if unconvertible:
+                unconverted[food_id, parse_unit(unit).name] += needed * quantity
+            else:
+                demand[food_id] += needed * servings
+
+    bought = [food_id for food_id in demand if food_id not in made]
+    serving_sizes = food_matrix.gather(db_session, bought).serving_size.tolist()
+    items: List[ShoppingListItem] = []
+    for food_id, serving_size in zip(bought, serving_sizes):
+        needed = demand[food_id]
+        in_inventory = inventory.get(food_id, 0.0)
+        servings = needed - in_inventory
+        if servings <= EPSILON:
+            continue
+        name, serving_unit = foods[food_id]
+        items.append(
+            ShoppingListItem(
+                food_id=food_id,
+                name=name,
+                needed=needed,
+                in_inventory=in_inventory,
+                servings=servings,
+                quantity=servings * serving_size,
+                unit=parse_unit(serving_unit).name,
+            )
+        )
+    for (food_id, unit), quantity in unconverted.items():
+        if quantity <= EPSILON:
+            continue
+        items.append(
+            ShoppingListItem(
+                food_id=food_id,
+                name=foods[food_id][0],
+                needed=0,
+                in_inventory=0,
+                servings=0,
+                quantity=quantity,
+                unit=unit,
+                unconvertible=True,
+            )
+        )
+    items.sort(
+        key=lambda item: (item.name.casefold(), item.food_id, item.unconvertible)
+    )
+    return items
@@ -0,0 +1,124 @@
+from pathlib import Path
+from typing import Any, Dict, Generator, Iterator, List, Tuple
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.food import statement_budget
+from src.food.cache import response_cache
+from src.food.database import (
+    Base,
+    get_db_session,
+    get_read_db_session,
+    open_read_db_session,
+)
+from src.food.food_matrix import food_matrix
+from src.food.nutrition import nutrition_engine
+from src.food.statement_budget import StatementBudgetMiddleware
+from src.food.storage import create_sqlite_engine
+from src.main import app
+
+# SQL statements a request may issue in tests, see src.food.statement_budget
+STATEMENT_BUDGET = 20
+
+
+def make_engine(path: Path) -> Engine:
+    """A fresh database whose statements count towards request budgets."""
+    engine = create_sqlite_engine(f"sqlite:///{path / 'test.db'}", "balanced")
+    Base.metadata.create_all(engine)
+    statement_budget.track(engine)
+    return engine
+
+
+@pytest.fixture
+def engine(tmp_path: Path) -> Iterator[Engine]:
+    engine = make_engine(tmp_path)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session(engine: Engine) -> Iterator[Session]:
+    with Session(engine) as db_session:
+        yield db_session
+
+
+@pytest.fixture
+def statement_budget_limit() -> int:
+    """Statements a request may issue, overridable per test module."""
+    return STATEMENT_BUDGET
+
+
+@pytest.fixture
+def client(engine: Engine, statement_budget_limit: int) -> Iterator[TestClient]:
+    """The app on `engine`, failing any request over its statement budget."""
+    sessions = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def get_session() -> Generator[Session, Any, Any]:
+        db = sessions()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    # Process-wide caches would otherwise carry over from other databases
+    nutrition_engine.clear()
+    food_matrix.clear()
+    response_cache.clear()
+    app.dependency_overrides[get_db_session] = get_session
+    app.dependency_overrides[get_read_db_session] = get_session
+    app.dependency_overrides[open_read_db_session] = lambda: sessions()
+    # Not used as a context manager, so the lifespan doesn't open the real database
+    yield TestClient(StatementBudgetMiddleware(app, limit=statement_budget_limit))
+    app.dependency_overrides.clear()
+
+
+def create_food(
+    client: TestClient,
+    name: str,
+    serving_size: float = 100,
+    serving_size_unit: str = "g",
+    **fields: Any,
+) -> Dict[str, Any]:
+    """Create a food through the API, with zero nutrients unless given."""
+    response = client.post(
+        "/api/foods",
+        json={
+            "name": name,
+            "serving_size": serving_size,
+            "serving_size_unit": serving_size_unit,
+            "calories": 0,
+            "fat": 0,
+            "protein": 0,
+            "carbohydrates": 0,
+            **fields,
+        },
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def create_recipe(
+    client: TestClient, name: str, ingredients: List[Tuple[int, float, str]]
+) -> Dict[str, Any]:
+    """Create a recipe through the API from (food ID, quantity, unit) lines."""
+    response = client.post(
+        "/api/recipes",
+        json={
+            "name": name,
+            "ingredients": [
+                {"food_id": food_id, "note": "", "quantity": quantity, "unit": unit}
+                for food_id, quantity, unit in ingredients
+            ],
+            "instructions": [{"step": 1, "text": "Combine"}],
+            "override_nutrition": False,
+            "calories": 0,
+            "fat": 0,
+            "protein": 0,
+            "carbohydrates": 0,
+        },
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
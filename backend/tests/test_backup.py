@@ -0,0 +1,179 @@
+"""
+Export and import.
+An export imported into a database that already has data is added alongside it,
+every ID shifted past the existing ones with foreign keys following. Truncated
+exports are rejected, and the write lock is only taken once the whole upload has
+been checked.
+"""
+
+import json
+from typing import Any, Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine, func, select
+from sqlalchemy.orm import Session
+
+from src.backup.service import TABLES, ImportFormatError, Importer
+from src.food.database import Food, Inventory, PlannedFood, Recipe
+from tests.conftest import create_food, create_recipe
+
+
+@pytest.fixture
+def export(client: TestClient) -> List[Dict[str, Any]]:
+    """A recipe of two foods planned once and in stock, exported."""
+    rice = create_food(client, "Rice", calories=130)
+    egg = create_food(client, "Egg", serving_size=1, serving_size_unit="each")
+    create_recipe(client, "Bowl", [(rice["id"], 200, "g"), (egg["id"], 1, "each")])
+    response = client.post(
+        "/api/planned-foods",
+        json={
+            "date": "2026-03-02",
+            "meal": "LUNCH",
+            "servings": 1,
+            "food_id": rice["id"],
+        },
+    )
+    assert response.status_code == 200
+    response = client.post(
+        "/api/inventory", json={"food_id": egg["id"], "quantity": 6, "state": "READY"}
+    )
+    assert response.status_code == 200
+    response = client.get("/api/export")
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def post_import(client: TestClient, lines: List[Dict[str, Any]]) -> Any:
+    return client.post(
+        "/api/import",
+        content="".join(json.dumps(line) + "\n" for line in lines),
+        headers={"content-type": "application/x-ndjson"},
+    )
+
+
+def table_counts(db_session: Session) -> Dict[str, int]:
+    return {
+        name: db_session.scalar(select(func.count()).select_from(table)) or 0
+        for name, table in TABLES.items()
+    }
+
+
+def test_export_ends_with_row_counts(export: List[Dict[str, Any]]) -> None:
+    assert export[0] == {"format": "private-chef-export", "version": 2}
+    assert export[-1] == {
+        "end": {
+            "recipe": 1,
+            "food": 3,
+            "recipe_ingredient": 2,
+            "recipe_instruction": 1,
+            "planned_food": 1,
+            "inventory": 1,
+        }
+    }
+
+
+def test_round_trip_shifts_ids(
+    client: TestClient, db_session: Session, export: List[Dict[str, Any]]
+) -> None:
+    before = table_counts(db_session)
+    # The test engine begins immediate transactions, which would block the client
+    db_session.rollback()
+    response = post_import(client, export)
+    assert response.status_code == 200, response.text
+    assert response.json()["imported"] == export[-1]["end"]
+    recipes = {recipe["id"]: recipe for recipe in client.get("/api/recipes").json()}
+    assert table_counts(db_session) == {
+        name: 2 * count for name, count in before.items()
+    }
+
+    # The copy's recipe uses the copies of the foods, and its food is made from it
+    original, copy = recipes[1], recipes[2]
+    assert copy["name"] == original["name"]
+    assert copy["food"]["id"] == original["food"]["id"] + 3
+    assert [i["food"]["id"] for i in copy["ingredients"]] == [
+        i["food"]["id"] + 3 for i in original["ingredients"]
+    ]
+    assert (
+        db_session.scalar(
+            select(Food.source_recipe_id).where(Food.id == copy["food"]["id"])
+        )
+        == copy["id"]
+    )
+    assert db_session.scalars(
+        select(PlannedFood.food_id).order_by(PlannedFood.id)
+    ).all() == [1, 4]
+    assert db_session.scalars(
+        select(Inventory.food_id).order_by(Inventory.id)
+    ).all() == [
+        2,
+        5,
+    ]
+
+
+@pytest.mark.parametrize(
+    "cut, message",
+    [
+        (slice(None, -1), "no end record"),
+        (slice(None, -2), "no end record"),
+    ],
+)
+def test_rejects_truncated_imports(
+    client: TestClient,
+    db_session: Session,
+    export: List[Dict[str, Any]],
+    cut: slice,
+    message: str,
+) -> None:
+    before = table_counts(db_session)
+    db_session.rollback()
+    response = post_import(client, export[cut])
+    assert response.status_code == 400
+    assert message in response.json()["detail"]
+    assert table_counts(db_session) == before
+
+
+def test_rejects_mismatched_end_record(
+    client: TestClient, export: List[Dict[str, Any]]
+) -> None:
+    # A row lost from the middle
+    lines = [line for line in export if line.get("table") != "inventory"]
+    response = post_import(client, lines)
+    assert response.status_code == 400
+    assert "counts 1 inventory rows, found 0" in response.json()["detail"]
+
+
+def test_imports_version_1_without_end_record(
+    client: TestClient, export: List[Dict[str, Any]]
+) -> None:
+    lines = [{"format": "private-chef-export", "version": 1}, *export[1:-1]]
+    response = post_import(client, lines)
+    assert response.status_code == 200, response.text
+    assert response.json()["imported"]["food"] == 3
+
+
+def test_locks_only_to_write(
+    engine: Engine, db_session: Session, export: List[Dict[str, Any]]
+) -> None:
+    importer = Importer(db_session)
+    importer.add(export)
+    assert not db_session.in_transaction()
+    # Another writer isn't held up while the upload is checked
+    with Session(engine) as other:
+        other.add(Recipe(name="Soup", override_nutrition=False))
+        other.commit()
+    imported = importer.finish()
+    assert db_session.in_transaction()
+    db_session.commit()
+    assert imported["recipe"] == 1
+    assert db_session.scalar(select(func.count()).select_from(Recipe)) == 3
+
+
+def test_rejects_invalid_rows_before_writing(
+    db_session: Session, export: List[Dict[str, Any]]
+) -> None:
+    lines = [*export]
+    lines[1] = {"table": "recipe", "row": {**lines[1]["row"], "id": "one"}}
+    with pytest.raises(ImportFormatError, match="Line 2: invalid recipe row"):
+        Importer(db_session).add(lines)
+    assert not db_session.in_transaction()
@@ -0,0 +1,100 @@
+"""
+Bulk food import.
+POST /foods/bulk takes a JSON array or an NDJSON stream, inserts the valid rows in
+one transaction and reports every row by its position in the upload.
+"""
+
+import json
+from typing import Any, Dict, List
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from src.food import service
+from src.food.database import Food
+from src.food.models import CreateFoodRequest
+
+
+def food(name: str, **fields: Any) -> Dict[str, Any]:
+    return {
+        "name": name,
+        "serving_size": 100,
+        "serving_size_unit": "g",
+        "calories": 100,
+        "fat": 1,
+        "protein": 2,
+        "carbohydrates": 3,
+        **fields,
+    }
+
+
+def names(client: TestClient) -> List[str]:
+    return [row["name"] for row in client.get("/api/foods").json()]
+
+
+def test_imports_json_array(client: TestClient) -> None:
+    response = client.post(
+        "/api/foods/bulk",
+        json=[food("Oats"), {"name": "No nutrients"}, food("Milk")],
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["failed"]) == (2, 1)
+    results = body["results"]
+    assert [result["index"] for result in results] == [0, 1, 2]
+    assert results[1]["id"] is None and "calories" in results[1]["error"]
+    # IDs follow upload order
+    assert results[0]["id"] < results[2]["id"]
+    assert names(client) == ["Oats", "Milk"]
+
+
+def test_imports_ndjson_stream(client: TestClient) -> None:
+    lines = [json.dumps(food("Oats")), "not json", json.dumps(food("Milk"))]
+    response = client.post(
+        "/api/foods/bulk",
+        content="\n".join(lines) + "\n",
+        headers={"content-type": "application/x-ndjson"},
+    )
+    body = response.json()
+    assert (body["created"], body["failed"]) == (2, 1)
+    assert body["results"][1]["error"]
+    assert names(client) == ["Oats", "Milk"]
+
+
+def test_imported_foods_are_searchable(client: TestClient) -> None:
+    client.post("/api/foods/bulk", json=[food("Rolled oats"), food("Milk")])
+    found = client.get("/api/foods/search", params={"q": "oat"}).json()
+    assert [row["name"] for row in found] == ["Rolled oats"]
+
+
+def test_failing_row_is_retried_alone(db_session: Session) -> None:
+    # Valid for the model, but too large for an SQLite integer
+    rows = [food("Oats"), food("Huge", calories=10**20), food("Milk")]
+    results = service.insert_foods(
+        db_session,
+        [
+            (index, CreateFoodRequest.model_validate(row))
+            for index, row in enumerate(rows)
+        ],
+    )
+    assert [result.index for result in results] == [0, 1, 2]
+    assert results[1].id is None and results[1].error
+    assert results[0].id is not None and results[2].id is not None
+    db_session.commit()
+    assert db_session.scalars(select(Food.name).order_by(Food.id)).all() == [
+        "Oats",
+        "Milk",
+    ]
+
+
+def test_chunk_is_part_of_the_transaction(db_session: Session) -> None:
+    requests = [
+        (index, CreateFoodRequest.model_validate(food(f"Food {index}")))
+        for index in range(3)
+    ]
+    results = service.insert_foods(db_session, requests)
+    assert all(result.id is not None for result in results)
+    # The chunk's savepoint must not have committed on release
+    db_session.rollback()
+    assert db_session.scalar(select(func.count()).select_from(Food)) == 0
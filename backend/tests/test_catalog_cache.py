@@ -0,0 +1,92 @@
+"""
+Conditional GETs and the response cache of the catalog listings.
+GET /foods and GET /recipes carry an ETag derived from the revisions of the tables
+they read, answer a matching If-None-Match with 304, and serve cached bodies until
+a write to one of those tables changes the ETag.
+"""
+
+from fastapi.testclient import TestClient
+
+from src.food.cache import response_cache
+from tests.conftest import create_food, create_recipe
+
+
+def test_foods_not_modified(client: TestClient) -> None:
+    create_food(client, "Rice")
+    response = client.get("/api/foods")
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "no-cache"
+
+    for header in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        response = client.get("/api/foods", headers={"If-None-Match": header})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    response = client.get("/api/foods", headers={"If-None-Match": '"other"'})
+    assert response.status_code == 200
+
+
+def test_etag_depends_on_the_query(client: TestClient) -> None:
+    create_food(client, "Rice")
+    all_foods = client.get("/api/foods").headers["etag"]
+    names = client.get("/api/foods", params={"fields": "name"}).headers["etag"]
+    assert all_foods != names
+
+
+def test_foods_cached_until_a_write(client: TestClient) -> None:
+    rice = create_food(client, "Rice")
+    first = client.get("/api/foods")
+    etag = first.headers["etag"]
+    assert response_cache.get(etag) == first.content
+    second = client.get("/api/foods")
+    assert (second.headers["etag"], second.content) == (etag, first.content)
+
+    response = client.put(
+        f"/api/foods/{rice['id']}", json={"id": rice["id"], "name": "Brown rice"}
+    )
+    assert response.status_code == 200
+    response = client.get("/api/foods", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert [food["name"] for food in response.json()] == ["Brown rice"]
+
+
+def test_recipes_change_with_their_foods(client: TestClient) -> None:
+    rice = create_food(client, "Rice")
+    recipe = create_recipe(client, "Bowl", [(rice["id"], 200, "g")])
+    etag = client.get("/api/recipes").headers["etag"]
+    response = client.get("/api/recipes", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    # Recipes embed their ingredients' foods, so a food write changes them too
+    client.put(
+        f"/api/foods/{rice['id']}", json={"id": rice["id"], "name": "Brown rice"}
+    )
+    response = client.get("/api/recipes", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    ingredient = response.json()[0]["ingredients"][0]
+    assert ingredient["food"]["name"] == "Brown rice"
+
+    etag = response.headers["etag"]
+    assert client.delete(f"/api/recipes/{recipe['id']}").status_code == 200
+    response = client.get("/api/recipes", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_unrelated_writes_keep_the_etag(client: TestClient) -> None:
+    rice = create_food(client, "Rice")
+    etag = client.get("/api/recipes").headers["etag"]
+    response = client.post(
+        "/api/planned-foods",
+        json={
+            "date": "2026-03-02",
+            "meal": "LUNCH",
+            "servings": 1,
+            "food_id": rice["id"],
+        },
+    )
+    assert response.status_code == 200
+    response = client.get("/api/recipes", headers={"If-None-Match": etag})
+    assert response.status_code == 304
@@ -0,0 +1,152 @@
+"""
+Daily nutrition totals.
+daily_nutrition is maintained as foods are planned and changed, and must always
+match totals recomputed from planned_food. Foods made from recipes count with the
+recipe's rolled-up nutrition, which changes with the foods and recipes they use.
+"""
+
+from typing import Dict
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from src.nutrition.service import verify_daily_nutrition
+from tests.conftest import STATEMENT_BUDGET, create_food, create_recipe
+
+DAY = "2026-03-02"
+
+
+@pytest.fixture
+def statement_budget_limit() -> int:
+    # Changing a food or recipe also recomputes the days its users are planned on,
+    # loading their rollups a few statements per level of nesting
+    return 2 * STATEMENT_BUDGET
+
+
+@pytest.fixture
+def foods(client: TestClient) -> Dict[str, int]:
+    """Food IDs of rice, a bowl of 200 g rice, and a meal of one bowl and an egg."""
+    rice = create_food(client, "Rice", calories=130, carbohydrates=28)
+    egg = create_food(
+        client, "Egg", serving_size=1, serving_size_unit="each", calories=70, fat=5
+    )
+    bowl = create_recipe(client, "Bowl", [(rice["id"], 200, "g")])
+    meal = create_recipe(
+        client, "Meal", [(bowl["food"]["id"], 1, "serving"), (egg["id"], 1, "each")]
+    )
+    return {
+        "rice": rice["id"],
+        "egg": egg["id"],
+        "bowl": bowl["food"]["id"],
+        "bowl_recipe": bowl["id"],
+        "meal": meal["food"]["id"],
+        "meal_recipe": meal["id"],
+    }
+
+
+def plan(client: TestClient, food_id: int, servings: float, meal: str = "LUNCH") -> int:
+    response = client.post(
+        "/api/planned-foods",
+        json={"date": DAY, "meal": meal, "servings": servings, "food_id": food_id},
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def planned_calories(client: TestClient) -> float:
+    response = client.get("/api/nutrition/daily", params={"start": DAY, "end": DAY})
+    assert response.status_code == 200
+    days = response.json()
+    return days[0]["planned"]["calories"] if days else 0
+
+
+def assert_consistent(db_session: Session) -> None:
+    assert verify_daily_nutrition(db_session) == []
+    # The test engine begins immediate transactions, which would block the client
+    db_session.rollback()
+
+
+def test_recipe_food_counts_its_rollup(
+    client: TestClient, db_session: Session, foods: Dict[str, int]
+) -> None:
+    plan(client, foods["meal"], 2)
+    plan(client, foods["rice"], 1, meal="DINNER")
+    # Two meals of 260 + 70, and 130 of rice
+    assert planned_calories(client) == pytest.approx(790)
+    assert_consistent(db_session)
+
+
+def test_ingredient_change_updates_planned_recipes(
+    client: TestClient, db_session: Session, foods: Dict[str, int]
+) -> None:
+    plan(client, foods["meal"], 1)
+    rice_id = foods["rice"]
+    response = client.put(
+        f"/api/foods/{rice_id}", json={"id": rice_id, "calories": 100}
+    )
+    assert response.status_code == 200
+    assert planned_calories(client) == pytest.approx(270)
+    assert_consistent(db_session)
+
+
+def test_recipe_change_updates_its_users(
+    client: TestClient, db_session: Session, foods: Dict[str, int]
+) -> None:
+    plan(client, foods["meal"], 1)
+    bowl_id = foods["bowl_recipe"]
+    response = client.put(
+        f"/api/recipes/{bowl_id}",
+        json={
+            "id": bowl_id,
+            "ingredients": [
+                {"food_id": foods["rice"], "note": "", "quantity": 100, "unit": "g"}
+            ],
+        },
+    )
+    assert response.status_code == 200
+    assert planned_calories(client) == pytest.approx(200)
+    assert_consistent(db_session)
+
+
+def test_deleted_recipe_stops_counting(
+    client: TestClient, db_session: Session, foods: Dict[str, int]
+) -> None:
+    plan(client, foods["meal"], 1)
+    plan(client, foods["egg"], 1, meal="DINNER")
+    response = client.delete(f"/api/recipes/{foods['meal_recipe']}")
+    assert response.status_code == 200
+    assert planned_calories(client) == pytest.approx(70)
+    assert_consistent(db_session)
+
+
+def test_planned_food_changes(
+    client: TestClient, db_session: Session, foods: Dict[str, int]
+) -> None:
+    planned_food_id = plan(client, foods["bowl"], 1)
+    response = client.put(
+        f"/api/planned-foods/{planned_food_id}",
+        json={"id": planned_food_id, "servings": 3, "eaten": True},
+    )
+    assert response.status_code == 200
+    response = client.get("/api/nutrition/daily", params={"start": DAY, "end": DAY})
+    day = response.json()[0]
+    assert day["planned"]["calories"] == pytest.approx(780)
+    assert day["eaten"]["calories"] == pytest.approx(780)
+    assert_consistent(db_session)
+
+    response = client.delete(f"/api/planned-foods/{planned_food_id}")
+    assert response.status_code == 200
+    assert planned_calories(client) == 0
+    assert_consistent(db_session)
+
+
+def test_deleted_ingredient_recipe_updates_its_users(
+    client: TestClient, db_session: Session, foods: Dict[str, int]
+) -> None:
+    plan(client, foods["meal"], 1)
+    response = client.delete(f"/api/recipes/{foods['bowl_recipe']}")
+    assert response.status_code == 200
+    # The meal is left with its egg
+    assert planned_calories(client) == pytest.approx(70)
+    assert_consistent(db_session)
@@ -0,0 +1,86 @@
+"""
+Food matrix refresh.
+Refresh queries the database without holding the matrix's lock, and doesn't apply
+rows it loaded if the arrays changed in the meantime.
+"""
+
+import threading
+from typing import Any, Callable, List
+
+from sqlalchemy import Engine, event
+from sqlalchemy.orm import Session
+
+from src.food.database import Food
+from src.food.food_matrix import FoodMatrix
+from src.food.service import bump_revisions
+
+
+def add_food(db_session: Session, name: str, calories: int) -> Food:
+    food = Food(
+        name=name,
+        serving_size=100,
+        serving_size_unit="g",
+        calories=calories,
+        fat=0,
+        protein=0,
+        carbohydrates=0,
+    )
+    food.revision = bump_revisions(db_session, "food")
+    db_session.add(food)
+    db_session.commit()
+    return food
+
+
+def on_food_query(engine: Engine, callback: Callable[[], None]) -> List[str]:
+    """Call `callback` before every query of food rows, returning those queries."""
+    queries: List[str] = []
+
+    def before_cursor_execute(conn: Any, cursor: Any, statement: str, *args: Any):
+        if statement.startswith("SELECT food.id, food.source_recipe_id"):
+            queries.append(statement)
+            callback()
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    return queries
+
+
+def test_refresh_queries_outside_the_lock(engine: Engine, db_session: Session) -> None:
+    food = add_food(db_session, "Rice", 130)
+    matrix = FoodMatrix()
+    read: List[List[int]] = []
+
+    def read_in_other_thread() -> None:
+        reader = threading.Thread(target=lambda: read.append(matrix.ids().tolist()))
+        reader.start()
+        reader.join(timeout=5)
+
+    on_food_query(engine, read_in_other_thread)
+    matrix.refresh(db_session)
+    # The reader didn't wait for the refresh, so saw the arrays before it
+    assert read == [[]]
+    assert matrix.ids().tolist() == [food.id]
+
+
+def test_refresh_retries_after_a_concurrent_update(
+    engine: Engine, db_session: Session
+) -> None:
+    rice = add_food(db_session, "Rice", 130)
+    matrix = FoodMatrix()
+    matrix.refresh(db_session)
+    egg = add_food(db_session, "Egg", 70)
+    rice.calories = 100
+    rice.revision = bump_revisions(db_session, "food")
+    db_session.commit()
+
+    updated: List[bool] = []
+
+    def update_once() -> None:
+        if not updated:
+            updated.append(True)
+            matrix.update([rice], rice.revision)
+
+    queries = on_food_query(engine, update_once)
+    matrix.refresh(db_session)
+    assert len(queries) == 2
+    columns = matrix.gather(db_session, [rice.id, egg.id])
+    assert columns.nutrients[:, 0].tolist() == [100, 70]
@@ -0,0 +1,59 @@
+"""
+The food listing.
+GET /foods streams foods in ID order, keyset paginated with `after` and `limit`
+and projected to the columns in `fields`.
+"""
+
+from typing import Any, Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+FOODS = 5
+
+
+def food(number: int) -> Dict[str, Any]:
+    return {
+        "name": f"Food {number}",
+        "serving_size": 100,
+        "serving_size_unit": "g",
+        "calories": 100 + number,
+        "fat": 1,
+        "protein": 2,
+        "carbohydrates": 3,
+    }
+
+
+@pytest.fixture
+def food_ids(client: TestClient) -> List[int]:
+    return [
+        client.post("/api/foods", json=food(number)).json()["id"]
+        for number in range(FOODS)
+    ]
+
+
+def test_lists_every_food(client: TestClient, food_ids: List[int]) -> None:
+    response = client.get("/api/foods")
+    assert response.status_code == 200
+    foods = response.json()
+    assert [row["id"] for row in foods] == food_ids
+    assert foods[0]["name"] == "Food 0"
+    assert foods[0]["calories"] == 100
+
+
+def test_pages_after_the_last_id(client: TestClient, food_ids: List[int]) -> None:
+    first = client.get("/api/foods", params={"limit": 2}).json()
+    assert [row["id"] for row in first] == food_ids[:2]
+    second = client.get("/api/foods", params={"after": first[-1]["id"], "limit": 2})
+    assert [row["id"] for row in second.json()] == food_ids[2:4]
+
+
+def test_projects_fields(client: TestClient, food_ids: List[int]) -> None:
+    response = client.get("/api/foods", params={"fields": "name, calories"})
+    assert response.json()[0] == {"id": food_ids[0], "name": "Food 0", "calories": 100}
+
+
+def test_rejects_unknown_fields(client: TestClient) -> None:
+    response = client.get("/api/foods", params={"fields": "name,price"})
+    assert response.status_code == 400
+    assert "price" in response.json()["detail"]
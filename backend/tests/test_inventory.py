@@ -0,0 +1,48 @@
+"""
+Validation of inventory writes.
+Stock is counted in servings: additions must be positive and a stock level set
+directly must not be negative.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+FOOD = {
+    "name": "Oats",
+    "serving_size": 40,
+    "serving_size_unit": "g",
+    "calories": 150,
+    "fat": 3,
+    "protein": 5,
+    "carbohydrates": 27,
+}
+
+
+@pytest.fixture
+def food_id(client: TestClient) -> int:
+    response = client.post("/api/foods", json=FOOD)
+    assert response.status_code == 200
+    return response.json()["id"]
+
+
+@pytest.mark.parametrize("quantity", [-3, 0])
+def test_add_rejects_non_positive_quantity(
+    client: TestClient, food_id: int, quantity: float
+) -> None:
+    response = client.post(
+        "/api/inventory", json={"food_id": food_id, "quantity": quantity}
+    )
+    assert response.status_code == 422
+
+
+def test_update_rejects_negative_quantity(client: TestClient, food_id: int) -> None:
+    response = client.post("/api/inventory", json={"food_id": food_id, "quantity": 2})
+    assert response.status_code == 200
+    state = response.json()["state"]
+    request = {"food_id": food_id, "state": state}
+
+    response = client.put(f"/api/inventory/{food_id}", json={**request, "quantity": -5})
+    assert response.status_code == 422
+    response = client.put(f"/api/inventory/{food_id}", json={**request, "quantity": 0})
+    assert response.status_code == 200
+    assert response.json()["quantity"] == 0
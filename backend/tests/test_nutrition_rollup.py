@@ -0,0 +1,112 @@
+"""
+Recipe nutrition rollup.
+A recipe's per-serving nutrition sums its ingredients, following ingredients made
+from other recipes, and changes to any food or recipe it uses must show up in it.
+A recipe may never (indirectly) use itself.
+"""
+
+from typing import Dict
+
+import pytest
+from fastapi.testclient import TestClient
+
+from tests.conftest import create_food, create_recipe
+
+
+@pytest.fixture
+def recipes(client: TestClient) -> Dict[str, Dict]:
+    """Rice and egg, a bowl of 200 g rice, and a meal of one bowl and two eggs."""
+    rice = create_food(client, "Rice", calories=130, carbohydrates=28, protein=3)
+    egg = create_food(
+        client, "Egg", serving_size=1, serving_size_unit="each", calories=70, fat=5
+    )
+    bowl = create_recipe(client, "Bowl", [(rice["id"], 200, "g")])
+    meal = create_recipe(
+        client, "Meal", [(bowl["food"]["id"], 1, "serving"), (egg["id"], 2, "each")]
+    )
+    return {"rice": rice, "egg": egg, "bowl": bowl, "meal": meal}
+
+
+def nutrition(client: TestClient, recipe_id: int) -> Dict:
+    response = client.get(f"/api/recipes/{recipe_id}/nutrition")
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_rolls_up_nested_recipes(client: TestClient, recipes: Dict[str, Dict]) -> None:
+    assert nutrition(client, recipes["bowl"]["id"]) == {
+        "calories": 260,
+        "fat": 0,
+        "protein": 6,
+        "carbohydrates": 56,
+    }
+    assert nutrition(client, recipes["meal"]["id"]) == {
+        "calories": 400,
+        "fat": 10,
+        "protein": 6,
+        "carbohydrates": 56,
+    }
+
+
+def test_food_change_reaches_every_user(
+    client: TestClient, recipes: Dict[str, Dict]
+) -> None:
+    # Memoize both, then change the food at the bottom of the chain
+    nutrition(client, recipes["meal"]["id"])
+    rice_id = recipes["rice"]["id"]
+    response = client.put(
+        f"/api/foods/{rice_id}", json={"id": rice_id, "calories": 100}
+    )
+    assert response.status_code == 200
+    assert nutrition(client, recipes["bowl"]["id"])["calories"] == 200
+    assert nutrition(client, recipes["meal"]["id"])["calories"] == 340
+
+
+def test_recipe_change_reaches_its_users(
+    client: TestClient, recipes: Dict[str, Dict]
+) -> None:
+    nutrition(client, recipes["meal"]["id"])
+    bowl_id = recipes["bowl"]["id"]
+    response = client.put(
+        f"/api/recipes/{bowl_id}",
+        json={
+            "id": bowl_id,
+            "ingredients": [
+                {
+                    "food_id": recipes["rice"]["id"],
+                    "note": "",
+                    "quantity": 100,
+                    "unit": "g",
+                }
+            ],
+        },
+    )
+    assert response.status_code == 200
+    assert nutrition(client, recipes["meal"]["id"])["calories"] == 270
+
+
+@pytest.mark.parametrize("uses", ["bowl", "meal"])
+def test_rejects_cycles(
+    client: TestClient, recipes: Dict[str, Dict], uses: str
+) -> None:
+    # The bowl using itself, or the meal that already uses the bowl
+    bowl_id = recipes["bowl"]["id"]
+    response = client.put(
+        f"/api/recipes/{bowl_id}",
+        json={
+            "id": bowl_id,
+            "ingredients": [
+                {
+                    "food_id": recipes[uses]["food"]["id"],
+                    "note": "",
+                    "quantity": 1,
+                    "unit": "serving",
+                }
+            ],
+        },
+    )
+    assert response.status_code == 409
+    assert "cycle" in response.json()["detail"]
+    # Nothing was saved, so both recipes still roll up
+    assert nutrition(client, recipes["bowl"]["id"])["calories"] == 260
+    assert nutrition(client, recipes["meal"]["id"])["calories"] == 400
@@ -0,0 +1,95 @@
+"""
+Query plans of the planned food reads.
+Over a year of planned foods, EXPLAIN QUERY PLAN must show week and month range
+queries (as issued by service.get_planned_foods) searching
+ix_planned_food_date_meal, and the per-food lookups used when a food changes
+searching ix_planned_food_food_id, rather than scanning planned_food.
+"""
+
+import datetime as dt
+from typing import Iterator, List
+
+import pytest
+from sqlalchemy import Select, select, text
+from sqlalchemy.orm import Session
+
+from src.food import service
+from src.food.constants import MealType
+from src.food.database import Base, Food, PlannedFood
+from src.food.storage import create_sqlite_engine
+
+START = dt.date(2026, 1, 1)
+DAYS = 365
+PER_MEAL = 3
+
+
+def seed(db_session: Session) -> None:
+    db_session.execute(
+        Food.__table__.insert(),
+        [
+            {
+                "name": f"Food {i}",
+                "serving_size": 100.0,
+                "serving_size_unit": "g",
+                "calories": i,
+                "fat": 1,
+                "protein": 1,
+                "carbohydrates": 1,
+            }
+            for i in range(1, 201)
+        ],
+    )
+    db_session.execute(
+        PlannedFood.__table__.insert(),
+        [
+            {
+                "date": START + dt.timedelta(days=day),
+                "meal": meal.name,
+                "servings": 1.0,
+                "food_id": (day * 7 + i) % 200 + 1,
+                "eaten": False,
+            }
+            for day in range(DAYS)
+            for meal in MealType
+            for i in range(PER_MEAL)
+        ],
+    )
+    db_session.commit()
+    db_session.execute(text("ANALYZE"))
+
+
+@pytest.fixture(scope="module")
+def db_session(tmp_path_factory: pytest.TempPathFactory) -> Iterator[Session]:
+    path = tmp_path_factory.mktemp("plan") / "plan.db"
+    engine = create_sqlite_engine(f"sqlite:///{path}", "durable")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db_session:
+        seed(db_session)
+        yield db_session
+    engine.dispose()
+
+
+def query_plan(db_session: Session, statement: Select) -> List[str]:
+    compiled = statement.compile(
+        dialect=db_session.get_bind().dialect,
+        compile_kwargs={"literal_binds": True},
+    )
+    return [
+        row[-1] for row in db_session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+    ]
+
+
+def assert_searches(plan: List[str], index: str) -> None:
+    assert any("planned_food" in step and index in step for step in plan), plan
+    assert not any(step.startswith("SCAN planned_food") for step in plan), plan
+
+
+@pytest.mark.parametrize("days", [7, 31])
+def test_range_query_searches_date_index(db_session: Session, days: int) -> None:
+    statement = service.planned_food_query(START, START + dt.timedelta(days=days - 1))
+    assert_searches(query_plan(db_session, statement), "ix_planned_food_date_meal")
+
+
+def test_food_lookup_searches_food_index(db_session: Session) -> None:
+    statement = select(PlannedFood.id).where(PlannedFood.food_id == 1)
+    assert_searches(query_plan(db_session, statement), "ix_planned_food_food_id")
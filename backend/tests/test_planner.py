@@ -0,0 +1,71 @@
+"""
+Meal plan optimizer on foods made from recipes.
+A recipe's food row keeps the nutrition given when the recipe was created, not the
+totals of its ingredients, so unless the recipe overrides its nutrition the
+optimizer has to plan with the rolled-up nutrition instead.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+RICE = {
+    "name": "Rice",
+    "serving_size": 100,
+    "serving_size_unit": "g",
+    "calories": 130,
+    "fat": 0,
+    "protein": 3,
+    "carbohydrates": 28,
+}
+
+
+@pytest.fixture
+def recipe_food_id(client: TestClient) -> int:
+    response = client.post("/api/foods", json=RICE)
+    assert response.status_code == 200
+    response = client.post(
+        "/api/recipes",
+        json={
+            "name": "Rice bowl",
+            "ingredients": [
+                {
+                    "food_id": response.json()["id"],
+                    "note": "",
+                    "quantity": 200,
+                    "unit": "g",
+                }
+            ],
+            "instructions": [{"step": 1, "text": "Cook the rice"}],
+            "override_nutrition": False,
+            "calories": 0,
+            "fat": 0,
+            "protein": 0,
+            "carbohydrates": 0,
+        },
+    )
+    assert response.status_code == 200
+    return response.json()["food"]["id"]
+
+
+def test_plans_with_recipe_nutrition(client: TestClient, recipe_food_id: int) -> None:
+    response = client.post(
+        "/api/meal-plans/optimize",
+        json={
+            "start": "2026-01-01",
+            "days": 1,
+            "meals": ["LUNCH"],
+            "targets": {"calories": 520},
+            "foods_per_meal": 1,
+            "food_ids": [recipe_food_id],
+        },
+    )
+    assert response.status_code == 200
+    plan = response.json()
+    assert [
+        (planned_food["food_id"], planned_food["servings"])
+        for planned_food in plan["planned_foods"]
+    ] == [(recipe_food_id, 2.0)]
+    # Two servings of a recipe of 200 g of rice
+    totals = plan["days"][0]["totals"]
+    assert totals["calories"] == pytest.approx(520)
+    assert totals["carbohydrates"] == pytest.approx(112)
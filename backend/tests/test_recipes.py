@@ -0,0 +1,68 @@
+"""
+Recipe writes.
+Creating a recipe saves it with its food, ingredients and instructions in one
+commit; references to foods that don't exist are rejected with the missing IDs.
+"""
+
+from fastapi.testclient import TestClient
+
+from tests.conftest import create_food, create_recipe
+
+
+def test_creates_recipe_with_its_parts(client: TestClient) -> None:
+    rice = create_food(client, "Rice", calories=130)
+    egg = create_food(client, "Egg", serving_size=1, serving_size_unit="each")
+    recipe = create_recipe(
+        client, "Fried rice", [(rice["id"], 200, "g"), (egg["id"], 2, "each")]
+    )
+    assert recipe["food"]["name"] == "Fried rice"
+    assert [
+        (ingredient["food"]["id"], ingredient["quantity"], ingredient["unit"])
+        for ingredient in recipe["ingredients"]
+    ] == [(rice["id"], 200, "g"), (egg["id"], 2, "each")]
+    assert [instruction["text"] for instruction in recipe["instructions"]] == [
+        "Combine"
+    ]
+
+    assert client.get("/api/recipes").json() == [recipe]
+
+
+def test_create_reports_missing_foods(client: TestClient) -> None:
+    rice = create_food(client, "Rice")
+    response = client.post(
+        "/api/recipes",
+        json={
+            "name": "Mystery",
+            "ingredients": [
+                {"food_id": food_id, "note": "", "quantity": 1, "unit": "g"}
+                for food_id in (rice["id"], 98, 99)
+            ],
+            "instructions": [],
+            "override_nutrition": False,
+            "calories": 0,
+            "fat": 0,
+            "protein": 0,
+            "carbohydrates": 0,
+        },
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"]["missing_food_ids"] == [98, 99]
+    assert client.get("/api/recipes").json() == []
+
+
+def test_update_reports_missing_foods(client: TestClient) -> None:
+    rice = create_food(client, "Rice")
+    recipe = create_recipe(client, "Rice", [(rice["id"], 100, "g")])
+    response = client.put(
+        f"/api/recipes/{recipe['id']}",
+        json={
+            "id": recipe["id"],
+            "ingredients": [{"food_id": 99, "note": "", "quantity": 1, "unit": "g"}],
+        },
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"]["missing_food_ids"] == [99]
+    # The old ingredients are kept
+    (saved,) = client.get("/api/recipes").json()
+    ingredients = saved["ingredients"]
+    assert [ingredient["food"]["id"] for ingredient in ingredients] == [rice["id"]]
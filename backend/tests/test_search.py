@@ -0,0 +1,46 @@
+"""
+Food search.
+GET /foods/search matches words starting with each term of the query against the
+name index, which follows renames and drops the foods of deleted recipes.
+"""
+
+from typing import List
+
+from fastapi.testclient import TestClient
+
+from tests.conftest import create_food, create_recipe
+
+
+def search(client: TestClient, query: str, limit: int = 20) -> List[str]:
+    response = client.get("/api/foods/search", params={"q": query, "limit": limit})
+    assert response.status_code == 200, response.text
+    return [food["name"] for food in response.json()]
+
+
+def test_matches_word_prefixes(client: TestClient) -> None:
+    create_food(client, "Brown rice")
+    create_food(client, "Rice noodles")
+    create_food(client, "Licorice")
+    assert sorted(search(client, "ric")) == ["Brown rice", "Rice noodles"]
+    assert search(client, "rice bro") == ["Brown rice"]
+    assert len(search(client, "rice", limit=1)) == 1
+    assert search(client, '"') == []
+
+
+def test_reindexes_renamed_foods(client: TestClient) -> None:
+    rice = create_food(client, "Rice")
+    response = client.put(
+        f"/api/foods/{rice['id']}", json={"id": rice["id"], "name": "Quinoa"}
+    )
+    assert response.status_code == 200
+    assert search(client, "rice") == []
+    assert search(client, "quin") == ["Quinoa"]
+
+
+def test_drops_deleted_recipes(client: TestClient) -> None:
+    rice = create_food(client, "Rice")
+    recipe = create_recipe(client, "Rice bowl", [(rice["id"], 200, "g")])
+    assert sorted(search(client, "rice")) == ["Rice", "Rice bowl"]
+    assert client.delete(f"/api/recipes/{recipe['id']}").status_code == 200
+    assert search(client, "rice") == ["Rice"]
+    assert search(client, "bowl") == []
@@ -0,0 +1,84 @@
+"""
+Shopping list.
+Planned foods are expanded through their recipes into the foods to buy, less what
+is in stock. Recipe lines that can't be converted to servings are still listed, in
+their own quantity and unit.
+"""
+
+from typing import Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from tests.conftest import create_food, create_recipe
+
+DAY = "2026-03-02"
+
+
+@pytest.fixture
+def foods(client: TestClient) -> Dict[str, int]:
+    """Food IDs of rice, eggs, and a bowl of 200 g rice and 2 eggs, planned twice."""
+    rice = create_food(client, "Rice", calories=130)
+    egg = create_food(client, "Egg", serving_size=1, serving_size_unit="each")
+    bowl = create_recipe(client, "Bowl", [(rice["id"], 200, "g"), (egg["id"], 2, "")])
+    response = client.post(
+        "/api/planned-foods",
+        json={
+            "date": DAY,
+            "meal": "LUNCH",
+            "servings": 2,
+            "food_id": bowl["food"]["id"],
+        },
+    )
+    assert response.status_code == 200
+    return {"rice": rice["id"], "egg": egg["id"], "bowl": bowl["food"]["id"]}
+
+
+def shopping_list(client: TestClient) -> List[Dict]:
+    response = client.get("/api/shopping-list", params={"start": DAY, "end": DAY})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def stock(client: TestClient, food_id: int, quantity: float, state: str) -> None:
+    response = client.post(
+        "/api/inventory",
+        json={"food_id": food_id, "quantity": quantity, "state": state},
+    )
+    assert response.status_code == 200
+
+
+def test_expands_recipes(client: TestClient, foods: Dict[str, int]) -> None:
+    egg, rice = shopping_list(client)
+    assert (rice["name"], rice["servings"], rice["quantity"], rice["unit"]) == (
+        "Rice",
+        4,
+        400,
+        "g",
+    )
+    assert rice["unconvertible"] is False
+    # "" as the unit of an egg measured "each" is kept as it is
+    assert (egg["name"], egg["quantity"], egg["unit"], egg["unconvertible"]) == (
+        "Egg",
+        4,
+        "",
+        True,
+    )
+
+
+def test_subtracts_held_inventory(client: TestClient, foods: Dict[str, int]) -> None:
+    stock(client, foods["rice"], 1, "READY")
+    stock(client, foods["rice"], 1, "UNCOOKED")
+    # Planned inventory is only meant to be bought, so it isn't on hand
+    stock(client, foods["rice"], 10, "PLANNED")
+    rice = shopping_list(client)[1]
+    assert (rice["needed"], rice["in_inventory"], rice["servings"]) == (4, 2, 2)
+
+
+def test_uses_recipe_inventory_first(client: TestClient, foods: Dict[str, int]) -> None:
+    stock(client, foods["bowl"], 1, "READY")
+    egg, rice = shopping_list(client)
+    assert rice["servings"] == 2
+    assert egg["quantity"] == 2
+    stock(client, foods["bowl"], 1, "READY")
+    assert shopping_list(client) == []
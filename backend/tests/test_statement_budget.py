@@ -0,0 +1,174 @@
+"""
+N+1 check for the routes.
+Every route below runs against a database with many recipes, ingredients and
+planned meals under the STATEMENT_BUDGET of the client fixture, so a route whose
+statement count grows with the data fails with StatementBudgetExceeded.
+"""
+
+import datetime as dt
+from typing import Any, Dict, Iterator, List
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine, select
+from sqlalchemy.orm import Session
+
+from src.food import service
+from src.food.constants import MealType
+from src.food.database import Food, Recipe
+from src.food.models import (
+    AddInventoryRequest,
+    CreateFoodRequest,
+    CreatePlannedFoodRequest,
+    CreateRecipeRequest,
+    IngredientRequest,
+    InstructionRequest,
+)
+from src.food.statement_budget import (
+    StatementBudgetExceeded,
+    StatementBudgetMiddleware,
+)
+from tests.conftest import STATEMENT_BUDGET, make_engine
+
+FOODS = 40
+RECIPES = 30
+START = dt.date(2026, 1, 1)
+DAYS = 14
+
+
+def recipe_request(number: int) -> CreateRecipeRequest:
+    return CreateRecipeRequest(
+        name=f"Recipe {number}",
+        ingredients=[
+            IngredientRequest(
+                food_id=(number * 5 + i) % FOODS + 1, note="", quantity=50, unit="g"
+            )
+            for i in range(5)
+        ],
+        instructions=[
+            InstructionRequest(step=step, text=f"Step {step}") for step in range(1, 4)
+        ],
+        override_nutrition=False,
+        calories=0,
+        fat=0,
+        protein=0,
+        carbohydrates=0,
+    )
+
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory: pytest.TempPathFactory) -> Iterator[Engine]:
+    """The conftest engine, seeded once: seeding takes far longer than the tests."""
+    engine = make_engine(tmp_path_factory.mktemp("statement_budget"))
+    # Its own session: one left open would hold the write lock during the tests
+    with Session(engine) as db_session:
+        seed(db_session)
+    yield engine
+    engine.dispose()
+
+
+def seed(db_session: Session) -> None:
+    for i in range(FOODS):
+        service.create_food(
+            db_session,
+            CreateFoodRequest(
+                name=f"Food {i}",
+                serving_size=100,
+                serving_size_unit="g",
+                calories=100 + i,
+                fat=5,
+                protein=10,
+                carbohydrates=20,
+            ),
+        )
+        service.add_inventory(
+            db_session, AddInventoryRequest(food_id=i + 1, quantity=1.0)
+        )
+    db_session.commit()
+    recipe_food_ids = [
+        service.create_recipe(db_session, recipe_request(number)).food.id
+        for number in range(RECIPES)
+    ]
+    for day in range(DAYS):
+        for meal in MealType:
+            service.create_planned_food(
+                db_session,
+                CreatePlannedFoodRequest(
+                    date=START + dt.timedelta(days=day),
+                    meal=meal,
+                    servings=1.0,
+                    food_id=recipe_food_ids[(day * 4 + len(meal)) % RECIPES],
+                ),
+            )
+
+
+END = (START + dt.timedelta(days=DAYS - 1)).isoformat()
+RANGE: Dict[str, Any] = {"start": START.isoformat(), "end": END}
+
+ROUTES: List[tuple[str, Dict[str, Any]]] = [
+    ("/api/recipes", {}),
+    ("/api/recipes/1/nutrition", {}),
+    ("/api/foods/search", {"q": "food"}),
+    ("/api/planned-foods", RANGE),
+    ("/api/nutrition/daily", RANGE),
+    ("/api/nutrition/meals", RANGE),
+    ("/api/shopping-list", RANGE),
+    ("/api/inventory", {}),
+    ("/api/sync", {}),
+    ("/api/sync", {"since": 1}),
+]
+
+
+@pytest.mark.parametrize("path, params", ROUTES)
+def test_read_within_budget(client: TestClient, path: str, params: Dict[str, Any]):
+    assert client.get(path, params=params).status_code == 200
+
+
+def test_compute_within_budget(client: TestClient, engine: Engine) -> None:
+    # One list per recipe food, so each recipe is rolled up from a cold memo
+    with Session(engine) as db_session:
+        recipe_food_ids = db_session.scalars(
+            select(Food.id).where(Food.source_recipe_id.is_not(None))
+        ).all()
+    response = client.post(
+        "/api/nutrition/compute",
+        json={
+            "lists": [
+                {
+                    "ingredients": [
+                        {"food_id": food_id, "quantity": 1, "unit": "serving"}
+                    ]
+                }
+                for food_id in recipe_food_ids
+            ]
+        },
+    )
+    assert response.status_code == 200
+    assert len(response.json()["results"]) == RECIPES
+
+
+def test_recipe_writes_within_budget(client: TestClient) -> None:
+    request = recipe_request(RECIPES).model_dump()
+    response = client.post("/api/recipes", json=request)
+    assert response.status_code == 200
+    recipe_id = response.json()["id"]
+    response = client.put(
+        f"/api/recipes/{recipe_id}",
+        json={"id": recipe_id, "ingredients": request["ingredients"][::-1]},
+    )
+    assert response.status_code == 200
+
+
+def test_budget_fails_n_plus_one(engine: Engine) -> None:
+    # Reads each recipe's ingredients with a lazy load, one query per recipe
+    n_plus_one = FastAPI()
+
+    @n_plus_one.get("/ingredients")
+    def ingredients(db_session: Session = Depends(lambda: Session(engine))) -> int:
+        recipes = db_session.scalars(select(Recipe)).all()
+        return sum(len(recipe.ingredients) for recipe in recipes)
+
+    client = TestClient(StatementBudgetMiddleware(n_plus_one, limit=STATEMENT_BUDGET))
+    with pytest.raises(StatementBudgetExceeded):
+        client.get("/ingredients")
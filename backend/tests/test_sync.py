@@ -0,0 +1,99 @@
+"""
+Delta sync.
+GET /sync returns everything, then given the previous response's revision only the
+foods, recipes and planned foods written since, with tombstones for those deleted.
+"""
+
+from typing import Any, Dict, List
+
+from fastapi.testclient import TestClient
+
+from tests.conftest import create_food, create_recipe
+
+
+def sync(client: TestClient, since: int = 0) -> Dict[str, Any]:
+    response = client.get("/api/sync", params={"since": since})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def ids(rows: List[Dict[str, Any]]) -> List[int]:
+    return [row["id"] for row in rows]
+
+
+def test_full_then_delta(client: TestClient) -> None:
+    rice = create_food(client, "Rice")
+    egg = create_food(client, "Egg")
+    full = sync(client)
+    assert ids(full["foods"]) == [rice["id"], egg["id"]]
+    assert full["deleted"] == {"foods": [], "recipes": [], "planned_foods": []}
+
+    # Nothing written since
+    empty = sync(client, full["revision"])
+    assert empty["revision"] == full["revision"]
+    assert (empty["foods"], empty["recipes"], empty["planned_foods"]) == ([], [], [])
+
+    response = client.put(
+        f"/api/foods/{egg['id']}", json={"id": egg["id"], "calories": 70}
+    )
+    assert response.status_code == 200
+    delta = sync(client, full["revision"])
+    assert ids(delta["foods"]) == [egg["id"]]
+    assert delta["foods"][0]["calories"] == 70
+    assert delta["revision"] > full["revision"]
+
+
+def test_food_change_returns_what_embeds_it(client: TestClient) -> None:
+    rice = create_food(client, "Rice")
+    recipe = create_recipe(client, "Bowl", [(rice["id"], 200, "g")])
+    response = client.post(
+        "/api/planned-foods",
+        json={
+            "date": "2026-03-02",
+            "meal": "LUNCH",
+            "servings": 1,
+            "food_id": rice["id"],
+        },
+    )
+    planned_food_id = response.json()["id"]
+    revision = sync(client)["revision"]
+
+    client.put(
+        f"/api/foods/{rice['id']}", json={"id": rice["id"], "name": "Brown rice"}
+    )
+    delta = sync(client, revision)
+    assert ids(delta["recipes"]) == [recipe["id"]]
+    assert delta["recipes"][0]["ingredients"][0]["food"]["name"] == "Brown rice"
+    assert ids(delta["planned_foods"]) == [planned_food_id]
+
+
+def test_deletions_are_tombstoned(client: TestClient) -> None:
+    rice = create_food(client, "Rice")
+    recipe = create_recipe(client, "Bowl", [(rice["id"], 200, "g")])
+    response = client.post(
+        "/api/planned-foods",
+        json={
+            "date": "2026-03-02",
+            "meal": "LUNCH",
+            "servings": 1,
+            "food_id": rice["id"],
+        },
+    )
+    planned_food_id = response.json()["id"]
+    revision = sync(client)["revision"]
+
+    assert client.delete(f"/api/planned-foods/{planned_food_id}").status_code == 200
+    assert client.delete(f"/api/recipes/{recipe['id']}").status_code == 200
+    delta = sync(client, revision)
+    assert delta["deleted"] == {
+        "foods": [recipe["food"]["id"]],
+        "recipes": [recipe["id"]],
+        "planned_foods": [planned_food_id],
+    }
+    assert (delta["recipes"], delta["planned_foods"]) == ([], [])
+
+    # Tombstones older than `since` aren't repeated, and a full sync has none
+    assert sync(client, delta["revision"])["deleted"]["recipes"] == []
+    full = sync(client)
+    assert full["deleted"]["recipes"] == []
+    assert ids(full["foods"]) == [rice["id"]]
@@ -0,0 +1,129 @@
+"""
+Unit parsing and conversion to servings.
+Quantities convert within a dimension, across mass and volume with a density, and
+"serving" always counts 1:1; anything else comes out as NaN rather than a guess.
+"""
+
+import math
+from typing import Optional, Sequence
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.food.constants import Dimension
+from src.food.units import parse_unit, unit_table
+from tests.conftest import create_food, create_recipe
+
+
+@pytest.mark.parametrize(
+    "text, name, dimension",
+    [
+        ("g", "g", Dimension.MASS),
+        ("Grams", "g", Dimension.MASS),
+        ("Tbsp.", "tbsp", Dimension.VOLUME),
+        ("cups", "cup", Dimension.VOLUME),
+        ("Fluid  Ounces", "fl oz", Dimension.VOLUME),
+        ("pcs", "each", Dimension.COUNT),
+        ("Servings", "serving", Dimension.SERVING),
+        ("portion", "serving", Dimension.SERVING),
+        # Too ambiguous to alias
+        ("c", "c", None),
+        ("x", "x", None),
+        ("", "", None),
+        ("Cloves", "cloves", None),
+    ],
+)
+def test_parse_unit(text: str, name: str, dimension: Optional[Dimension]) -> None:
+    unit = parse_unit(text)
+    assert (unit.name, unit.dimension) == (name, dimension)
+
+
+def to_servings(
+    quantity: float,
+    unit: str,
+    serving_size: float,
+    serving_unit: str,
+    density: float = math.nan,
+) -> float:
+    return float(
+        unit_table.to_servings(
+            quantity=np.array([quantity]),
+            unit=unit_table.codes([unit]),
+            serving_size=np.array([serving_size]),
+            serving_unit=unit_table.codes([serving_unit]),
+            density=np.array([density]),
+        )[0]
+    )
+
+
+@pytest.mark.parametrize(
+    "quantity, unit, serving_size, serving_unit, density, servings",
+    [
+        (200, "g", 100, "g", math.nan, 2.0),
+        (0.5, "kg", 100, "g", math.nan, 5.0),
+        (1, "lb", 453.59237, "g", math.nan, 1.0),
+        (3, "tsp", 1, "tbsp", math.nan, 1.0),
+        (1, "dozen", 2, "each", math.nan, 6.0),
+        # Across mass and volume with a density in g/ml
+        (100, "ml", 50, "g", 1.5, 3.0),
+        (150, "g", 100, "ml", 1.5, 1.0),
+        # Unrecognized units only match themselves
+        (4, "cloves", 2, "cloves", math.nan, 2.0),
+    ],
+)
+def test_converts_to_servings(
+    quantity: float,
+    unit: str,
+    serving_size: float,
+    serving_unit: str,
+    density: float,
+    servings: float,
+) -> None:
+    result = to_servings(quantity, unit, serving_size, serving_unit, density)
+    assert result == pytest.approx(servings)
+
+
+@pytest.mark.parametrize("serving_unit", ["g", "ml", "each", "cloves"])
+def test_servings_count_one_to_one(serving_unit: str) -> None:
+    assert to_servings(2, "serving", 40, serving_unit) == 2.0
+    assert to_servings(3, "portions", 40, serving_unit) == 3.0
+
+
+@pytest.mark.parametrize(
+    "quantity, unit, serving_size, serving_unit, density",
+    [
+        # A volume of a food measured by mass, without a density
+        (1, "cup", 100, "g", math.nan),
+        (1, "cup", 100, "g", 0.0),
+        # No conversion between dimensions otherwise
+        (2, "each", 100, "g", 1.0),
+        (1, "cloves", 100, "g", math.nan),
+        (1, "c", 1, "cup", math.nan),
+        # A food without a serving size
+        (100, "g", 0, "g", math.nan),
+    ],
+)
+def test_unconvertible_is_nan(
+    quantity: float, unit: str, serving_size: float, serving_unit: str, density: float
+) -> None:
+    assert math.isnan(to_servings(quantity, unit, serving_size, serving_unit, density))
+
+
+def test_codes_share_normalized_units() -> None:
+    units: Sequence[str] = ["g", "grams", "Gram", "cup", "g"]
+    codes = unit_table.codes(units).tolist()
+    assert codes[0] == codes[1] == codes[2] == codes[4]
+    assert codes[3] != codes[0]
+
+
+def test_rollup_counts_unconvertible_lines_as_zero(client: TestClient) -> None:
+    rice = create_food(client, "Rice", calories=130)
+    milk = create_food(
+        client, "Milk", serving_size=1, serving_size_unit="cup", calories=100
+    )
+    recipe = create_recipe(
+        client, "Rice pudding", [(rice["id"], 1, "cup"), (milk["id"], 2, "cups")]
+    )
+    response = client.get(f"/api/recipes/{recipe['id']}/nutrition")
+    assert response.json()["calories"] == 200